@@ -7,6 +7,11 @@ import requests
 import json
 
 class DataAnalyst:
+    METRICS = ('duration', 'calories_burned', 'heart_rate')
+    PERCENTILES = (25, 50, 75, 90)
+    ROLLING_WEEKS = 4
+    RECENT_WEEKS = 8
+
     def __init__(self, model_config: Dict = None, user_id: int = None, api_key: str = None):
         self.model_config = model_config or {
             'temperature': 0.2,
@@ -20,25 +25,27 @@ class DataAnalyst:
         Analyzes fitness and health trends
         
         Args:
-            data: Dict containing historical fitness and health data
+            data: Dict containing historical fitness and health data, either
+                ``columns`` (column name -> list/array, e.g. from
+                ``Workout.columns_for_user``) or ``history`` (list of dicts)
         """
         try:
-            # Convert data to pandas DataFrame for analysis
-            df = pd.DataFrame(data.get('history', []))
-            if df.empty:
+            columns = self._to_columns(data)
+            if not columns:
                 return {
                     "trends": [],
                     "insights": "Not enough data for trend analysis.",
                     "recommendations": []
                 }
             
-            # Calculate basic statistics
-            stats = self._calculate_statistics(df)
+            summary = self.summarize(columns)
+            stats = self._calculate_statistics(summary)
             
             # Check if we have API key
             if not self.api_key:
                 return {
                     "trends": stats,
+                    "summary": summary,
                     "insights": "Please configure your ModelScope API key to get AI-powered insights.",
                     "recommendations": []
                 }
@@ -79,6 +86,7 @@ class DataAnalyst:
             
             return {
                 "trends": stats,
+                "summary": summary,
                 "insights": insights,
                 "recommendations": self._extract_recommendations(insights)
             }
@@ -91,30 +99,205 @@ class DataAnalyst:
                 "recommendations": []
             }
             
-    def _calculate_statistics(self, df: pd.DataFrame) -> List[Dict]:
-        """Calculate basic statistics from fitness data"""
-        stats = []
+    def _to_columns(self, data: Dict) -> Dict[str, np.ndarray]:
+        """
+        Columnar input passes straight through; a ``history`` list is transposed once
+
+        Dates are parsed here and rows whose date is missing or unparseable
+        are dropped, so ``summarize`` only ever bins valid days.
+        """
+        if data.get('columns'):
+            columns = {name: np.asarray(values) for name, values in data['columns'].items()}
+        else:
+            history = data.get('history', [])
+            if not history:
+                return {}
+            columns = {name: np.asarray(values) for name, values in pd.DataFrame(history).items()}
+        if 'date' not in columns or len(columns['date']) == 0:
+            return {}
+
+        dates = columns['date']
+        if not np.issubdtype(dates.dtype, np.datetime64):
+            dates = pd.to_datetime(pd.Series(dates), utc=True, format='ISO8601', errors='coerce') \
+                .dt.tz_localize(None).to_numpy()
+        valid = ~np.isnat(dates)
+        if not valid.any():
+            return {}
+        columns['date'] = dates
+        if not valid.all():
+            columns = {name: values[valid] if len(values) == len(valid) else values
+                       for name, values in columns.items()}
+        return columns
+
+    def summarize(self, columns: Dict[str, np.ndarray]) -> Dict:
+        """
+        Per-type, per-week, rolling, trend and percentile statistics in one pass
         
-        if 'calories_burned' in df.columns:
-            avg_calories = df['calories_burned'].mean()
-            stats.append({
-                'metric': 'Average Calories Burned',
-                'value': f"{avg_calories:.1f} kcal"
-            })
-            
-        if 'duration' in df.columns:
-            avg_duration = df['duration'].mean()
+        Every record gets a week and a type index up front; all aggregates are
+        then ``np.bincount`` reductions over those indexes, so the cost is a
+        handful of array passes regardless of how many years the history spans.
+        
+        Args:
+            columns: ``date`` plus any of ``type`` and ``METRICS``, as arrays
+        """
+        dates = columns['date']
+        if not np.issubdtype(dates.dtype, np.datetime64):
+            dates = pd.to_datetime(dates, utc=True, format='ISO8601').tz_localize(None).to_numpy()
+        days = dates.astype('datetime64[D]')
+        day_numbers = days.astype(np.int64)
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        week_numbers = (day_numbers + 3) // 7
+        first_week = week_numbers.min()
+        week_idx = week_numbers - first_week
+        n_weeks = int(week_idx.max()) + 1
+        week_counts = np.bincount(week_idx, minlength=n_weeks)
+
+        metrics = {name: self._as_float(columns[name]) for name in self.METRICS if name in columns}
+        types = None
+        if 'type' in columns:
+            type_codes, types = pd.factorize(pd.Series(columns['type']).fillna('other'))
+
+        summary = {
+            'workouts': int(len(days)),
+            'first_date': str(days.min()),
+            'last_date': str(days.max()),
+            'weeks': n_weeks,
+            'active_weeks': int(np.count_nonzero(week_counts)),
+            'overall': {},
+            'by_type': {},
+            'weekly': {},
+            'trends': {},
+        }
+
+        recent = slice(max(n_weeks - self.RECENT_WEEKS, 0), n_weeks)
+        week_starts = (first_week * 7 - 3 + np.arange(n_weeks) * 7).astype('datetime64[D]')
+        summary['weekly']['week_start'] = [str(day) for day in week_starts[recent]]
+        summary['weekly']['workouts'] = week_counts[recent].tolist()
+        summary['trends']['workouts_per_week'] = self._slope(week_counts.astype(np.float64))
+
+        for name, values in metrics.items():
+            valid = ~np.isnan(values)
+            if not valid.any():
+                continue
+            present = values[valid]
+            quantiles = np.percentile(present, self.PERCENTILES)
+            summary['overall'][name] = {
+                'mean': round(float(present.mean()), 1),
+                'total': round(float(present.sum()), 1),
+                **{f'p{q}': round(float(v), 1) for q, v in zip(self.PERCENTILES, quantiles)}
+            }
+
+            # Heart rate is averaged per week, durations and calories are summed
+            weekly_sum = np.bincount(week_idx[valid], weights=present, minlength=n_weeks)
+            if name == 'heart_rate':
+                weekly_n = np.bincount(week_idx[valid], minlength=n_weeks)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    weekly = np.where(weekly_n > 0, weekly_sum / weekly_n, np.nan)
+            else:
+                weekly = weekly_sum
+            summary['weekly'][name] = self._rounded(weekly[recent])
+            summary['weekly'][f'{name}_rolling'] = self._rounded(self._rolling_mean(weekly, self.ROLLING_WEEKS)[recent])
+            summary['trends'][name] = self._slope(weekly)
+
+            if types is not None:
+                type_valid = type_codes[valid]
+                type_sum = np.bincount(type_valid, weights=present, minlength=len(types))
+                type_n = np.bincount(type_valid, minlength=len(types))
+                for code, workout_type in enumerate(types):
+                    if type_n[code]:
+                        summary['by_type'].setdefault(workout_type, {})[name] = {
+                            'total': round(float(type_sum[code]), 1),
+                            'mean': round(float(type_sum[code] / type_n[code]), 1)
+                        }
+
+        if types is not None:
+            type_counts = np.bincount(type_codes, minlength=len(types))
+            for code, workout_type in enumerate(types):
+                summary['by_type'].setdefault(workout_type, {})['workouts'] = int(type_counts[code])
+        return summary
+
+    @staticmethod
+    def _as_float(values: np.ndarray) -> np.ndarray:
+        """Numeric columns are cast in place; anything else (None, strings) goes through pandas."""
+        if np.issubdtype(values.dtype, np.number):
+            return values.astype(np.float64, copy=False)
+        return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+        """Trailing mean over ``window`` entries (fewer at the start), ignoring NaNs."""
+        valid = ~np.isnan(values)
+        sums = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+        counts = np.concatenate([[0], np.cumsum(valid)])
+        ends = np.arange(1, len(values) + 1)
+        starts = np.maximum(ends - window, 0)
+        n = counts[ends] - counts[starts]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n > 0, (sums[ends] - sums[starts]) / n, np.nan)
+
+    @staticmethod
+    def _slope(values: np.ndarray) -> float:
+        """Least-squares change per week, or None with fewer than two weeks of data."""
+        x = np.flatnonzero(~np.isnan(values)).astype(np.float64)
+        if len(x) < 2:
+            return None
+        y = values[~np.isnan(values)]
+        x_centered = x - x.mean()
+        return round(float((x_centered * (y - y.mean())).sum() / (x_centered ** 2).sum()), 2)
+
+    @staticmethod
+    def _rounded(values: np.ndarray) -> List:
+        return [None if np.isnan(value) else round(float(value), 1) for value in values]
+
+    def _calculate_statistics(self, summary: Dict) -> List[Dict]:
+        """Flattens ``summarize`` output into the metric/value lines used by the prompt"""
+        stats = []
+        overall = summary['overall']
+        trends = summary['trends']
+        units = {'duration': 'minutes', 'calories_burned': 'kcal', 'heart_rate': 'bpm'}
+        labels = {
+            'duration': 'Workout Duration',
+            'calories_burned': 'Calories Burned',
+            'heart_rate': 'Heart Rate'
+        }
+
+        stats.append({
+            'metric': 'Workouts Logged',
+            'value': f"{summary['workouts']} over {summary['weeks']} weeks "
+                     f"({summary['active_weeks']} active), {summary['first_date']} to {summary['last_date']}"
+        })
+        if trends.get('workouts_per_week') is not None:
             stats.append({
-                'metric': 'Average Workout Duration',
-                'value': f"{avg_duration:.1f} minutes"
+                'metric': 'Workout Frequency Trend',
+                'value': f"{trends['workouts_per_week']:+.2f} workouts/week per week"
             })
-            
-        if 'heart_rate' in df.columns:
-            avg_hr = df['heart_rate'].mean()
+
+        for name, values in overall.items():
+            unit = units[name]
             stats.append({
-                'metric': 'Average Heart Rate',
-                'value': f"{avg_hr:.0f} bpm"
+                'metric': f'Average {labels[name]}',
+                'value': f"{values['mean']:.1f} {unit} (median {values['p50']:.1f}, "
+                         f"p25-p75 {values['p25']:.1f}-{values['p75']:.1f}, p90 {values['p90']:.1f})"
             })
+            rolling = [value for value in summary['weekly'].get(f'{name}_rolling', []) if value is not None]
+            if rolling:
+                stats.append({
+                    'metric': f'{labels[name]} per Week ({self.ROLLING_WEEKS}-week average)',
+                    'value': f"{rolling[-1]:.1f} {unit}"
+                })
+            if trends.get(name) is not None:
+                stats.append({
+                    'metric': f'{labels[name]} Trend',
+                    'value': f"{trends[name]:+.2f} {unit}/week per week"
+                })
+
+        for workout_type, values in summary['by_type'].items():
+            parts = [f"{values['workouts']} workouts"]
+            if 'duration' in values:
+                parts.append(f"{values['duration']['mean']:.0f} min avg")
+            if 'calories_burned' in values:
+                parts.append(f"{values['calories_burned']['mean']:.0f} kcal avg")
+            stats.append({'metric': f'{workout_type.capitalize()} Sessions', 'value': ', '.join(parts)})
             
         return stats
         
@@ -188,6 +188,78 @@ class FitnessCoach:
                 "confidence": False
             }
     
+    def process_command(self, command: str, context: str = '', user_id: int = None) -> str:
+        """
+        Answers a spoken coaching command
+        
+        Args:
+            command: Transcribed user command
+            context: Retrieved knowledge base context
+            user_id: ID of the user issuing the command
+        """
+        return ''.join(self.stream_command(command, context, user_id))
+        
+    def stream_command(self, command: str, context: str = '', user_id: int = None):
+        """
+        Answers a spoken coaching command, yielding the reply as it is generated
+        
+        Args:
+            command: Transcribed user command
+            context: Retrieved knowledge base context
+            user_id: ID of the user issuing the command
+        """
+        if not self.api_key:
+            yield "Please configure your ModelScope API key."
+            return
+            
+        # Stream the reply using ModelScope API (OpenAI compatible SSE)
+        url = "https://api-inference.modelscope.cn/v1/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": "Qwen/Qwen2.5-32B-Instruct",
+            "messages": [
+                {"role": "system", "content": "You are a friendly voice fitness coach. Answer in short, spoken sentences."},
+                {"role": "user", "content": self._create_command_prompt(command, context)}
+            ],
+            "temperature": self.model_config.get('temperature', 0.7),
+            "max_tokens": self.model_config.get('max_tokens', 1000),
+            "stream": True
+        }
+        
+        with requests.post(
+            url,
+            headers=headers,
+            json=payload,
+            stream=True,
+            timeout=30
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[len(b'data:'):].strip()
+                if data == b'[DONE]':
+                    break
+                chunk = json.loads(data)
+                if chunk.get('choices'):
+                    delta = chunk['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
+    
+    def _create_command_prompt(self, command: str, context: str) -> str:
+        """Creates prompt for answering a voice command"""
+        if not context:
+            return command
+        return f"""
+        Use the following reference material if it is relevant:
+        {context}
+        
+        User request: {command}
+        """
+        
     def _create_workout_prompt(self, user_data: Dict) -> str:
         """Creates prompt for workout plan generation"""
         return f"""
@@ -213,6 +285,9 @@ class FitnessCoach:
         Duration: {workout_data.get('duration', 0)} minutes
         Intensity: {workout_data.get('intensity', 'moderate')}
         Heart Rate: {workout_data.get('heart_rate', [])}
+        Heart Rate Summary: {workout_data.get('heart_rate_summary', {})}
+        Pace (s/km): {workout_data.get('pace', [])}
+        Power (W): {workout_data.get('power', [])}
         
         Please provide:
         1. Overall performance assessment
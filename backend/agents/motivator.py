@@ -1,9 +1,31 @@
 from typing import Dict, List
 import openai
-from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, timedelta
 import random
+import re
+
+# Trailing UTC offset of an ISO timestamp, e.g. "Z" or "+05:00" after the time
+_OFFSET_RE = re.compile(r'([T ][\d:.,]+)(?:Z|[+-]\d{2}(?::?\d{2})?)$')
 
 class Motivator:
+    DAILY_QUOTES = [
+        "The only bad workout is the one that didn't happen.",
+        "Your body can stand almost anything. It's your mind you have to convince.",
+        "The hard days are what make you stronger.",
+        "Fitness is not about being better than someone else. It's about being better than you used to be.",
+        "The only person you are destined to become is the person you decide to be.",
+        "Success is usually the culmination of controlling failure.",
+        "The difference between try and triumph is just a little umph!",
+        "The only way to define your limits is by going beyond them.",
+        "Don't wish for it, work for it.",
+        "Your health is an investment, not an expense."
+    ]
+
+    CONSISTENCY_WINDOW_DAYS = 30
+    IDEAL_WORKOUTS = 17  # ~4 workouts/week for 30 days
+
     def __init__(self, model_config: Dict):
         self.model_config = model_config
         
@@ -66,33 +88,21 @@ class Motivator:
         Args:
             workout_history: List of past workouts
         """
-        streak = self._calculate_streak(workout_history)
-        consistency_score = self._calculate_consistency_score(workout_history)
+        stats = self.consistency_stats([w['date'] for w in workout_history])
+        streak = stats['current_streak']
         
         return {
             "current_streak": streak,
-            "consistency_score": consistency_score,
+            "longest_streak": stats['longest_streak'],
+            "consistency_score": stats['consistency_score'],
             "encouragement": self._generate_streak_message(streak),
             "timestamp": datetime.now().isoformat()
         }
 
     def get_daily_quote(self) -> Dict:
         """Returns an inspiring fitness quote"""
-        quotes = [
-            "The only bad workout is the one that didn't happen.",
-            "Your body can stand almost anything. It's your mind you have to convince.",
-            "The hard days are what make you stronger.",
-            "Fitness is not about being better than someone else. It's about being better than you used to be.",
-            "The only person you are destined to become is the person you decide to be.",
-            "Success is usually the culmination of controlling failure.",
-            "The difference between try and triumph is just a little umph!",
-            "The only way to define your limits is by going beyond them.",
-            "Don't wish for it, work for it.",
-            "Your health is an investment, not an expense."
-        ]
-        
         return {
-            "quote": random.choice(quotes),
+            "quote": random.choice(self.DAILY_QUOTES),
             "timestamp": datetime.now().isoformat()
         }
 
@@ -129,46 +139,130 @@ class Motivator:
             "end_date": (datetime.now() + timedelta(days=7)).isoformat()
         }
 
-    def _calculate_streak(self, workout_history: List[Dict]) -> int:
-        """Calculates current workout streak"""
-        if not workout_history:
-            return 0
-            
-        streak = 0
-        today = datetime.now().date()
+    def consistency_stats(self, dates, today: date = None) -> Dict:
+        """
+        Streaks and 30-day consistency for one user
         
-        for workout in reversed(workout_history):
-            workout_date = datetime.fromisoformat(workout['date']).date()
-            days_diff = (today - workout_date).days
-            
-            if days_diff == streak:
-                streak += 1
-            else:
-                break
-                
-        return streak
+        Args:
+            dates: Workout dates in any order (ISO strings, dates or datetimes)
+            today: Reference day, defaults to today
+        """
+        dates = list(dates)
+        if not dates:
+            return self._empty_stats()
+        result = self.engagement_batch(np.zeros(len(dates), dtype=np.int64), dates, today=today)
+        return {key: values[0].item() for key, values in result.items() if key != 'user_id'}
 
-    def _calculate_consistency_score(self, workout_history: List[Dict]) -> float:
-        """Calculates consistency score (0-100)"""
-        if not workout_history:
-            return 0
-            
-        # Look at last 30 days
-        today = datetime.now().date()
-        thirty_days_ago = today - timedelta(days=30)
+    def engagement_batch(self, user_ids, dates, counts=None, today: date = None) -> Dict[str, np.ndarray]:
+        """
+        Current/longest streaks and consistency for many users at once
         
-        # Count workouts in last 30 days
-        recent_workouts = [
-            w for w in workout_history 
-            if datetime.fromisoformat(w['date']).date() >= thirty_days_ago
-        ]
+        Rows are sorted once by (user, day); runs of consecutive days are
+        found from one ``np.diff`` over the whole array (a run also breaks
+        where the user changes), and the 30-day window is located per user
+        with ``searchsorted``. A streak stays current until a full day is
+        missed, matching ``UserStats.live_streak``.
         
-        # Calculate score (assuming 4 workouts per week is ideal)
-        ideal_workouts = 17  # ~4 workouts/week for 30 days
-        actual_workouts = len(recent_workouts)
+        Args:
+            user_ids: User id per row
+            dates: Day per row (datetime64, dates or ISO strings); repeats are fine
+            counts: Workouts per row, e.g. ``UserDailyStats.workout_count``; defaults to 1
+            today: Reference day, defaults to today
         
-        score = (actual_workouts / ideal_workouts) * 100
-        return min(100, round(score, 1))
+        Returns:
+            Column arrays, one entry per distinct user, ordered by user id
+        """
+        user_ids = np.asarray(user_ids)
+        days = self._to_days(dates)
+        counts = np.ones(len(days), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        today = np.datetime64(today or datetime.now().date(), 'D').astype(np.int64)
+
+        order = np.lexsort((days, user_ids))
+        user_ids, days, counts = user_ids[order], days[order], counts[order]
+
+        # Collapse to one row per (user, day)
+        new_pair = np.ones(len(days), dtype=bool)
+        new_pair[1:] = (user_ids[1:] != user_ids[:-1]) | (days[1:] != days[:-1])
+        pair_starts = np.flatnonzero(new_pair)
+        pair_users, pair_days = user_ids[pair_starts], days[pair_starts]
+        pair_counts = np.add.reduceat(counts, pair_starts)
+
+        user_starts = np.flatnonzero(np.r_[True, pair_users[1:] != pair_users[:-1]])
+        user_ends = np.r_[user_starts[1:], len(pair_days)]
+        users = pair_users[user_starts]
+
+        # Runs of consecutive days
+        new_run = np.ones(len(pair_days), dtype=bool)
+        new_run[1:] = (pair_users[1:] != pair_users[:-1]) | (np.diff(pair_days) != 1)
+        run_starts = np.flatnonzero(new_run)
+        run_lengths = np.diff(np.r_[run_starts, len(pair_days)])
+        # Index of the first run of every user, so runs can be reduced per user
+        first_run = np.searchsorted(run_starts, user_starts)
+        longest = np.maximum.reduceat(run_lengths, first_run)
+        last_run = np.r_[first_run[1:], len(run_starts)] - 1
+
+        last_day = pair_days[user_ends - 1]
+        current = np.where(last_day >= today - 1, run_lengths[last_run], 0)
+
+        # Days are sorted within each user, so the window starts after that user's older days
+        window_start = today - self.CONSISTENCY_WINDOW_DAYS
+        window_first = user_starts + np.add.reduceat((pair_days < window_start).astype(np.int64), user_starts)
+        cumulative = np.r_[0, np.cumsum(pair_counts)]
+        recent_workouts = cumulative[user_ends] - cumulative[window_first]
+        recent_days = user_ends - window_first
+
+        score = np.minimum(100.0, np.round(recent_workouts / self.IDEAL_WORKOUTS * 100, 1))
+        return {
+            'user_id': users,
+            'current_streak': current,
+            'last_run_length': run_lengths[last_run],  # run ending on last_active_day, as UserStats stores it
+            'longest_streak': longest,
+            'last_active_day': last_day.astype('datetime64[D]'),
+            'active_days_30d': recent_days,
+            'workouts_30d': recent_workouts,
+            'consistency_score': score,
+        }
+
+    @staticmethod
+    def _to_days(dates) -> np.ndarray:
+        """
+        Days since the epoch as int64
+        
+        Offset-aware timestamps count on their own local date, as the client
+        sent them: the offset is dropped, not converted to UTC.
+        """
+        dates = np.asarray(dates)
+        if not np.issubdtype(dates.dtype, np.datetime64):
+            dates = pd.to_datetime(pd.Series(dates).map(Motivator._drop_offset), format='ISO8601').to_numpy()
+        return dates.astype('datetime64[D]').astype(np.int64)
+
+    @staticmethod
+    def _drop_offset(value):
+        if isinstance(value, str):
+            return _OFFSET_RE.sub(r'\1', value.strip())
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            return value.replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'current_streak': 0,
+            'last_run_length': 0,
+            'longest_streak': 0,
+            'last_active_day': None,
+            'active_days_30d': 0,
+            'workouts_30d': 0,
+            'consistency_score': 0,
+        }
+
+    def _calculate_streak(self, workout_history: List[Dict]) -> int:
+        """Calculates current workout streak"""
+        return int(self.consistency_stats([w['date'] for w in workout_history])['current_streak'])
+
+    def _calculate_consistency_score(self, workout_history: List[Dict]) -> float:
+        """Calculates consistency score (0-100)"""
+        return float(self.consistency_stats([w['date'] for w in workout_history])['consistency_score'])
 
     def _generate_streak_message(self, streak: int) -> str:
         """Generates encouraging message based on streak"""
@@ -1,10 +1,19 @@
 from typing import Dict, List
+import math
 import openai
 from datetime import datetime
+from backend.services.food_database import NUTRIENTS, get_food_database
 
 class Nutritionist:
-    def __init__(self, model_config: Dict):
+    def __init__(self, model_config: Dict, food_db=None):
         self.model_config = model_config
+        self._food_db = food_db
+
+    @property
+    def food_db(self):
+        if self._food_db is None:
+            self._food_db = get_food_database()
+        return self._food_db
         
     async def create_meal_plan(self, user_profile: Dict, fitness_goals: List[str]) -> Dict:
         """
@@ -57,6 +66,22 @@ class Nutritionist:
             print(f"Error analyzing diet: {str(e)}")
             return None
 
+    def summarize_food_log(self, food_log: List[Dict]) -> Dict:
+        """
+        Local diet summary from the food database, without an LLM call
+        
+        Args:
+            food_log: List of food items consumed
+        """
+        unmatched = []
+        total_nutrients = self._calculate_total_nutrients(food_log, unmatched)
+        return {
+            "total_nutrients": total_nutrients,
+            "unmatched": unmatched,
+            "recommendations": self._generate_diet_recommendations(total_nutrients),
+            "timestamp": datetime.now().isoformat()
+        }
+
     def calculate_macros(self, user_profile: Dict, activity_level: str) -> Dict:
         """
         Calculates recommended macronutrient ratios
@@ -101,24 +126,67 @@ class Nutritionist:
             "duration": "7 days"  # Default duration
         }
 
-    def _calculate_total_nutrients(self, food_log: List[Dict]) -> Dict:
-        """Calculates total nutrients from food log"""
-        totals = {
-            "calories": 0,
-            "protein": 0,
-            "carbs": 0,
-            "fat": 0,
-            "fiber": 0
-        }
+    def _calculate_total_nutrients(self, food_log: List[Dict], unmatched: List[str] = None) -> Dict:
+        """
+        Calculates total nutrients from food log
+        
+        Items that carry their own nutrient values are summed as given. Items
+        with only a ``name`` are looked up in the local food database and
+        weighed by ``grams``, or ``servings`` of the food's standard portion
+        (one portion when neither is given).
+        
+        Args:
+            food_log: List of food items consumed
+            unmatched: Collects the names that matched no food, which add nothing to the totals
+        """
+        totals = {key: 0.0 for key in NUTRIENTS}
+        food_ids, grams = [], []
         
         for food in food_log:
-            totals["calories"] += food.get("calories", 0)
-            totals["protein"] += food.get("protein", 0)
-            totals["carbs"] += food.get("carbs", 0)
-            totals["fat"] += food.get("fat", 0)
-            totals["fiber"] += food.get("fiber", 0)
+            if not isinstance(food, dict):
+                raise ValueError("Each food item must be an object")
+            if any(key in food for key in NUTRIENTS):
+                for key in NUTRIENTS:
+                    totals[key] += self._amount(food.get(key, 0), key)
+                continue
+            food_id = food.get("food_id")
+            if food_id is None:
+                food_id = self.food_db.lookup(food.get("name", ""))
+                if food_id is None:
+                    if unmatched is not None:
+                        unmatched.append(food.get("name"))
+                    continue
+            else:
+                try:
+                    food_id = int(food_id)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Unknown food_id: {food_id}")
+                if not 0 <= food_id < len(self.food_db):
+                    raise ValueError(f"Unknown food_id: {food_id}")
+            food_ids.append(food_id)
+            if food.get("grams") is not None:
+                grams.append(self._amount(food["grams"], "grams"))
+            else:
+                servings = self._amount(food.get("servings", 1), "servings")
+                grams.append(servings * float(self.food_db.portion_g[food_id]))
+        
+        if food_ids:
+            looked_up = self.food_db.totals(food_ids, grams)
+            for key in NUTRIENTS:
+                totals[key] += looked_up[key]
             
-        return totals
+        return {key: round(value, 1) for key, value in totals.items()}
+
+    @staticmethod
+    def _amount(value, field: str) -> float:
+        """Parses a quantity from a food log; finite and non-negative, or ValueError."""
+        try:
+            amount = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a number")
+        if not math.isfinite(amount) or amount < 0:
+            raise ValueError(f"{field} must be a finite, non-negative number")
+        return amount
 
     def _create_diet_analysis_prompt(self, food_log: List[Dict], total_nutrients: Dict) -> str:
         """Creates prompt for diet analysis"""
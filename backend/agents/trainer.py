@@ -1,8 +1,17 @@
 from typing import Dict, List
 import openai
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
+from backend.models.exercise_progress import ExerciseProgress
 
 class Trainer:
+    ACUTE_DAYS = 7
+    CHRONIC_DAYS = 28
+    # Users per days x users matrix in training_load_batch
+    USERS_PER_CHUNK = 256
+    LOAD_COLUMNS = ['load', 'acute_load', 'chronic_load', 'acwr', 'acute_ewma', 'chronic_ewma', 'acwr_ewma', 'status']
+
     def __init__(self, model_config: Dict):
         self.model_config = model_config
         
@@ -66,28 +75,24 @@ class Trainer:
         for exercise in exercise_history:
             name = exercise.get("name")
             if name not in progress:
-                progress[name] = {
-                    "max_weight": 0,
-                    "max_reps": 0,
-                    "total_volume": 0,
-                    "progression": []
-                }
-            
-            # Update exercise stats
-            weight = exercise.get("weight", 0)
-            reps = exercise.get("reps", 0)
-            volume = weight * reps
-            
-            progress[name]["max_weight"] = max(progress[name]["max_weight"], weight)
-            progress[name]["max_reps"] = max(progress[name]["max_reps"], reps)
-            progress[name]["total_volume"] += volume
-            progress[name]["progression"].append({
-                "date": exercise.get("date"),
-                "weight": weight,
-                "reps": reps,
-                "volume": volume
-            })
+                progress[name] = ExerciseProgress(exercise=name)
+            date = exercise.get("date")
+            progress[name].add_set(
+                exercise.get("weight", 0),
+                exercise.get("reps", 0),
+                datetime.fromisoformat(date).date() if isinstance(date, str) else date
+            )
+        
+        return self.summarize_exercise_progress(progress.values())
+
+    def summarize_exercise_progress(self, progress_rows) -> Dict:
+        """
+        Progress report from incrementally maintained ``ExerciseProgress`` rows
         
+        Args:
+            progress_rows: ExerciseProgress rows, e.g. from ``progress_for_user``
+        """
+        progress = {row.exercise: row.to_dict() for row in progress_rows}
         return {
             "exercise_progress": progress,
             "recommendations": self._generate_progression_recommendations(progress),
@@ -101,8 +106,14 @@ class Trainer:
         Args:
             recent_workouts: List of recent workout sessions
         """
-        acute_load = self._calculate_acute_load(recent_workouts)
-        chronic_load = self._calculate_chronic_load(recent_workouts)
+        history = self.training_load_history(recent_workouts)
+        if history.empty:
+            acute_load, chronic_load, acwr_ewma = 0.0, 0.0, None
+        else:
+            today = history.iloc[-1]
+            acute_load = float(today['acute_load'])
+            chronic_load = float(today['chronic_load'])
+            acwr_ewma = None if pd.isna(today['acwr_ewma']) else round(float(today['acwr_ewma']), 2)
         
         if chronic_load > 0:
             acwr = acute_load / chronic_load  # Acute:Chronic Workload Ratio
@@ -113,11 +124,132 @@ class Trainer:
             "acute_load": acute_load,
             "chronic_load": chronic_load,
             "acwr": round(acwr, 2),
+            "acwr_ewma": acwr_ewma,
             "status": self._determine_training_status(acwr),
             "recommendations": self._generate_load_recommendations(acwr),
             "timestamp": datetime.now().isoformat()
         }
 
+    def training_load_history(self, workouts, end: datetime = None) -> pd.DataFrame:
+        """
+        Daily load and acute:chronic ratios for one user's whole history
+        
+        Args:
+            workouts: List of dicts (or a DataFrame) with ``date`` and ``load``
+            end: Last day of the series, defaults to today
+        """
+        frame = workouts if isinstance(workouts, pd.DataFrame) else pd.DataFrame(list(workouts))
+        if frame.empty or 'date' not in frame:
+            return pd.DataFrame(columns=['user_id', 'date'] + self.LOAD_COLUMNS)
+        frame = frame.assign(user_id=0)
+        if 'load' not in frame:
+            frame['load'] = 0
+        return self.training_load_batch(frame, end=end).reset_index(drop=True)
+
+    def training_load_batch(self, data: pd.DataFrame, end: datetime = None) -> pd.DataFrame:
+        """
+        Rolling and EWMA training load for many users, vectorized per chunk of users
+        
+        Users are processed ``USERS_PER_CHUNK`` at a time; each chunk's
+        workouts are binned into a days x users matrix, 7/28-day rolling sums
+        come from one cumulative sum and the EWMAs (lambda = 2 / (N + 1)) from
+        pandas' column-wise ``ewm``. ``chronic_load`` is the 28-day load per
+        week, so ``acwr`` matches ``calculate_training_load``. Until a user has
+        ``CHRONIC_DAYS`` of history the ratios are null and ``status`` is
+        ``insufficient_data``.
+        
+        Args:
+            data: DataFrame with ``user_id``, ``date`` and ``load`` columns
+            end: Last day of every series, defaults to today
+        
+        Returns:
+            One row per user and day, from the user's first workout to ``end``
+        """
+        dates = pd.to_datetime(data['date'], utc=True, format='ISO8601').dt.tz_localize(None).dt.normalize()
+        days = dates.to_numpy().astype('datetime64[D]')
+        loads = pd.to_numeric(data['load'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        users, user_idx = np.unique(data['user_id'].to_numpy(), return_inverse=True)
+        end_day = np.datetime64((end or datetime.now()).date(), 'D')
+
+        # Bounds every matrix to USERS_PER_CHUNK columns instead of the whole user base
+        order = np.argsort(user_idx, kind='stable')
+        bounds = np.searchsorted(user_idx[order], np.arange(0, len(users) + self.USERS_PER_CHUNK, self.USERS_PER_CHUNK))
+        chunks = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            if start == stop:
+                continue
+            rows = order[start:stop]
+            chunk_users = user_idx[rows]
+            first_user = chunk_users[0]
+            chunks.append(self._training_load_chunk(
+                days[rows], loads[rows], users[first_user:chunk_users[-1] + 1], chunk_users - first_user, end_day
+            ))
+        result = pd.concat(chunks, ignore_index=True)
+        result['status'] = self._training_status_array(result['acwr'].to_numpy(), result.pop('filling').to_numpy())
+        return result
+
+    def _training_load_chunk(self, days, loads, users, user_idx, end_day) -> pd.DataFrame:
+        first_day = days.min()
+        last_day = max(days.max(), end_day)
+        day_idx = (days - first_day).astype(np.int64)
+        n_days = int((last_day - first_day).astype(np.int64)) + 1
+
+        matrix = np.zeros((n_days, len(users)))
+        np.add.at(matrix, (day_idx, user_idx), loads)
+
+        cumulative = np.vstack([np.zeros((1, len(users))), np.cumsum(matrix, axis=0)])
+        rows = np.arange(1, n_days + 1)
+        acute = cumulative[rows] - cumulative[np.maximum(rows - self.ACUTE_DAYS, 0)]
+        chronic = (cumulative[rows] - cumulative[np.maximum(rows - self.CHRONIC_DAYS, 0)]) \
+            / (self.CHRONIC_DAYS / self.ACUTE_DAYS)
+        del cumulative
+
+        # A leading zero row starts every EWMA from "no load" rather than from the first session
+        padded = pd.DataFrame(np.vstack([np.zeros((1, len(users))), matrix]))
+        acute_ewma = padded.ewm(alpha=2 / (self.ACUTE_DAYS + 1), adjust=False).mean().to_numpy()[1:]
+        chronic_ewma = padded.ewm(alpha=2 / (self.CHRONIC_DAYS + 1), adjust=False).mean().to_numpy()[1:]
+        del padded
+
+        # Keep each user's days from their first workout on
+        user_first = np.full(len(users), n_days, dtype=np.int64)
+        np.minimum.at(user_first, user_idx, day_idx)
+        # nonzero over the transpose walks user by user, then day by day
+        user_grid, day_grid = np.nonzero(np.arange(n_days)[None, :] >= user_first[:, None])
+        # The 28-day window is still filling, so the ratios would overstate the acute load
+        filling = day_grid - user_first[user_grid] < self.CHRONIC_DAYS - 1
+
+        acute_at = acute[day_grid, user_grid]
+        chronic_at = chronic[day_grid, user_grid]
+        acute_ewma_at = acute_ewma[day_grid, user_grid]
+        chronic_ewma_at = chronic_ewma[day_grid, user_grid]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            acwr = np.where((chronic_at > 0) & ~filling, acute_at / chronic_at, np.nan)
+            acwr_ewma = np.where((chronic_ewma_at > 0) & ~filling, acute_ewma_at / chronic_ewma_at, np.nan)
+
+        return pd.DataFrame({
+            'user_id': users[user_grid],
+            'date': first_day + day_grid.astype('timedelta64[D]'),
+            'load': matrix[day_grid, user_grid],
+            'acute_load': acute_at,
+            'chronic_load': chronic_at,
+            'acwr': acwr,
+            'acute_ewma': acute_ewma_at,
+            'chronic_ewma': chronic_ewma_at,
+            'acwr_ewma': acwr_ewma,
+            'filling': filling,
+        })
+
+    def _training_status_array(self, acwr: np.ndarray, filling: np.ndarray) -> np.ndarray:
+        """Vectorized ``_determine_training_status``; days without chronic load get None."""
+        status = np.select(
+            [acwr < 0.8, acwr <= 1.3, acwr <= 1.5, acwr > 1.5],
+            ['undertraining', 'optimal', 'high_risk', 'very_high_risk'],
+            default=''
+        ).astype(object)
+        status[np.isnan(acwr)] = None
+        status[filling] = 'insufficient_data'
+        return status
+
     def _create_training_prompt(self, user_profile: Dict, fitness_goals: List[str]) -> str:
         """Creates prompt for training session generation"""
         return f"""
@@ -166,27 +298,6 @@ class Trainer:
                     
         return recommendations
 
-    def _calculate_acute_load(self, workouts: List[Dict], days: int = 7) -> float:
-        """Calculates acute training load (last 7 days)"""
-        recent_workouts = [
-            w for w in workouts 
-            if datetime.fromisoformat(w['date']) > datetime.now() - timedelta(days=days)
-        ]
-        
-        return sum(w.get('load', 0) for w in recent_workouts)
-
-    def _calculate_chronic_load(self, workouts: List[Dict], weeks: int = 4) -> float:
-        """Calculates chronic training load (last 4 weeks)"""
-        recent_workouts = [
-            w for w in workouts 
-            if datetime.fromisoformat(w['date']) > datetime.now() - timedelta(weeks=weeks)
-        ]
-        
-        if not recent_workouts:
-            return 0
-            
-        return sum(w.get('load', 0) for w in recent_workouts) / weeks
-
     def _determine_training_status(self, acwr: float) -> str:
         """Determines training status based on Acute:Chronic Workload Ratio"""
         if acwr < 0.8:
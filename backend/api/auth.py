@@ -1,12 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app
-from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 import datetime
 from backend.models import db
 from backend.models.user import User
+from backend.utils.auth import require_user
 import os
 import logging
-import bcrypt
+from backend.services.password_hasher import HasherBusyError
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -35,15 +35,12 @@ def register():
             current_app.logger.error(f"Email {data['email']} already exists")
             return jsonify({'error': 'Email already exists'}), 400
         
-        # Create new user with bcrypt password hash
+        # Create new user; the password is hashed once, on the hashing pool
         current_app.logger.info("Creating new user")
-        salt = bcrypt.gensalt()
-        password_hash = bcrypt.hashpw(data['password'].encode('utf-8'), salt).decode('utf-8')
-        
         new_user = User(
             username=data['username'],
             email=data['email'],
-            password=password_hash,
+            password=data['password'],
             fitness_level=data.get('fitness_level', 'beginner'),
             modelscope_api_key=data.get('modelscope_api_key'),
             fish_audio_api_key=data.get('fish_audio_api_key')
@@ -75,6 +72,9 @@ def register():
         current_app.logger.info("Registration completed successfully")
         return jsonify(response_data), 201
         
+    except HasherBusyError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         current_app.logger.error(f"Registration error: {str(e)}")
         current_app.logger.error(f"Error type: {type(e)}")
@@ -102,10 +102,14 @@ def login():
             current_app.logger.error("User not found")
             return jsonify({'error': 'Invalid email or password'}), 401
             
-        # Verify password using bcrypt
-        if not bcrypt.checkpw(data['password'].encode('utf-8'), user.password.encode('utf-8')):
+        # Verify password; outdated hashes are upgraded in place
+        previous_hash = user.password
+        if not user.check_password(data['password']):
             current_app.logger.error("Invalid password")
             return jsonify({'error': 'Invalid email or password'}), 401
+        if user.password != previous_hash:
+            current_app.logger.info("Rehashing password with current parameters")
+            db.session.commit()
         
         # Generate token
         current_app.logger.info("Generating JWT token")
@@ -127,6 +131,8 @@ def login():
         current_app.logger.info("Login completed successfully")
         return jsonify(response_data), 200
         
+    except HasherBusyError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         current_app.logger.error(f"Login error: {str(e)}")
         current_app.logger.error(f"Error type: {type(e)}")
@@ -135,35 +141,11 @@ def login():
         return jsonify({'error': f'Failed to login: {str(e)}'}), 500
 
 @auth_bp.route('/api-keys', methods=['GET', 'POST'])
-def manage_api_keys():
+@require_user
+def manage_api_keys(user):
     try:
         current_app.logger.info("Starting API keys management")
         
-        # Get authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            current_app.logger.error("No valid authorization header")
-            return jsonify({'error': 'No valid authorization header'}), 401
-            
-        token = auth_header.split(' ')[1]
-        
-        try:
-            # Decode JWT token
-            payload = jwt.decode(token, os.getenv('JWT_SECRET_KEY'), algorithms=['HS256'])
-            user_id = payload['user_id']
-        except jwt.ExpiredSignatureError:
-            current_app.logger.error("Token has expired")
-            return jsonify({'error': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
-            current_app.logger.error("Invalid token")
-            return jsonify({'error': 'Invalid token'}), 401
-            
-        # Find user
-        user = User.query.get(user_id)
-        if not user:
-            current_app.logger.error("User not found")
-            return jsonify({'error': 'User not found'}), 404
-            
         if request.method == 'GET':
             # Return API keys
             return jsonify({
@@ -193,36 +175,12 @@ def manage_api_keys():
         return jsonify({'error': f'Failed to manage API keys: {str(e)}'}), 500
 
 @auth_bp.route('/modelscope-key', methods=['POST'])
-def update_modelscope_key():
+@require_user
+def update_modelscope_key(user):
     try:
         current_app.logger.info("Starting ModelScope API key update")
         data = request.get_json()
         
-        # Get authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            current_app.logger.error("No valid authorization header")
-            return jsonify({'error': 'No valid authorization header'}), 401
-            
-        token = auth_header.split(' ')[1]
-        
-        try:
-            # Decode JWT token
-            payload = jwt.decode(token, os.getenv('JWT_SECRET_KEY'), algorithms=['HS256'])
-            user_id = payload['user_id']
-        except jwt.ExpiredSignatureError:
-            current_app.logger.error("Token has expired")
-            return jsonify({'error': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
-            current_app.logger.error("Invalid token")
-            return jsonify({'error': 'Invalid token'}), 401
-            
-        # Find user
-        user = User.query.get(user_id)
-        if not user:
-            current_app.logger.error("User not found")
-            return jsonify({'error': 'User not found'}), 404
-            
         # Update API key
         user.modelscope_api_key = data.get('api_key')
         db.session.commit()
@@ -1,16 +1,39 @@
-from flask import Blueprint, request, jsonify, current_app
-from functools import wraps
-import jwt
-from backend.models.user import User
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+import json
+import csv
+import io
+import base64
+from datetime import datetime, timedelta
+from backend.models import db
+from backend.models.workout import Workout
+from backend.models.stats import UserStats, UserDailyStats
+from backend.models.knowledge_file import KnowledgeFile
+from backend.models.workout_series import WorkoutSeries
 from backend.services.fitness_plan import FitnessPlanService
+from backend.agents.trainer import Trainer
+from backend.agents.nutritionist import Nutritionist
+from backend.services.food_database import get_food_database
 from backend.services.agent_manager import AgentManager
+from backend.services.upload_store import UploadStore, UploadTooLargeError, upload_too_large_message
+from backend.services.workout_writer import GroupCommitWriter
+from backend.services.workout_series import parse_series, parse_interval, save_series, downsample
+from backend.services.workout_import import WorkoutImporter, PARSERS, SUPPORTED_FORMATS
+from backend.services.exercise_progress import record_sets, progress_for_user
+from backend.utils.pagination import encode_cursor, decode_cursor
+from backend.utils.database import read_replica
+from backend.utils.auth import require_auth, require_user
 import os
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
 def init_fitness_bp():
     fitness_bp = Blueprint('fitness', __name__, url_prefix='/api/fitness')
     fitness_service = None
     agent_manager = None
+    upload_store = None
+    workout_writer = None
+    trainer = None
+    nutritionist = None
 
     def get_fitness_service():
         nonlocal fitness_service
@@ -24,71 +47,294 @@ def init_fitness_bp():
             agent_manager = AgentManager()
         return agent_manager
 
-    def token_required(f):
-        @wraps(f)
-        def decorated(*args, **kwargs):
-            token = None
-            if 'Authorization' in request.headers:
-                token = request.headers['Authorization'].split(' ')[1]
-            
-            if not token:
-                return jsonify({'message': 'Token is missing'}), 401
-            
-            try:
-                data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-                current_user = User.query.filter_by(id=data['user_id']).first()
-            except:
-                return jsonify({'message': 'Token is invalid'}), 401
-            
-            return f(current_user, *args, **kwargs)
-        return decorated
+    def get_upload_store():
+        nonlocal upload_store
+        if upload_store is None:
+            upload_store = UploadStore(
+                current_app.config['UPLOAD_FOLDER'],
+                max_file_size=current_app.config.get('MAX_UPLOAD_FILE_SIZE')
+            )
+        return upload_store
+
+    def get_workout_writer():
+        nonlocal workout_writer
+        if workout_writer is None:
+            workout_writer = GroupCommitWriter.from_app(current_app._get_current_object())
+        return workout_writer
+
+    def get_trainer():
+        nonlocal trainer
+        if trainer is None:
+            trainer = Trainer(model_config={})
+        return trainer
+
+    def get_nutritionist():
+        nonlocal nutritionist
+        if nutritionist is None:
+            nutritionist = Nutritionist(model_config={})
+        return nutritionist
 
     @fitness_bp.route('/plan', methods=['POST'])
-    @token_required
-    def create_fitness_plan(current_user):
+    @require_auth
+    def create_fitness_plan(user_id):
         """Create a personalized fitness plan."""
         try:
             data = request.get_json()
             service = get_fitness_service()
-            plan = service.create_fitness_plan(current_user.id, data)
+            plan = service.create_fitness_plan(user_id, data)
             return jsonify(plan), 200
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @fitness_bp.route('/workout', methods=['POST'])
-    @token_required
-    def log_workout(current_user):
-        data = request.get_json()
-        
-        workout = Workout(
-            user_id=current_user.id,
-            type=data['type'],
-            duration=data['duration'],
-            exercises=data['exercises'],
-            notes=data.get('notes', '')
-        )
+    @require_auth
+    def log_workout(user_id):
+        data = request.get_json() or {}
+        for field in ('type', 'duration'):
+            if field not in data:
+                return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        workout.save()
+        workout = Workout(user_id=user_id)
+        try:
+            workout.update_from_dict(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Get AI feedback
-        feedback = get_agent_manager().get_workout_feedback(workout)
+        # Daily stats and streaks are updated in the same transaction
+        if current_app.config.get('WORKOUT_GROUP_COMMIT'):
+            workout = get_workout_writer().submit(workout)
+        else:
+            workout.save()
+        
+        # Get AI feedback; a new workout has no sensor streams to load
+        feedback = get_agent_manager().get_workout_feedback(workout, include_series=False)
         
         return jsonify({
             'workout': workout.to_dict(),
             'feedback': feedback
         })
 
+    @fitness_bp.route('/workout/<int:workout_id>/feedback', methods=['GET'])
+    @require_auth
+    def get_workout_feedback(user_id, workout_id):
+        """AI feedback for a single workout, e.g. one that was bulk imported."""
+        workout = Workout.query.filter_by(id=workout_id, user_id=user_id).first()
+        if not workout:
+            return jsonify({'error': 'Workout not found'}), 404
+        
+        feedback = get_agent_manager().get_workout_feedback(workout)
+        return jsonify({'workout': workout.to_dict(), 'feedback': feedback}), 200
+
+    @fitness_bp.route('/workout/<int:workout_id>/series', methods=['PUT'])
+    @require_auth
+    def upload_workout_series(user_id, workout_id):
+        """Store sensor streams, e.g. {"heart_rate": [...], "interval": 1} or {"power": {"times": [...], "values": [...]}}."""
+        workout = Workout.query.filter_by(id=workout_id, user_id=user_id).first()
+        if not workout:
+            return jsonify({'error': 'Workout not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        try:
+            interval = parse_interval(data.pop('interval', 1))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not data:
+            return jsonify({'error': f"Provide at least one of: {', '.join(WorkoutSeries.METRICS)}"}), 400
+        
+        try:
+            stored = [save_series(workout, metric, *parse_series(payload, interval))
+                      for metric, payload in data.items()]
+            db.session.commit()
+        except (ValueError, TypeError) as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({'series': [series.to_dict() for series in stored]}), 200
+
+    @fitness_bp.route('/workout/<int:workout_id>/series', methods=['GET'])
+    @read_replica
+    @require_auth
+    def get_workout_series(user_id, workout_id):
+        """Series summaries, or samples for ?metric=..., averaged into ?resolution= second buckets."""
+        workout = Workout.query.filter_by(id=workout_id, user_id=user_id).first()
+        if not workout:
+            return jsonify({'error': 'Workout not found'}), 404
+        
+        metric = request.args.get('metric')
+        if not metric:
+            return jsonify({'series': [series.to_dict() for series in workout.series]}), 200
+        
+        series = WorkoutSeries.query.filter_by(workout_id=workout.id, metric=metric).first()
+        if not series:
+            return jsonify({'error': 'Series not found'}), 404
+        
+        result = series.to_dict()
+        times, values = series.arrays()
+        resolution = request.args.get('resolution', type=float)
+        if resolution:
+            times, values = downsample(times, values, resolution)
+        result['times'] = times.tolist()
+        result['values'] = values.tolist()
+        return jsonify(result), 200
+
+    @fitness_bp.route('/workouts/import', methods=['POST'])
+    @require_auth
+    def import_workouts(user_id):
+        """Bulk import workouts from an NDJSON, CSV or GPX body or a multipart 'file' upload."""
+        if 'file' in request.files:
+            upload = request.files['file']
+            stream = upload.stream
+            default_format = os.path.splitext(upload.filename or '')[1].lstrip('.').lower()
+        else:
+            stream = request.stream
+            content_type = request.mimetype or ''
+            default_format = ('csv' if 'csv' in content_type else
+                              'gpx' if 'gpx' in content_type or content_type.endswith('/xml') else
+                              'ndjson')
+        import_format = request.args.get('format', default_format).lower()
+        if import_format == 'jsonl':
+            import_format = 'ndjson'
+        if import_format not in SUPPORTED_FORMATS:
+            return jsonify({'error': f"Format must be one of: {', '.join(SUPPORTED_FORMATS)}"}), 400
+        
+        importer = WorkoutImporter(batch_size=current_app.config.get('WORKOUT_IMPORT_BATCH_SIZE', 1000))
+        try:
+            result = importer.run(user_id, PARSERS[import_format](stream))
+        except Exception as e:
+            current_app.logger.error(f'Workout import failed: {str(e)}')
+            return jsonify({'error': 'Workout import failed'}), 500
+        
+        # Feedback is not generated during import; fetch it per workout via /workout/<id>/feedback
+        status = 400 if result['imported'] == 0 and (result['failed'] or result['aborted']) else 200
+        return jsonify(result), status
+
+    @fitness_bp.route('/workout/<int:workout_id>', methods=['PUT', 'DELETE'])
+    @require_auth
+    def edit_workout(user_id, workout_id):
+        """Update or delete one of the user's workouts."""
+        workout = Workout.query.filter_by(id=workout_id, user_id=user_id).first()
+        if not workout:
+            return jsonify({'error': 'Workout not found'}), 404
+        
+        if request.method == 'DELETE':
+            workout.delete()
+            return jsonify({'message': 'Workout deleted'}), 200
+        
+        try:
+            workout.update_from_dict(request.get_json() or {})
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        workout.save()
+        return jsonify({'workout': workout.to_dict()}), 200
+
     @fitness_bp.route('/workouts', methods=['GET'])
-    @token_required
-    def get_workouts(current_user):
-        user_id = current_user.id
+    @read_replica
+    @require_auth
+    def get_workouts(user_id):
+        """Get a page of the user's workouts, newest first.
+
+        Query params: ``limit``, ``cursor`` (``next_cursor`` of the previous
+        page), ``start_date`` / ``end_date`` (ISO, end inclusive), ``type`` and
+        ``fields`` (comma separated column names).
+        """
+        try:
+            default_limit = current_app.config.get('WORKOUTS_PAGE_SIZE', 50)
+            max_limit = current_app.config.get('WORKOUTS_MAX_PAGE_SIZE', 500)
+            limit = min(max(int(request.args.get('limit', default_limit)), 1), max_limit)
+            
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor) if cursor else None
+            
+            fields = None
+            if request.args.get('fields'):
+                fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+                unknown = [field for field in fields if field not in Workout.FIELDS]
+                if unknown:
+                    return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+            
+            start_date = request.args.get('start_date')
+            end_date = request.args.get('end_date')
+            start = datetime.fromisoformat(start_date) if start_date else None
+            end = datetime.fromisoformat(end_date) if end_date else None
+            if end is not None and len(end_date) == 10:
+                end += timedelta(days=1)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        workouts, has_more = Workout.keyset_page(
+            user_id,
+            limit,
+            after=after,
+            fields=fields,
+            start_date=start,
+            end_date=end,
+            workout_type=request.args.get('type')
+        )
         
-        workouts = Workout.query.filter_by(user_id=user_id).all()
-        return jsonify([w.to_dict() for w in workouts])
+        next_cursor = None
+        if has_more:
+            last = workouts[-1]
+            next_cursor = encode_cursor(last['date'], last['id'])
+        
+        return jsonify({
+            'workouts': workouts,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        })
+
+    @fitness_bp.route('/workouts/export', methods=['GET'])
+    @read_replica
+    @require_auth
+    def export_workouts(user_id):
+        """Stream the user's full workout history as NDJSON (default) or CSV."""
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in ('ndjson', 'csv'):
+            return jsonify({'error': 'Format must be ndjson or csv'}), 400
+        
+        fields = list(Workout.FIELDS)
+        if request.args.get('fields'):
+            fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in Workout.FIELDS]
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+        
+        batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+        batches = Workout.iter_for_user(user_id, fields=fields, batch_size=batch_size)
+        
+        def generate_ndjson():
+            for batch in batches:
+                yield ''.join(json.dumps(row) + '\n' for row in batch)
+        
+        def generate_csv():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=fields)
+            writer.writeheader()
+            yield buffer.getvalue()
+            for batch in batches:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(batch)
+                yield buffer.getvalue()
+        
+        if export_format == 'csv':
+            body, mimetype = generate_csv(), 'text/csv'
+        else:
+            body, mimetype = generate_ndjson(), 'application/x-ndjson'
+        
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={
+                'Content-Disposition': f'attachment; filename=workouts.{export_format}',
+                'X-Accel-Buffering': 'no'
+            }
+        )
 
     @fitness_bp.route('/progress', methods=['GET'])
-    @token_required
-    def get_progress(current_user):
+    @require_auth
+    def get_progress(user_id):
         """Get user's fitness progress."""
         try:
             start_date = request.args.get('start_date')
@@ -98,7 +344,7 @@ def init_fitness_bp():
                 return jsonify({'error': 'Start date and end date are required'}), 400
                 
             progress = get_fitness_service().calculate_progress(
-                current_user.id,
+                user_id,
                 start_date,
                 end_date
             )
@@ -107,7 +353,7 @@ def init_fitness_bp():
             return jsonify({'error': str(e)}), 500
 
     @fitness_bp.route('/recommendations', methods=['GET'])
-    @token_required
+    @require_user
     def get_recommendations(current_user):
         user = current_user
         
@@ -115,22 +361,116 @@ def init_fitness_bp():
         return jsonify(recommendations)
 
     @fitness_bp.route('/stats', methods=['GET'])
-    @token_required
-    def get_stats(current_user):
+    @read_replica
+    @require_auth
+    def get_stats(user_id):
         """Get user's fitness statistics."""
         try:
-            # Get basic stats
-            stats = {
-                'totalWorkouts': 0,  # Implement actual stats
-                'activeMinutes': 0,
-                'currentStreak': 0
-            }
+            # Totals and streaks are maintained on every workout write, so this is a primary-key lookup
+            summary = db.session.get(UserStats, user_id)
+            if summary is None:
+                stats = UserStats(user_id=user_id, total_workouts=0, total_minutes=0,
+                                  total_calories=0, active_days=0, current_streak=0, longest_streak=0).to_dict()
+            else:
+                stats = summary.to_dict()
+            
+            today = db.session.get(UserDailyStats, (user_id, datetime.utcnow().date()))
+            stats['today'] = today.to_dict() if today else None
             return jsonify(stats), 200
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
+    @fitness_bp.route('/exercises/sets', methods=['POST'])
+    @require_auth
+    def log_exercise_sets(user_id):
+        """Log one set or a list of sets; per-exercise progress is updated in place."""
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        sets = data.get('sets', [data])
+        if not isinstance(sets, list) or not sets:
+            return jsonify({'error': 'No sets provided'}), 400
+        if not all(isinstance(entry, dict) for entry in sets):
+            return jsonify({'error': 'Each set must be an object'}), 400
+        try:
+            progress = record_sets(user_id, sets)
+            db.session.commit()
+        except (ValueError, TypeError) as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error logging sets: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+        return jsonify({'exercises': [row.to_dict() for row in progress]}), 201
+
+    @fitness_bp.route('/exercises/progress', methods=['GET'])
+    @read_replica
+    @require_auth
+    def get_exercise_progress(user_id):
+        """Running bests, estimated 1RM and progression per exercise, without re-reading past sets."""
+        rows = progress_for_user(user_id, request.args.get('exercise'))
+        return jsonify(get_trainer().summarize_exercise_progress(rows)), 200
+
+    @fitness_bp.route('/foods', methods=['GET'])
+    @require_auth
+    def search_foods(user_id):
+        """Type-ahead search of the local food database."""
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        return jsonify({'foods': get_food_database().search(request.args.get('q', ''), limit)}), 200
+
+    @fitness_bp.route('/foods/totals', methods=['POST'])
+    @require_auth
+    def get_food_totals(user_id):
+        """Nutrient totals of a food log, e.g. ``[{"name": "banana", "servings": 2}]``."""
+        food_log = (request.get_json() or {}).get('items')
+        if not isinstance(food_log, list):
+            return jsonify({'error': 'items must be a list of foods'}), 400
+        try:
+            return jsonify(get_nutritionist().summarize_food_log(food_log)), 200
+        except (ValueError, TypeError, IndexError) as e:
+            return jsonify({'error': str(e)}), 400
+
+    @fitness_bp.route('/trends', methods=['GET'])
+    @read_replica
+    @require_auth
+    def get_trends(user_id):
+        """Per-type, weekly and trend statistics plus AI insights."""
+        start_date = request.args.get('start_date')
+        try:
+            start_date = datetime.fromisoformat(start_date) if start_date else None
+        except ValueError:
+            return jsonify({'error': 'start_date must be an ISO date'}), 400
+        return jsonify(get_agent_manager().analyze_trends(user_id, start_date=start_date)), 200
+
+    @fitness_bp.route('/training-load', methods=['GET'])
+    @read_replica
+    @require_auth
+    def get_training_load(user_id):
+        """Daily training load and ACWR series for the trend chart."""
+        try:
+            days = min(max(request.args.get('days', 90, type=int), 1), 3650)
+            # Duration in minutes stands in for session load; the 28-day window needs history before the chart starts
+            start_date = datetime.utcnow() - timedelta(days=days + get_trainer().CHRONIC_DAYS)
+            rows = [
+                {'date': row['date'], 'load': row['duration'] or 0}
+                for batch in Workout.iter_for_user(user_id, fields=['date', 'duration'], start_date=start_date)
+                for row in batch
+            ]
+            history = get_trainer().training_load_history(rows).tail(days)
+            if history.empty:
+                return jsonify({'days': []}), 200
+            history['date'] = history['date'].dt.strftime('%Y-%m-%d')
+            history = history.drop(columns='user_id').round(3).astype(object)
+            history = history.where(history.notna(), None)
+            return jsonify({'days': history.to_dict(orient='records')}), 200
+        except Exception as e:
+            current_app.logger.error(f"Error computing training load: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
     @fitness_bp.route('/goals', methods=['GET', 'POST'])
-    @token_required
+    @read_replica
+    @require_user
     def handle_fitness_goals(current_user):
         """Handle fitness goals endpoints."""
         try:
@@ -169,8 +509,8 @@ def init_fitness_bp():
             return jsonify({'error': str(e)}), 500
 
     @fitness_bp.route('/knowledge', methods=['POST'])
-    @token_required
-    def upload_knowledge(current_user):
+    @require_auth
+    def upload_knowledge(user_id):
         """Upload files to knowledge base."""
         try:
             if 'files' not in request.files:
@@ -184,41 +524,138 @@ def init_fitness_bp():
                 
             # Process and store files
             stored_files = []
+            duplicate_files = []
             for file in files:
                 if file.filename:
-                    # Save file and process for RAG
+                    # Stream file to content-addressed storage, hashing as it is written
                     filename = secure_filename(file.filename)
-                    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], category, filename)
-                    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                    file.save(filepath)
+                    stored = get_upload_store().save_stream(file.stream, os.path.splitext(filename)[1])
+                    
+                    # Identical content was already ingested, skip extraction and embedding
+                    if KnowledgeFile.query.filter_by(sha256=stored['sha256']).first():
+                        duplicate_files.append(filename)
+                        continue
                     
-                    # Process file for RAG (implement this in a service)
-                    get_agent_manager().process_knowledge_file(filepath, category)
+                    # Process file for RAG
+                    chunk_count = get_agent_manager().process_knowledge_file(
+                        stored['path'], category, source=filename
+                    )
+                    
+                    db.session.add(KnowledgeFile(
+                        sha256=stored['sha256'],
+                        filename=filename,
+                        category=category,
+                        path=stored['path'],
+                        size=stored['size'],
+                        chunk_count=chunk_count,
+                        user_id=user_id
+                    ))
+                    db.session.commit()
                     
                     stored_files.append(filename)
             
             return jsonify({
                 'message': 'Files uploaded successfully',
-                'files': stored_files
+                'files': stored_files,
+                'duplicates': duplicate_files
             }), 200
+        except UploadTooLargeError as e:
+            return jsonify({'error': str(e)}), 413
+        except RequestEntityTooLarge:
+            return jsonify({'error': upload_too_large_message(current_app.config['MAX_UPLOAD_FILE_SIZE'])}), 413
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
+    def get_audio_source():
+        """Multipart ``audio`` upload, or a raw ``audio/*`` request body read straight from the stream."""
+        if 'audio' in request.files:
+            return request.files['audio']
+        if request.mimetype and request.mimetype.startswith('audio/'):
+            return request.stream
+        return None
+
+    @fitness_bp.route('/voice/transcribe', methods=['POST'])
+    @require_auth
+    def transcribe_voice(user_id):
+        """Stream partial transcripts as newline-delimited JSON."""
+        audio_file = get_audio_source()
+        if audio_file is None:
+            return jsonify({'error': 'No audio file provided'}), 400
+        
+        def generate():
+            for partial in get_agent_manager().stream_audio_transcript(audio_file):
+                yield json.dumps(partial) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    @fitness_bp.route('/voice/stream', methods=['POST'])
+    @require_auth
+    def stream_voice_command(user_id):
+        """Pipelined voice turn, streamed as NDJSON transcript/sentence/audio events."""
+        audio_file = get_audio_source()
+        if audio_file is None:
+            return jsonify({'error': 'No audio file provided'}), 400
+        
+        def generate():
+            for event in get_agent_manager().run_voice_pipeline(audio_file, user_id):
+                yield json.dumps(event) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                        headers={'X-Accel-Buffering': 'no'})
+
+    @fitness_bp.route('/voice/speak', methods=['POST'])
+    @require_auth
+    def speak(user_id):
+        """Stream synthesized speech as chunked binary audio, or as SSE with ?format=sse."""
+        data = request.get_json() or {}
+        text = data.get('text')
+        if not text:
+            return jsonify({'error': 'No text provided'}), 400
+        
+        manager = get_agent_manager()
+        voice_service = manager.voice_service
+        if not voice_service.api_key:
+            return jsonify({'error': 'Please configure your Fish Audio API key.'}), 400
+        
+        if request.args.get('format') == 'sse':
+            def generate_events():
+                try:
+                    for chunk in manager.stream_voice_response(text):
+                        yield f"data: {base64.b64encode(chunk).decode('utf-8')}\n\n"
+                    yield 'event: done\ndata: {}\n\n'
+                except Exception as e:
+                    current_app.logger.error(f'Text to speech stream error: {str(e)}')
+                    yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            
+            return Response(stream_with_context(generate_events()), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        
+        def generate_audio():
+            try:
+                yield from manager.stream_voice_response(text)
+            except Exception as e:
+                # Headers are already sent, so the client sees a truncated stream
+                current_app.logger.error(f'Text to speech stream error: {str(e)}')
+        
+        return Response(stream_with_context(generate_audio()), mimetype=f'audio/{voice_service.tts_format}',
+                        headers={'X-Accel-Buffering': 'no'})
+
     @fitness_bp.route('/voice', methods=['POST'])
-    @token_required
-    def handle_voice_command(current_user):
+    @require_auth
+    def handle_voice_command(user_id):
         """Handle voice commands using Fish Audio."""
         try:
-            if 'audio' not in request.files:
+            audio_file = get_audio_source()
+            if audio_file is None:
                 return jsonify({'error': 'No audio file provided'}), 400
-                
-            audio_file = request.files['audio']
             
             # Process audio using Fish Audio service
-            text = get_agent_manager().process_audio(audio_file)
+            transcript = get_agent_manager().process_audio(audio_file)
+            if not transcript['success']:
+                return jsonify({'error': transcript['error']}), 502
             
             # Process the command
-            response = get_agent_manager().process_voice_command(text, current_user.id)
+            response = get_agent_manager().process_voice_command(transcript['text'], user_id)
             
             # Generate audio response
             audio_response = get_agent_manager().generate_voice_response(response)
@@ -1,12 +1,18 @@
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 from flask_migrate import Migrate
 from dotenv import load_dotenv
+from werkzeug.exceptions import RequestEntityTooLarge
+import hmac
 import os
+import threading
 
 from backend.models import db, migrate
 from backend.api.auth import auth_bp
 from backend.api.fitness import init_fitness_bp
+from backend.utils.metrics import metrics
+from backend.services.upload_store import upload_too_large_message
+from backend.utils.database import configure_database, configure_sqlite, register_pool_metrics
 
 def create_app():
     # Load environment variables
@@ -30,14 +36,42 @@ def create_app():
     })
     
     # Configure database
+    # DATABASE_URL (e.g. postgresql://...) wins; the local SQLite file is the fallback
     db_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'fitness.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    configure_database(app, default_url=f'sqlite:///{db_path}')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
     
+    # Configure knowledge base uploads
+    app.config['UPLOAD_FOLDER'] = os.getenv(
+        'UPLOAD_FOLDER',
+        os.path.join(os.path.abspath(os.path.dirname(__file__)), 'data', 'uploads')
+    )
+    app.config['MAX_UPLOAD_FILE_SIZE'] = int(os.getenv('MAX_UPLOAD_FILE_SIZE', 20 * 1024 * 1024))
+    # Oversized bodies get a 413 before Werkzeug parses them; 1 MB headroom for multipart framing
+    app.config['MAX_CONTENT_LENGTH'] = int(os.getenv(
+        'MAX_CONTENT_LENGTH', app.config['MAX_UPLOAD_FILE_SIZE'] + 1024 * 1024
+    ))
+    
+    # Configure workout history pagination
+    app.config['WORKOUTS_PAGE_SIZE'] = int(os.getenv('WORKOUTS_PAGE_SIZE', 50))
+    app.config['WORKOUTS_MAX_PAGE_SIZE'] = int(os.getenv('WORKOUTS_MAX_PAGE_SIZE', 500))
+    app.config['EXPORT_BATCH_SIZE'] = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    app.config['WORKOUT_IMPORT_BATCH_SIZE'] = int(os.getenv('WORKOUT_IMPORT_BATCH_SIZE', 1000))
+    
+    # Batch concurrent workout inserts into one commit (mainly for SQLite deployments)
+    app.config['WORKOUT_GROUP_COMMIT'] = os.getenv('WORKOUT_GROUP_COMMIT', 'false').lower() == 'true'
+    app.config['WORKOUT_GROUP_COMMIT_DELAY_MS'] = float(os.getenv('WORKOUT_GROUP_COMMIT_DELAY_MS', 5))
+    app.config['WORKOUT_GROUP_COMMIT_MAX_BATCH'] = int(os.getenv('WORKOUT_GROUP_COMMIT_MAX_BATCH', 200))
+    
+    # Bearer token for /metrics; without one it only answers local requests
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    
     # Initialize database and migrations
     db.init_app(app)
     migrate.init_app(app, db)
+    configure_sqlite(app, db)
+    register_pool_metrics(app, db)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -46,10 +80,30 @@ def create_app():
     fitness_bp = init_fitness_bp()
     app.register_blueprint(fitness_bp, url_prefix='/api/fitness')
     
+    # Optionally synthesize fixed voice phrases in the background
+    if os.getenv('TTS_PREWARM_ON_STARTUP', 'false').lower() == 'true':
+        from backend.services.tts_prewarm import prewarm
+        threading.Thread(target=prewarm, name='tts-prewarm', daemon=True).start()
+    
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_too_large(e):
+        return {'error': upload_too_large_message(app.config['MAX_UPLOAD_FILE_SIZE'])}, 413
+    
     @app.route('/health')
     def health_check():
         return {'status': 'healthy'}, 200
     
+    @app.route('/metrics')
+    def get_metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+                return {'error': 'Unauthorized'}, 401
+        elif request.remote_addr not in ('127.0.0.1', '::1'):
+            return {'error': 'Not found'}, 404
+        return metrics.snapshot(), 200
+    
     return app
 
 app = create_app()
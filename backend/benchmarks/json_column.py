@@ -0,0 +1,125 @@
+"""
+Benchmark per-row load cost of users.fitness_goals
+
+Usage:
+    python -m backend.benchmarks.json_column --users 20000
+
+Loads every user row from a throwaway SQLite database and reports the cost
+per row for:
+
+    stdlib JSON            the previous JSONType (json.loads on every load)
+    fast JSON              the current JSONType (orjson when installed)
+    ORM, goals deferred    User.query as auth does it; goals never read
+    ORM, goals accessed    User.query then reading user.fitness_goals per row
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from flask import Flask
+from sqlalchemy import insert, select, type_coerce
+from sqlalchemy.orm import undefer
+from sqlalchemy.types import TypeDecorator, TEXT
+
+from backend.models import db
+from backend.models.user import User, JSONType
+
+
+class StdlibJSONType(TypeDecorator):
+    """The JSONType implementation before the fast column type."""
+    impl = TEXT
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None:
+            return json.dumps(value)
+        return None
+
+    def process_result_value(self, value, dialect):
+        if value is not None:
+            return json.loads(value)
+        return None
+
+
+def sample_goals(i: int) -> dict:
+    return {
+        'primary': 'muscle_gain' if i % 2 else 'weight_loss',
+        'target_weight': 70 + i % 20,
+        'weekly_workouts': 3 + i % 4,
+        'preferred_types': ['strength', 'cardio', 'yoga'][: 1 + i % 3],
+        'schedule': {day: {'minutes': 30 + i % 30, 'focus': 'full body'}
+                     for day in ('mon', 'wed', 'fri', 'sat')},
+        'notes': 'Knee friendly exercises only. ' * 4,
+    }
+
+
+def per_row_us(fn, rows: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / rows * 1e6
+
+
+def run(users: int, repeat: int):
+    tmpdir = tempfile.mkdtemp()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    db.init_app(app)
+
+    try:
+        with app.app_context():
+            db.create_all()
+            now = datetime.utcnow()
+            db.session.execute(insert(User.__table__), [
+                {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'x',
+                 'fitness_goals': sample_goals(i), 'created_at': now, 'updated_at': now}
+                for i in range(1, users + 1)
+            ])
+            db.session.commit()
+
+            table = User.__table__
+            columns = [column for column in table.c if column.name != 'fitness_goals']
+
+            def core(json_type):
+                statement = select(*columns, type_coerce(table.c.fitness_goals, json_type))
+                return lambda: db.session.execute(statement).all()
+
+            def orm(access_goals: bool):
+                def load():
+                    db.session.expunge_all()
+                    query = User.query.options(undefer(User.fitness_goals)) if access_goals else User.query
+                    for user in query.all():
+                        if access_goals:
+                            user.fitness_goals
+                return load
+
+            results = {
+                'stdlib JSON': per_row_us(core(StdlibJSONType()), users, repeat),
+                'fast JSON': per_row_us(core(JSONType()), users, repeat),
+                'ORM, goals deferred': per_row_us(orm(False), users, repeat),
+                'ORM, goals accessed': per_row_us(orm(True), users, repeat),
+            }
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print(f"{users:,} users, best of {repeat}\n")
+    for name, cost in results.items():
+        print(f"{name:24} {cost:>8.2f} us/row")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.users, args.repeat)
+
+if __name__ == '__main__':
+    main()
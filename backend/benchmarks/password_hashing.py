@@ -0,0 +1,85 @@
+"""
+Benchmark login throughput of the password hasher
+
+Usage:
+    python -m backend.benchmarks.password_hashing --rounds 10 12 --clients 32
+
+For each bcrypt cost this reports:
+
+    per core     verifications/s of one thread calling bcrypt directly
+    pool         verifications/s through PasswordHasher with --clients
+                 concurrent callers, never using more than --workers cores
+    hash         time to hash one password
+    old register the previous bcrypt + PBKDF2 double hash, for comparison
+"""
+import argparse
+import os
+import threading
+import time
+
+import bcrypt
+from werkzeug.security import generate_password_hash
+
+from backend.services.password_hasher import PasswordHasher
+
+
+def per_core(rounds: int, seconds: float) -> float:
+    hashed = bcrypt.hashpw(b'correct horse', bcrypt.gensalt(rounds))
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        bcrypt.checkpw(b'correct horse', hashed)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def pooled(hasher: PasswordHasher, clients: int, seconds: float) -> float:
+    hashed = hasher.hash('correct horse')
+    counts = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(i):
+        while time.perf_counter() < deadline:
+            hasher.verify('correct horse', hashed)
+            counts[i] += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def old_register(rounds: int, samples: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(samples):
+        bcrypt_hash = bcrypt.hashpw(b'correct horse', bcrypt.gensalt(rounds)).decode('utf-8')
+        generate_password_hash(bcrypt_hash)
+    return (time.perf_counter() - start) / samples * 1000
+
+
+def run(rounds_list, clients: int, workers: int, seconds: float):
+    print(f"{os.cpu_count()} cores, {workers} hashing workers, {clients} concurrent clients\n")
+    print(f"{'rounds':>6} {'per core':>14} {'pool':>14} {'hash':>10} {'old register':>14}")
+    for rounds in rounds_list:
+        hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=clients)
+        start = time.perf_counter()
+        hasher.hash('correct horse')
+        hash_ms = (time.perf_counter() - start) * 1000
+        print(f"{rounds:>6} {per_core(rounds, seconds):>9.1f} /s {pooled(hasher, clients, seconds):>9.1f} /s "
+              f"{hash_ms:>7.1f} ms {old_register(rounds):>11.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 12])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=max((os.cpu_count() or 2) - 1, 1))
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+    run(args.rounds, args.clients, args.workers, args.seconds)
+
+if __name__ == '__main__':
+    main()
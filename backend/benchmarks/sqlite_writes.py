@@ -0,0 +1,122 @@
+"""
+Benchmark concurrent workout writes on SQLite
+
+Usage:
+    python -m backend.benchmarks.sqlite_writes --threads 16 --writes 200
+
+Each scenario gets a fresh database file and runs --threads writers that
+each log --writes workouts the way POST /workout does (ORM insert plus the
+daily stats update):
+
+    rollback journal   default SQLite settings, one commit per workout
+    wal + pragmas      apply_sqlite_pragmas(), one commit per workout
+    wal + group commit apply_sqlite_pragmas() and GroupCommitWriter
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+
+from backend.models import db
+from backend.models.workout import Workout
+from backend.services.workout_writer import GroupCommitWriter
+from backend.utils.database import apply_sqlite_pragmas
+
+
+def make_app(path: str, pragmas: bool) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': 64, 'max_overflow': 0}
+    db.init_app(app)
+    with app.app_context():
+        if pragmas:
+            apply_sqlite_pragmas(db.engine)
+        db.create_all()
+    return app
+
+
+def new_workout(user_id: int, i: int) -> Workout:
+    return Workout(user_id=user_id, name='Run', type='cardio', duration=30, calories_burned=300,
+                   date=datetime(2024, 1, 1) + timedelta(hours=i))
+
+
+def run_scenario(app: Flask, threads: int, writes: int, writer: GroupCommitWriter = None) -> dict:
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(user_id):
+        for i in range(writes):
+            start = time.perf_counter()
+            try:
+                if writer is not None:
+                    writer.submit(new_workout(user_id, i))
+                else:
+                    with app.app_context():
+                        db.session.add(new_workout(user_id, i))
+                        db.session.commit()
+            except OperationalError as e:
+                with lock:
+                    errors.append(str(e.orig))
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(user_id,)) for user_id in range(1, threads + 1)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'writes_per_s': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] if latencies else 0.0,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        'errors': len(errors),
+    }
+
+
+def run(threads: int, writes: int, delay_ms: float):
+    tmpdir = tempfile.mkdtemp()
+    results = {}
+    try:
+        for name, pragmas, group_commit in [
+            ('rollback journal', False, False),
+            ('wal + pragmas', True, False),
+            ('wal + group commit', True, True),
+        ]:
+            app = make_app(os.path.join(tmpdir, f"{name.replace(' ', '_')}.db"), pragmas)
+            writer = GroupCommitWriter(app, max_delay_ms=delay_ms) if group_commit else None
+            results[name] = run_scenario(app, threads, writes, writer)
+            with app.app_context():
+                db.engine.dispose()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print(f"{threads} writers x {writes} workouts\n")
+    print(f"{'scenario':20} {'writes/s':>10} {'p50':>10} {'p95':>10} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:20} {result['writes_per_s']:>10.0f} {result['p50_ms']:>7.2f} ms "
+              f"{result['p95_ms']:>7.2f} ms {result['errors']:>7}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--writes', type=int, default=200, help='workouts logged per thread')
+    parser.add_argument('--delay-ms', type=float, default=5, help='group commit window')
+    args = parser.parse_args()
+    run(args.threads, args.writes, args.delay_ms)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark workout queries with and without the composite indexes
+
+Usage:
+    python -m backend.benchmarks.workout_queries --rows 10000000 --users 10000
+
+Builds a throwaway SQLite database (or uses --database-url), times the
+per-user history, date-range and per-type queries on the bare table, then
+creates ix_workouts_user_id_date / ix_workouts_user_id_type_date and times
+them again.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, create_engine, select, insert
+
+from backend.models import db
+from backend.models.user import User
+from backend.models.workout import Workout
+
+WORKOUT_TYPES = ['strength', 'cardio', 'flexibility', 'hiit', 'yoga']
+
+
+def populate(engine, rows: int, users: int, batch_size: int = 50000):
+    table = Workout.__table__
+    start = datetime(2020, 1, 1)
+    now = datetime.utcnow()
+    rng = random.Random(42)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'x',
+             'created_at': now, 'updated_at': now}
+            for i in range(1, users + 1)
+        ])
+
+    inserted = 0
+    while inserted < rows:
+        count = min(batch_size, rows - inserted)
+        batch = [
+            {
+                'user_id': rng.randint(1, users),
+                'name': 'Workout',
+                'type': rng.choice(WORKOUT_TYPES),
+                'duration': rng.randint(10, 120),
+                'calories_burned': rng.randint(50, 1000),
+                'completed': True,
+                'date': start + timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 5)),
+                'created_at': now,
+                'updated_at': now
+            }
+            for _ in range(count)
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(Workout.__table__), batch)
+        inserted += count
+    return table
+
+
+def time_query(engine, statement, params_list, repeat: int = 1) -> dict:
+    samples = []
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            for params in params_list:
+                start = time.perf_counter()
+                conn.execute(statement, params).fetchall()
+                samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def run(rows: int, users: int, samples: int, database_url: str = None):
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.mkdtemp()
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    try:
+        engine = create_engine(database_url)
+
+        db.metadata.create_all(engine, tables=[User.__table__, Workout.__table__])
+        indexes = list(Workout.__table__.indexes)
+        for index in indexes:
+            index.drop(engine)
+
+        print(f"Populating {rows:,} workouts for {users:,} users...")
+        start = time.perf_counter()
+        table = populate(engine, rows, users)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(7)
+        range_start = datetime(2023, 1, 1)
+        range_end = datetime(2023, 4, 1)
+        user_ids = [rng.randint(1, users) for _ in range(samples)]
+        queries = {
+            'history (user_id)': (
+                select(table).where(table.c.user_id == bindparam('user_id')).order_by(table.c.date),
+                [{'user_id': u} for u in user_ids]
+            ),
+            'progress (user_id, date range)': (
+                select(table).where(
+                    table.c.user_id == bindparam('user_id'),
+                    table.c.date >= range_start,
+                    table.c.date < range_end
+                ).order_by(table.c.date),
+                [{'user_id': u} for u in user_ids]
+            ),
+            'per-type (user_id, type, date range)': (
+                select(table).where(
+                    table.c.user_id == bindparam('user_id'),
+                    table.c.type == bindparam('type'),
+                    table.c.date >= range_start,
+                    table.c.date < range_end
+                ).order_by(table.c.date),
+                [{'user_id': u, 'type': rng.choice(WORKOUT_TYPES)} for u in user_ids]
+            ),
+        }
+
+        results = {}
+        for name, (statement, params) in queries.items():
+            results[name] = {'before': time_query(engine, statement, params)}
+
+        start = time.perf_counter()
+        for index in indexes:
+            index.create(engine)
+        print(f"Index build: {time.perf_counter() - start:.1f}s")
+        if engine.dialect.name == 'sqlite':
+            with engine.begin() as conn:
+                conn.exec_driver_sql('ANALYZE')
+
+        for name, (statement, params) in queries.items():
+            results[name]['after'] = time_query(engine, statement, params)
+
+        print(f"\n{'query':40} {'before (median)':>16} {'after (median)':>16} {'speedup':>9}")
+        for name, result in results.items():
+            before = result['before']['median_ms']
+            after = result['after']['median_ms']
+            speedup = before / after if after else float('inf')
+            print(f"{name:40} {before:>13.3f} ms {after:>13.3f} ms {speedup:>8.1f}x")
+
+        engine.dispose()
+        return results
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--samples', type=int, default=20, help='queries timed per scenario')
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+    run(args.rows, args.users, args.samples, args.database_url)
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,17 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-import bcrypt
+from backend.utils.database import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 # Import models here to ensure they are registered with SQLAlchemy
 from .user import User
 from .workout import Workout
+from .knowledge_file import KnowledgeFile
+from .stats import UserDailyStats, UserStats
+from .workout_series import WorkoutSeries
+from .exercise_progress import ExerciseProgress
 
 def init_db(app):
     """Initialize the database with the app context."""
@@ -22,15 +26,11 @@ def init_db(app):
         try:
             test_user = User.query.filter_by(username='test@example.com').first()
             if not test_user:
-                # Create password hash
-                password = 'test123'
-                salt = bcrypt.gensalt()
-                password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
-                
+                # User hashes the password itself
                 test_user = User(
                     username='test@example.com',
                     email='test@example.com',
-                    password=password_hash,
+                    password='test123',
                     fitness_level='intermediate'
                 )
                 db.session.add(test_user)
@@ -38,3 +38,6 @@ def init_db(app):
         except Exception as e:
             print(f"Error creating test user: {str(e)}")
             # Continue even if there's an error, as tables might not exist yet
+
+# Keeps user_daily_stats / user_stats in step with every workout write
+from backend.services import stats_tracker
@@ -0,0 +1,138 @@
+from bisect import bisect_left
+
+from . import db
+from .user import JSONType
+from datetime import datetime, date
+
+
+def estimate_1rm(weight: float, reps: int) -> float:
+    """
+    Estimated one-rep max of a set
+
+    Brzycki up to 10 reps, where it tracks tested maxes best, Epley above
+    that (Brzycki breaks down as reps approach 37).
+    """
+    if weight <= 0 or reps <= 0:
+        return 0.0
+    if reps == 1:
+        return float(weight)
+    if reps <= 10:
+        return weight * 36.0 / (37 - reps)
+    return weight * (1 + reps / 30.0)
+
+
+class ExerciseProgress(db.Model):
+    """Per-user, per-exercise running bests and a bounded progression series, updated per logged set."""
+    __tablename__ = 'exercise_progress'
+
+    # Progression points kept per exercise; older points are merged pairwise beyond this
+    MAX_POINTS = 64
+    # Most recent sessions always kept at full resolution
+    RECENT_POINTS = 8
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    exercise = db.Column(db.String(100), primary_key=True)  # normalized, see normalize_name
+    set_count = db.Column(db.Integer, nullable=False, default=0)
+    max_weight = db.Column(db.Float, nullable=False, default=0)
+    max_reps = db.Column(db.Integer, nullable=False, default=0)
+    total_volume = db.Column(db.Float, nullable=False, default=0)
+    best_e1rm = db.Column(db.Float, nullable=False, default=0)
+    best_e1rm_day = db.Column(db.Date, nullable=True)
+    last_day = db.Column(db.Date, nullable=True)
+    progression = db.Column(JSONType, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        return ' '.join((name or '').lower().split())[:100]
+
+    def add_set(self, weight: float, reps: int, day: date = None):
+        """
+        Folds one set into the running totals; constant work per set
+
+        Sets on the same day share one progression point (the session), which
+        keeps the heaviest set, the best e1RM and the summed volume.
+        """
+        weight = round(float(weight or 0), 2)
+        reps = int(reps or 0)
+        day = day or datetime.utcnow().date()
+        volume = weight * reps
+        e1rm = estimate_1rm(weight, reps)
+
+        self.set_count = (self.set_count or 0) + 1
+        self.max_weight = max(self.max_weight or 0, weight)
+        self.max_reps = max(self.max_reps or 0, reps)
+        self.total_volume = (self.total_volume or 0) + volume
+        if e1rm > (self.best_e1rm or 0):
+            self.best_e1rm = e1rm
+            self.best_e1rm_day = day
+        if self.last_day is None or day > self.last_day:
+            self.last_day = day
+
+        # Reassign rather than mutate in place so the JSON column is flagged dirty
+        points = list(self.progression or [])
+        key = day.isoformat()
+        index = bisect_left([point['date'] for point in points], key)
+        if index < len(points) and self._covers(points, index, key):
+            point = dict(points[index])
+            point['weight'] = max(point['weight'], weight)
+            point['reps'] = max(point['reps'], reps)
+            # Merged points hold the mean session volume, so spread the set over their sessions
+            point['volume'] = round(point['volume'] + volume / point.get('sessions', 1), 2)
+            point['e1rm'] = max(point['e1rm'], round(e1rm, 2))
+            points[index] = point
+        else:
+            points.insert(index, {
+                'date': key, 'sessions': 1, 'weight': weight, 'reps': reps,
+                'volume': round(volume, 2), 'e1rm': round(e1rm, 2)
+            })
+            if len(points) > self.MAX_POINTS:
+                points = self._compact(points)
+        self.progression = points
+
+    @staticmethod
+    def _covers(points, index, key) -> bool:
+        """
+        Whether the point at ``index`` (the first one dated on or after ``key``) takes a set from ``key``
+
+        A session point only takes sets from its own day. A merged point is
+        dated by its last session and spans back to the previous point, so a
+        backfilled set inside that span is folded into it.
+        """
+        point = points[index]
+        if point['date'] == key:
+            return True
+        return point.get('sessions', 1) > 1 and index > 0
+
+    def _compact(self, points):
+        """Halves the resolution of everything but the recent sessions, so merges are amortized O(1) per set."""
+        older, recent = points[:-self.RECENT_POINTS], points[-self.RECENT_POINTS:]
+        merged = []
+        for first, second in zip(older[::2], older[1::2]):
+            sessions = first.get('sessions', 1) + second.get('sessions', 1)
+            merged.append({
+                'date': second['date'],
+                'sessions': sessions,
+                'weight': max(first['weight'], second['weight']),
+                'reps': max(first['reps'], second['reps']),
+                # Mean session volume, so merged points stay comparable to single sessions
+                'volume': round((first['volume'] * first.get('sessions', 1) +
+                                 second['volume'] * second.get('sessions', 1)) / sessions, 2),
+                'e1rm': max(first['e1rm'], second['e1rm'])
+            })
+        if len(older) % 2:
+            merged.append(older[-1])
+        return merged + recent
+
+    def to_dict(self):
+        return {
+            'exercise': self.exercise,
+            'set_count': self.set_count or 0,
+            'max_weight': self.max_weight or 0,
+            'max_reps': self.max_reps or 0,
+            'total_volume': round(self.total_volume or 0, 2),
+            'estimated_1rm': round(self.best_e1rm or 0, 1),
+            'estimated_1rm_date': self.best_e1rm_day.isoformat() if self.best_e1rm_day else None,
+            'last_date': self.last_day.isoformat() if self.last_day else None,
+            'progression': self.progression or []
+        }
@@ -0,0 +1,27 @@
+from . import db
+from datetime import datetime
+
+class KnowledgeFile(db.Model):
+    """Registry of knowledge-base uploads, keyed by content hash."""
+    __tablename__ = 'knowledge_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    chunk_count = db.Column(db.Integer, default=0)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'sha256': self.sha256,
+            'filename': self.filename,
+            'category': self.category,
+            'size': self.size,
+            'chunk_count': self.chunk_count,
+            'created_at': self.created_at.isoformat()
+        }
@@ -0,0 +1,55 @@
+from . import db
+from .user import JSONType
+from datetime import datetime, date, timedelta
+
+class UserDailyStats(db.Model):
+    """Per-user, per-day workout aggregates, maintained incrementally on every workout write."""
+    __tablename__ = 'user_daily_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    workout_count = db.Column(db.Integer, nullable=False, default=0)
+    total_minutes = db.Column(db.Integer, nullable=False, default=0)
+    total_calories = db.Column(db.Integer, nullable=False, default=0)
+    type_counts = db.Column(JSONType, nullable=True)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'workout_count': self.workout_count,
+            'total_minutes': self.total_minutes,
+            'total_calories': self.total_calories,
+            'type_counts': self.type_counts or {}
+        }
+
+class UserStats(db.Model):
+    """Per-user running totals and materialized streaks, so /stats is a primary-key lookup."""
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total_workouts = db.Column(db.Integer, nullable=False, default=0)
+    total_minutes = db.Column(db.Integer, nullable=False, default=0)
+    total_calories = db.Column(db.Integer, nullable=False, default=0)
+    active_days = db.Column(db.Integer, nullable=False, default=0)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)  # run ending on last_active_day
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_active_day = db.Column(db.Date, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def live_streak(self, today: date = None) -> int:
+        """Current streak as of ``today``; a streak survives until a full day is missed."""
+        today = today or datetime.utcnow().date()
+        if self.last_active_day is None or self.last_active_day < today - timedelta(days=1):
+            return 0
+        return self.current_streak
+
+    def to_dict(self, today: date = None):
+        return {
+            'totalWorkouts': self.total_workouts,
+            'activeMinutes': self.total_minutes,
+            'totalCalories': self.total_calories,
+            'activeDays': self.active_days,
+            'currentStreak': self.live_streak(today),
+            'longestStreak': self.longest_streak,
+            'lastActiveDay': self.last_active_day.isoformat() if self.last_active_day else None
+        }
@@ -1,22 +1,33 @@
 from . import db
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import JSON
-from sqlalchemy.types import TypeDecorator, TEXT
-import json
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator, TEXT, JSON
+from backend.utils import fast_json
+from backend.services.password_hasher import get_password_hasher
 
 class JSONType(TypeDecorator):
+    """JSON column: JSONB on Postgres, native JSON on MySQL, orjson-encoded text elsewhere."""
     impl = TEXT
+    cache_ok = True
+
+    NATIVE_TYPES = {'postgresql': JSONB, 'mysql': JSON}
+
+    def load_dialect_impl(self, dialect):
+        native = self.NATIVE_TYPES.get(dialect.name)
+        if native is not None:
+            return dialect.type_descriptor(native())
+        return dialect.type_descriptor(TEXT())
 
     def process_bind_param(self, value, dialect):
-        if value is not None:
-            return json.dumps(value)
-        return None
+        if value is None or dialect.name in self.NATIVE_TYPES:
+            return value
+        return fast_json.dumps(value)
 
     def process_result_value(self, value, dialect):
-        if value is not None:
-            return json.loads(value)
-        return None
+        # Native columns arrive decoded; text columns (or not yet migrated ones) are parsed here
+        if isinstance(value, (str, bytes)):
+            return fast_json.loads(value)
+        return value
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -26,7 +37,8 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(128), nullable=False)
     fitness_level = db.Column(db.String(50), default='beginner')
-    fitness_goals = db.Column(JSONType, nullable=True)
+    # Deferred: loaded and decoded only when accessed, not on every auth lookup
+    fitness_goals = db.deferred(db.Column(JSONType, nullable=True))
     modelscope_api_key = db.Column(db.String(200), nullable=True)
     fish_audio_api_key = db.Column(db.String(200), nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -35,18 +47,30 @@ class User(db.Model):
     # Relationships
     workouts = db.relationship('Workout', backref='user', lazy=True)
 
-    def __init__(self, username, email, password, fitness_level=None, fitness_goals=None):
+    def __init__(self, username, email, password, fitness_level=None, fitness_goals=None,
+                 modelscope_api_key=None, fish_audio_api_key=None):
         self.username = username
         self.email = email
         self.set_password(password)
         self.fitness_level = fitness_level
         self.fitness_goals = fitness_goals or {}
+        self.modelscope_api_key = modelscope_api_key
+        self.fish_audio_api_key = fish_audio_api_key
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        """Hashes the plain-text ``password``."""
+        self.password = get_password_hasher().hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        """
+        Verifies ``password``, upgrading the stored hash if the hashing parameters changed
+
+        The caller commits; ``self.password`` is only modified for a valid password.
+        """
+        valid, new_hash = get_password_hasher().verify_and_update(password, self.password)
+        if new_hash:
+            self.password = new_hash
+        return valid
 
     def save(self):
         if not self.id:
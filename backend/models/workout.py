@@ -1,8 +1,15 @@
 from . import db
 from datetime import datetime
+from sqlalchemy import and_, or_, select
 
 class Workout(db.Model):
     __tablename__ = 'workouts'
+    __table_args__ = (
+        # Per-user history and date-range scans
+        db.Index('ix_workouts_user_id_date', 'user_id', 'date'),
+        # Per-type analytics within a date range
+        db.Index('ix_workouts_user_id_type_date', 'user_id', 'type', 'date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -16,6 +23,144 @@ class Workout(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Sensor streams (heart rate, pace, power), see WorkoutSeries
+    series = db.relationship('WorkoutSeries', backref='workout', lazy=True, cascade='all, delete-orphan')
+
+    FIELDS = (
+        'id', 'user_id', 'name', 'description', 'type', 'duration',
+        'calories_burned', 'completed', 'date', 'created_at', 'updated_at'
+    )
+
+    @classmethod
+    def for_user(cls, user_id, start_date=None, end_date=None, workout_type=None):
+        """Query for a user's workouts in date order, shaped to range-scan the composite indexes.
+
+        Equality columns come first (``user_id``, then ``type``) followed by a
+        half-open ``date`` range, matching the column order of
+        ``ix_workouts_user_id_type_date`` / ``ix_workouts_user_id_date``.
+        """
+        return cls.query.filter(*cls._user_criteria(user_id, start_date, end_date, workout_type)) \
+            .order_by(cls.date, cls.id)
+
+    @classmethod
+    def keyset_page(cls, user_id, limit, after=None, fields=None,
+                    start_date=None, end_date=None, workout_type=None):
+        """
+        Fetches one page of a user's workouts, newest first
+
+        Args:
+            user_id: Owner of the workouts
+            limit: Page size
+            after: ``(date, id)`` of the last row of the previous page
+            fields: Column names to load, defaults to all of ``FIELDS``
+            start_date / end_date / workout_type: Optional filters
+
+        Returns:
+            ``(rows, has_more)`` where rows are dicts containing only ``fields``
+            plus ``id`` and ``date``, which the cursor needs
+        """
+        fields = list(fields or cls.FIELDS)
+        for required in ('date', 'id'):
+            if required not in fields:
+                fields.append(required)
+
+        criteria = cls._user_criteria(user_id, start_date, end_date, workout_type)
+        if after is not None:
+            after_date, after_id = after
+            # Seek past the cursor instead of OFFSET, so every page is an index range scan
+            criteria.append(or_(cls.date < after_date, and_(cls.date == after_date, cls.id < after_id)))
+
+        rows = db.session.query(*[getattr(cls, field) for field in fields]) \
+            .filter(*criteria) \
+            .order_by(cls.date.desc(), cls.id.desc()) \
+            .limit(limit + 1) \
+            .all()
+
+        has_more = len(rows) > limit
+        return [cls._serialize_row(row, fields) for row in rows[:limit]], has_more
+
+    @classmethod
+    def iter_for_user(cls, user_id, fields=None, batch_size=1000, start_date=None, end_date=None, workout_type=None):
+        """
+        Yields batches of a user's workouts, oldest first, from a server-side cursor
+
+        Only one batch of ``batch_size`` rows is held in memory at a time, so
+        exporting a full history runs in constant memory.
+        """
+        fields = list(fields or cls.FIELDS)
+        statement = select(*[getattr(cls, field) for field in fields]) \
+            .where(*cls._user_criteria(user_id, start_date, end_date, workout_type)) \
+            .order_by(cls.date, cls.id) \
+            .execution_options(stream_results=True, yield_per=batch_size)
+
+        result = db.session.execute(statement)
+        try:
+            for partition in result.partitions():
+                yield [cls._serialize_row(row, fields) for row in partition]
+        finally:
+            result.close()
+
+    @classmethod
+    def columns_for_user(cls, user_id, fields, start_date=None, end_date=None, workout_type=None):
+        """
+        Returns a user's workouts as ``{field: list}`` columns, oldest first
+
+        Analytics read whole columns, so rows are transposed once here instead
+        of being turned into one dict per workout.
+        """
+        rows = db.session.execute(
+            select(*[getattr(cls, field) for field in fields])
+            .where(*cls._user_criteria(user_id, start_date, end_date, workout_type))
+            .order_by(cls.date, cls.id)
+        ).all()
+        if not rows:
+            return {field: [] for field in fields}
+        return dict(zip(fields, (list(column) for column in zip(*rows))))
+
+    @classmethod
+    def _user_criteria(cls, user_id, start_date=None, end_date=None, workout_type=None):
+        criteria = [cls.user_id == user_id]
+        if workout_type is not None:
+            criteria.append(cls.type == workout_type)
+        if start_date is not None:
+            criteria.append(cls.date >= start_date)
+        if end_date is not None:
+            criteria.append(cls.date < end_date)
+        return criteria
+
+    @staticmethod
+    def _serialize_row(row, fields):
+        result = {}
+        for field, value in zip(fields, row):
+            result[field] = value.isoformat() if isinstance(value, datetime) else value
+        return result
+
+    EDITABLE_FIELDS = ('name', 'description', 'type', 'duration', 'calories_burned', 'completed', 'date')
+
+    def update_from_dict(self, data):
+        """Applies client-supplied fields; ``notes`` is accepted as an alias of ``description``."""
+        if 'notes' in data and 'description' not in data:
+            data = dict(data, description=data['notes'])
+        for field in self.EDITABLE_FIELDS:
+            if field in data:
+                value = data[field]
+                if field == 'date' and isinstance(value, str):
+                    value = datetime.fromisoformat(value)
+                setattr(self, field, value)
+        if self.date is None:
+            self.date = datetime.utcnow()
+        if not self.name:
+            self.name = (self.type or 'workout').title()
+
+    def save(self):
+        if not self.id:
+            db.session.add(self)
+        db.session.commit()
+
+    def delete(self):
+        db.session.delete(self)
+        db.session.commit()
+
     def to_dict(self):
         return {
             'id': self.id,
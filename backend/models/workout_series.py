@@ -0,0 +1,97 @@
+from . import db
+from datetime import datetime
+import numpy as np
+from backend.utils.series_codec import encode_ints, decode_ints
+
+class WorkoutSeries(db.Model):
+    """One sensor stream (heart rate, pace, power) of a workout, stored as two compressed columns.
+
+    ``times`` holds millisecond offsets from the workout start and ``samples``
+    the values multiplied by the metric's ``scale``, both delta-encoded with
+    ``encode_ints``. A 1 Hz heart-rate hour takes a couple of KB instead of
+    3,600 rows. Summary columns let list views skip decoding entirely.
+    """
+    __tablename__ = 'workout_series'
+    __table_args__ = (
+        db.UniqueConstraint('workout_id', 'metric', name='uq_workout_series_workout_id_metric'),
+    )
+
+    # metric -> (fixed-point scale, unit)
+    METRICS = {
+        'heart_rate': (1, 'bpm'),
+        'pace': (10, 's/km'),
+        'power': (1, 'W'),
+    }
+    # Bound on scaled values and millisecond offsets, so both round-trip exactly through float64
+    MAX_ABS_SCALED = 2 ** 53
+
+    id = db.Column(db.Integer, primary_key=True)
+    workout_id = db.Column(db.Integer, db.ForeignKey('workouts.id', ondelete='CASCADE'), nullable=False, index=True)
+    metric = db.Column(db.String(20), nullable=False)
+    scale = db.Column(db.Integer, nullable=False, default=1)
+    sample_count = db.Column(db.Integer, nullable=False, default=0)
+    duration_ms = db.Column(db.BigInteger, nullable=False, default=0)
+    min_value = db.Column(db.Float)
+    max_value = db.Column(db.Float)
+    mean_value = db.Column(db.Float)
+    # Deferred so summaries and cascading deletes never pull the blobs
+    times = db.deferred(db.Column(db.LargeBinary, nullable=False), group='samples')
+    samples = db.deferred(db.Column(db.LargeBinary, nullable=False), group='samples')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def set_samples(self, times_s, values):
+        """
+        Encodes a series, replacing any previous samples
+
+        Args:
+            times_s: sample times in seconds from the workout start, ascending
+            values: sample values in the metric's unit; NaN samples are dropped
+        """
+        times_s = np.asarray(times_s, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if times_s.shape != values.shape or times_s.ndim != 1:
+            raise ValueError('times and values must be 1-D arrays of the same length')
+        keep = ~np.isnan(values) & ~np.isnan(times_s)
+        times_s, values = times_s[keep], values[keep]
+        if not (np.isfinite(times_s).all() and np.isfinite(values).all()):
+            raise ValueError('times and values must be finite')
+        if len(times_s) > 1 and np.any(np.diff(times_s) < 0):
+            raise ValueError('times must be ascending')
+
+        self.scale = self.METRICS[self.metric][0]
+        times_ms = np.round(times_s * 1000)
+        scaled = np.round(values * self.scale)
+        if len(times_ms) and np.abs(times_ms).max() > self.MAX_ABS_SCALED:
+            raise ValueError('times are out of range')
+        if len(scaled) and np.abs(scaled).max() > self.MAX_ABS_SCALED:
+            raise ValueError(f'{self.metric} values are out of range')
+        times_ms = times_ms.astype(np.int64)
+        self.times = encode_ints(times_ms)
+        self.samples = encode_ints(scaled.astype(np.int64))
+        self.sample_count = len(values)
+        self.duration_ms = int(times_ms[-1] - times_ms[0]) if len(times_ms) else 0
+        self.min_value = float(values.min()) if len(values) else None
+        self.max_value = float(values.max()) if len(values) else None
+        self.mean_value = float(values.mean()) if len(values) else None
+
+    def arrays(self):
+        """Returns ``(times in seconds, values)`` as float arrays."""
+        times = decode_ints(self.times) / 1000.0
+        values = decode_ints(self.samples) / float(self.scale or 1)
+        return times, values
+
+    def to_dict(self, include_samples=False):
+        data = {
+            'metric': self.metric,
+            'unit': self.METRICS.get(self.metric, (1, None))[1],
+            'sample_count': self.sample_count,
+            'duration_s': self.duration_ms / 1000.0,
+            'min': self.min_value,
+            'max': self.max_value,
+            'mean': self.mean_value
+        }
+        if include_samples:
+            times, values = self.arrays()
+            data['times'] = times.tolist()
+            data['values'] = values.tolist()
+        return data
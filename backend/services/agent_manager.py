@@ -1,12 +1,15 @@
 from backend.agents.data_analyst import DataAnalyst
 from backend.agents.fitness_coach import FitnessCoach
-from backend.services.voice_service import VoiceService
+from backend.services.voice_service import VoiceService, VOICE_COMMAND_FALLBACK
+from backend.services.document_chunker import StructuredChunker
+from backend.services.context_packer import ContextPacker
+from backend.services.voice_pipeline import VoicePipeline
+from backend.services.workout_series import analysis_data
+from backend.models.workout import Workout
 import os
 import json
 from flask import current_app
 from PyPDF2 import PdfReader
-import docx
-import markdown
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import HuggingFaceEmbeddings
@@ -15,11 +18,20 @@ class AgentManager:
     def __init__(self):
         self.data_analyst = DataAnalyst()
         self.fitness_coach = FitnessCoach()
-        self.voice_service = VoiceService()
+        if os.getenv('VOICE_SERVICE_MODE', 'sync').lower() == 'async':
+            # Pooled asyncio client with per-key concurrency limits
+            from backend.services.async_voice_service import AsyncVoiceService
+            self.voice_service = AsyncVoiceService()
+        else:
+            self.voice_service = VoiceService()
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
             chunk_overlap=200
         )
+        self.chunker = StructuredChunker(chunk_size=1000)
+        self.context_packer = ContextPacker()
+        self.retrieval_k = int(os.getenv('RAG_RETRIEVAL_K', 6))
+        self.voice_pipeline = VoicePipeline(self, tts_workers=int(os.getenv('VOICE_TTS_WORKERS', 2)))
         self.embeddings = HuggingFaceEmbeddings()
         self.vector_store = None
         self._load_vector_store()
@@ -58,17 +70,22 @@ class AgentManager:
             current_app.logger.error(f'Error loading vector store: {str(e)}')
             self.vector_store = None
 
-    def process_knowledge_file(self, filepath, category):
+    def process_knowledge_file(self, filepath, category, source=None):
         try:
-            text = self._extract_text(filepath)
-            
-            chunks = self.text_splitter.split_text(text)
+            source = source or os.path.basename(filepath)
+            if self.chunker.supports(filepath):
+                # Markdown/DOCX are split along headings, lists and tables
+                chunks = self.chunker.chunk_file(filepath)
+            else:
+                text = self._extract_text(filepath)
+                chunks = [{'text': chunk, 'metadata': {}} for chunk in self.text_splitter.split_text(text)]
             
             texts_with_metadata = [
                 {
-                    'text': chunk,
+                    'text': chunk['text'],
                     'metadata': {
-                        'source': os.path.basename(filepath),
+                        **chunk['metadata'],
+                        'source': source,
                         'category': category
                     }
                 }
@@ -90,6 +107,7 @@ class AgentManager:
             vector_store_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'vector_store')
             os.makedirs(os.path.dirname(vector_store_path), exist_ok=True)
             self.vector_store.save_local(vector_store_path)
+            return len(texts_with_metadata)
             
         except Exception as e:
             current_app.logger.error(f'Error processing file {filepath}: {str(e)}')
@@ -106,13 +124,8 @@ class AgentManager:
                     text += page.extract_text()
                 return text
                 
-        elif ext in ['.doc', '.docx']:
-            doc = docx.Document(filepath)
-            return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-            
-        elif ext == '.md':
-            with open(filepath, 'r', encoding='utf-8') as file:
-                return markdown.markdown(file.read())
+        elif ext in ['.doc', '.docx', '.md']:
+            return self.chunker.extract_text(filepath)
                 
         elif ext == '.txt':
             with open(filepath, 'r', encoding='utf-8') as file:
@@ -124,29 +137,55 @@ class AgentManager:
     def process_audio(self, audio_file):
         return self.voice_service.speech_to_text(audio_file)
 
+    def stream_audio_transcript(self, audio_file):
+        return self.voice_service.stream_speech_to_text(audio_file)
+
+    def retrieve_context(self, text):
+        if not self.vector_store:
+            return ''
+        # Over-fetch, then keep what fits the prompt token budget
+        scored_docs = self.vector_store.similarity_search_with_score(text, k=self.retrieval_k)
+        return self.context_packer.pack(scored_docs)
+
     def process_voice_command(self, text, user_id):
         try:
-            if self.vector_store:
-                docs = self.vector_store.similarity_search(text, k=3)
-                context = '\n'.join([doc.page_content for doc in docs])
-            else:
-                context = ''
+            context = self.retrieve_context(text)
 
             response = self.fitness_coach.process_command(text, context, user_id)
             return response
         except Exception as e:
             current_app.logger.error(f'Error processing voice command: {str(e)}')
-            return "I'm sorry, I couldn't process your command. Please try again."
+            return VOICE_COMMAND_FALLBACK
+
+    def stream_coach_reply(self, text, context, user_id):
+        return self.fitness_coach.stream_command(text, context, user_id)
+
+    def run_voice_pipeline(self, audio_file, user_id):
+        return self.voice_pipeline.run(audio_file, user_id)
 
     def generate_voice_response(self, text):
         return self.voice_service.text_to_speech(text)
 
-    def get_workout_feedback(self, workout):
-        return self.fitness_coach.analyze_workout(workout)
+    def stream_voice_response(self, text):
+        return self.voice_service.stream_text_to_speech(text)
+
+    def get_workout_feedback(self, workout, include_series=True):
+        workout_data = workout.to_dict()
+        # Downsampled heart rate / pace / power streams for the analysis prompt.
+        # A workout that was just logged has none yet, and may be detached (group commit).
+        if include_series:
+            workout_data.update(analysis_data(workout))
+        return self.fitness_coach.analyze_workout_progress(workout_data)
 
     def get_recommendations(self, user):
         return self.fitness_coach.get_recommendations(user)
 
+    def analyze_trends(self, user_id, start_date=None):
+        columns = Workout.columns_for_user(
+            user_id, ['date', 'type', 'duration', 'calories_burned'], start_date=start_date
+        )
+        return self.data_analyst.analyze_trends({'columns': columns})
+
     def get_fitness_coach(self) -> FitnessCoach:
         return self.fitness_coach
 
@@ -0,0 +1,227 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+
+import httpx
+
+from backend.services.tts_cache import TTSCache
+from backend.services.voice_service import VoiceService
+from backend.utils.metrics import metrics
+
+# The background loop thread has no Flask app context, so log through the module logger
+logger = logging.getLogger(__name__)
+
+
+class AsyncVoiceService(VoiceService):
+    """asyncio variant of ``VoiceService`` backed by one pooled ``httpx.AsyncClient``.
+
+    Calls for the same API key are capped at ``per_key_limit`` concurrent
+    requests; callers beyond that wait in a queue and the wait is recorded
+    as the ``voice.async.queue_wait`` timer.
+
+    Async servers await ``speech_to_text_async`` / ``text_to_speech_async``
+    directly. Sync Flask routes keep calling ``speech_to_text`` /
+    ``text_to_speech``, which run the coroutines on a private event loop
+    thread so every worker thread shares the same connection pool. The
+    client and per-key semaphores belong to the event loop that created
+    them, so each running loop gets its own set.
+    """
+
+    def __init__(self, api_key: str = None, cache: TTSCache = None,
+                 max_connections: int = None, per_key_limit: int = None):
+        super().__init__(api_key, cache)
+        self.max_connections = max_connections or int(os.getenv('FISH_AUDIO_POOL_SIZE', 20))
+        self.per_key_limit = per_key_limit or int(os.getenv('FISH_AUDIO_PER_KEY_CONCURRENCY', 4))
+        # Event loop -> (client, {key fingerprint: semaphore}); dropped with the loop
+        self._per_loop = weakref.WeakKeyDictionary()
+        self._queued = 0
+        self._in_flight = 0
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+        metrics.register_gauge('voice.async.queued', lambda: self._queued)
+        metrics.register_gauge('voice.async.in_flight', lambda: self._in_flight)
+
+    def _loop_state(self):
+        loop = asyncio.get_running_loop()
+        state = self._per_loop.get(loop)
+        if state is None:
+            client = httpx.AsyncClient(
+                base_url=self.fish_audio_endpoint,
+                timeout=30,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+            state = self._per_loop[loop] = (client, {})
+        return state
+
+    def _get_client(self) -> httpx.AsyncClient:
+        return self._loop_state()[0]
+
+    @asynccontextmanager
+    async def _slot(self, api_key: str):
+        """Waits for a free request slot for ``api_key``."""
+        fingerprint = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        semaphores = self._loop_state()[1]
+        semaphore = semaphores.get(fingerprint)
+        if semaphore is None:
+            semaphore = semaphores[fingerprint] = asyncio.Semaphore(self.per_key_limit)
+
+        start = time.perf_counter()
+        self._queued += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._queued -= 1
+        metrics.observe('voice.async.queue_wait', (time.perf_counter() - start) * 1000)
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            semaphore.release()
+
+    async def speech_to_text_async(self, audio_file, api_key: str = None) -> dict:
+        """Convert speech to text using Fish Audio API."""
+        api_key = api_key or self.api_key
+        try:
+            if not api_key:
+                return {
+                    'success': False,
+                    'error': 'Please configure your Fish Audio API key.',
+                    'text': None
+                }
+
+            # Decoding and resampling are CPU bound, keep them off the event loop
+            audio_file = await asyncio.to_thread(self._prepare_audio, audio_file)
+            body, content_type = self._multipart_body(audio_file)
+
+            async with self._slot(api_key):
+                response = await self._get_client().post(
+                    '/speech-to-text',
+                    headers={
+                        'Authorization': f'Bearer {api_key}',
+                        'Content-Type': content_type
+                    },
+                    content=self._aiter_body(body)
+                )
+            response.raise_for_status()
+            result = response.json()
+
+            return {
+                'success': True,
+                'error': None,
+                'text': result.get('text'),
+                'preprocessing': getattr(audio_file, 'stats', None)
+            }
+
+        except Exception as e:
+            error_msg = f'Speech to text error: {str(e)}'
+            logger.exception(error_msg)
+            return {
+                'success': False,
+                'error': error_msg,
+                'text': None
+            }
+
+    async def text_to_speech_async(self, text: str, api_key: str = None) -> dict:
+        """Convert text to speech using Fish Audio API, serving repeated phrases from the cache."""
+        api_key = api_key or self.api_key
+        try:
+            cache_key = self.cache_key(text)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                metrics.increment('tts.cache_hit')
+                return {
+                    'success': True,
+                    'error': None,
+                    'audio': base64.b64encode(cached).decode('utf-8'),
+                    'cached': True
+                }
+            metrics.increment('tts.cache_miss')
+
+            if not api_key:
+                return {
+                    'success': False,
+                    'error': 'Please configure your Fish Audio API key.',
+                    'audio': None
+                }
+
+            async with self._slot(api_key):
+                response = await self._get_client().post(
+                    '/text-to-speech',
+                    headers={'Authorization': f'Bearer {api_key}'},
+                    json=self._tts_payload(text)
+                )
+            response.raise_for_status()
+            result = response.json()
+
+            audio = result.get('audio')  # Base64 encoded audio
+            if audio:
+                await asyncio.to_thread(self._cache_audio, cache_key, base64.b64decode(audio))
+
+            return {
+                'success': True,
+                'error': None,
+                'audio': audio,
+                'cached': False
+            }
+
+        except Exception as e:
+            error_msg = f'Text to speech error: {str(e)}'
+            logger.exception(error_msg)
+            return {
+                'success': False,
+                'error': error_msg,
+                'audio': None
+            }
+
+    async def _aiter_body(self, body):
+        # File reads are blocking, so each chunk is pulled on a worker thread
+        iterator = iter(body)
+        sentinel = object()
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, sentinel)
+            if chunk is sentinel:
+                break
+            yield chunk
+
+    async def aclose(self):
+        """Closes the client of the running event loop."""
+        state = self._per_loop.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].aclose()
+
+    # Sync entry points for Flask routes
+
+    def speech_to_text(self, audio_file) -> dict:
+        return self._run(self.speech_to_text_async(audio_file))
+
+    def text_to_speech(self, text: str) -> dict:
+        return self._run(self.text_to_speech_async(text))
+
+    def close(self):
+        if self._loop is not None:
+            self._run(self.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._background_loop()).result()
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='voice-async-loop', daemon=True).start()
+                self._loop = loop
+            return self._loop
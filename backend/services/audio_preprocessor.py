@@ -0,0 +1,232 @@
+import io
+import os
+import time
+import wave
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.metrics import metrics
+
+
+class PreparedAudio:
+    """File-like wrapper handed to ``VoiceService`` in place of the original upload."""
+
+    def __init__(self, stream, filename: str = None, mimetype: str = None, stats: Dict = None):
+        self.stream = stream
+        self.filename = filename
+        self.mimetype = mimetype
+        self.stats = stats or {}
+
+    def read(self, size: int = -1) -> bytes:
+        return self.stream.read(size)
+
+
+class _PrefixedStream:
+    """Replays bytes already consumed from a non-seekable stream before the rest of it."""
+
+    def __init__(self, prefix: bytes, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if not self.prefix:
+            return self.stream.read(size)
+        if size is None or size < 0:
+            data, self.prefix = self.prefix + self.stream.read(), b''
+            return data
+        data, self.prefix = self.prefix[:size], self.prefix[size:]
+        if len(data) < size:
+            data += self.stream.read(size - len(data))
+        return data
+
+
+class AudioPreprocessor:
+    """Shrinks recordings before speech-to-text.
+
+    PCM WAV input is downmixed to mono, low-pass filtered and resampled to
+    ``target_rate``, and leading/trailing silence is trimmed with an
+    energy-based voice activity detector. Every step is a NumPy array
+    operation. Other containers (WebM/Opus, MP3, ...) would need a codec to
+    decode and are passed through untouched.
+
+    WAV input is buffered whole, so it is capped at ``max_input_bytes``
+    (8 MB, about 45 s of 44.1 kHz stereo, by default). Larger files skip
+    preprocessing and are streamed through unchanged, keeping memory per
+    request constant.
+    """
+
+    def __init__(self, target_rate: int = 16000, frame_ms: int = 30, padding_ms: int = 200,
+                 threshold_db: float = 12.0, floor_dbfs: float = -55.0,
+                 max_input_bytes: int = 8 * 1024 * 1024):
+        self.target_rate = target_rate
+        self.frame_ms = frame_ms
+        self.padding_ms = padding_ms
+        self.threshold_db = threshold_db
+        self.floor_dbfs = floor_dbfs
+        self.max_input_bytes = max_input_bytes
+
+    @classmethod
+    def from_env(cls) -> Optional['AudioPreprocessor']:
+        """The configured preprocessor, or None when ``AUDIO_PREPROCESS`` is off."""
+        if os.getenv('AUDIO_PREPROCESS', 'true').lower() != 'true':
+            return None
+        return cls(target_rate=int(os.getenv('AUDIO_TARGET_RATE', 16000)),
+                   max_input_bytes=int(os.getenv('AUDIO_PREPROCESS_MAX_BYTES', 8 * 1024 * 1024)))
+
+    def prepare(self, audio_file) -> PreparedAudio:
+        """
+        Returns a file-like object with the preprocessed audio
+
+        Args:
+            audio_file: ``FileStorage`` or any readable binary stream
+        """
+        filename = getattr(audio_file, 'filename', None)
+        mimetype = getattr(audio_file, 'mimetype', None)
+        stream = getattr(audio_file, 'stream', audio_file)
+
+        header = stream.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return PreparedAudio(_PrefixedStream(header, stream), filename, mimetype,
+                                 {'applied': False, 'reason': 'unsupported format'})
+
+        data = header + stream.read(self.max_input_bytes + 1 - len(header))
+        if len(data) > self.max_input_bytes:
+            return PreparedAudio(_PrefixedStream(data, stream), filename, mimetype,
+                                 {'applied': False, 'reason': 'input too large'})
+
+        try:
+            output, stats = self.process_wav(data)
+        except (wave.Error, ValueError) as e:
+            return PreparedAudio(io.BytesIO(data), filename, mimetype, {'applied': False, 'reason': str(e)})
+
+        name = os.path.splitext(filename or 'audio')[0] + '.wav'
+        return PreparedAudio(io.BytesIO(output), name, 'audio/wav', stats)
+
+    def process_wav(self, data: bytes) -> Tuple[bytes, Dict]:
+        """Downmixes, resamples and trims a WAV file, returning 16-bit mono WAV bytes and stats."""
+        start = time.perf_counter()
+
+        samples, rate = self._decode_wav(data)
+        input_seconds = len(samples) / rate if rate else 0.0
+
+        mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+        mono = self.resample(mono, rate, self.target_rate)
+        mono, speech_found = self.trim_silence(mono, self.target_rate)
+
+        output = self._encode_wav(mono, self.target_rate)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        stats = {
+            'applied': True,
+            'input_bytes': len(data),
+            'output_bytes': len(output),
+            'bytes_saved': len(data) - len(output),
+            'input_rate': rate,
+            'input_channels': samples.shape[1],
+            'input_seconds': round(input_seconds, 3),
+            'output_seconds': round(len(mono) / self.target_rate, 3),
+            'speech_found': speech_found,
+            'processing_ms': round(elapsed_ms, 2)
+        }
+        metrics.observe('audio.preprocess', elapsed_ms)
+        metrics.increment('audio.bytes_saved', max(stats['bytes_saved'], 0))
+        return output, stats
+
+    def resample(self, signal: np.ndarray, rate: int, target_rate: int) -> np.ndarray:
+        if rate == target_rate or len(signal) == 0:
+            return signal.astype(np.float32)
+
+        if target_rate < rate:
+            # Windowed-sinc low-pass at the new Nyquist frequency to avoid aliasing
+            cutoff = 0.5 * target_rate / rate
+            taps = np.arange(-32, 33)
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+            kernel /= kernel.sum()
+            signal = np.convolve(signal, kernel, mode='same')
+
+        ratio = rate / target_rate
+        if ratio.is_integer():
+            return signal[::int(ratio)].astype(np.float32)
+
+        positions = np.arange(int(len(signal) / ratio)) * ratio
+        return np.interp(positions, np.arange(len(signal)), signal).astype(np.float32)
+
+    def trim_silence(self, signal: np.ndarray, rate: int) -> Tuple[np.ndarray, bool]:
+        """Cuts leading and trailing non-speech frames, keeping ``padding_ms`` around speech."""
+        frame = max(int(rate * self.frame_ms / 1000), 1)
+        n_frames = len(signal) // frame
+        if n_frames == 0:
+            return signal, False
+
+        frames = signal[:n_frames * frame].reshape(n_frames, frame)
+        rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+        energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+
+        # Adaptive threshold: a margin over the noise floor, never below an absolute floor
+        noise_floor = np.percentile(energy_db, 10)
+        threshold = max(noise_floor + self.threshold_db, self.floor_dbfs)
+        voiced = np.flatnonzero(energy_db > threshold)
+        if len(voiced) == 0:
+            return signal, False
+
+        padding = int(self.padding_ms / self.frame_ms)
+        first = max(voiced[0] - padding, 0) * frame
+        last = min((voiced[-1] + 1 + padding) * frame, len(signal))
+        return signal[first:last], True
+
+    def _decode_wav(self, data: bytes) -> Tuple[np.ndarray, int]:
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+
+        if width == 1:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif width == 2:
+            samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+        elif width == 3:
+            triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            values = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+            values = np.where(values & 0x800000, values - 0x1000000, values)
+            samples = values.astype(np.float32) / 8388608
+        elif width == 4:
+            samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648
+        else:
+            raise ValueError(f'Unsupported sample width: {width}')
+
+        usable = len(samples) - len(samples) % channels
+        return samples[:usable].reshape(-1, channels), rate
+
+    def _encode_wav(self, signal: np.ndarray, rate: int) -> bytes:
+        pcm = (np.clip(signal, -1.0, 1.0) * 32767).astype('<i2')
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(pcm.tobytes())
+        return buffer.getvalue()
+
+
+def main():
+    """Benchmark the preprocessor on a synthetic 48 kHz stereo recording"""
+    rate = 48000
+    t = np.arange(rate * 10) / rate
+    speech = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.abs(t - 5) < 3)
+    noise = 0.001 * np.random.randn(len(t))
+    stereo = np.stack([speech + noise, speech + noise], axis=1)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((stereo * 32767).astype('<i2').tobytes())
+
+    _, stats = AudioPreprocessor().process_wav(buffer.getvalue())
+    print(stats)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import os
+import re
+from typing import Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional, falls back to a regex estimate
+    tiktoken = None
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+class TokenCounter:
+    """Counts and truncates text by tokens.
+
+    Uses tiktoken's ``cl100k_base`` encoding when it is installed, otherwise a
+    word/punctuation regex, which tracks BPE counts closely for English prose
+    and needs no model files.
+    """
+
+    def __init__(self, encoding: str = 'cl100k_base'):
+        self.encoder = None
+        if tiktoken is not None:
+            try:
+                self.encoder = tiktoken.get_encoding(encoding)
+            except Exception:
+                self.encoder = None
+
+    def count(self, text: str) -> int:
+        if self.encoder is not None:
+            return len(self.encoder.encode(text))
+        return len(_TOKEN_RE.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Returns the longest prefix of ``text`` within ``max_tokens``, cut at a sentence end if possible."""
+        if max_tokens <= 0:
+            return ''
+        if self.encoder is not None:
+            tokens = self.encoder.encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            prefix = self.encoder.decode(tokens[:max_tokens])
+        else:
+            matches = list(_TOKEN_RE.finditer(text))
+            if len(matches) <= max_tokens:
+                return text
+            prefix = text[:matches[max_tokens - 1].end()]
+
+        boundaries = [m.start() for m in _SENTENCE_END_RE.finditer(prefix)]
+        if boundaries and boundaries[-1] > len(prefix) // 2:
+            prefix = prefix[:boundaries[-1]]
+        return prefix.strip()
+
+
+class ContextPacker:
+    """Packs retrieved chunks into a prompt context under a token budget.
+
+    Chunks are taken best-score first. Text a chunk shares with one already
+    selected (the splitter's overlap window, or a fully repeated chunk) is
+    dropped before counting, and the last chunk that does not fit is cut at
+    a sentence boundary.
+    """
+
+    def __init__(self, token_budget: int = None, min_overlap: int = 20, max_overlap: int = 400,
+                 counter: TokenCounter = None):
+        self.token_budget = token_budget or int(os.getenv('RAG_CONTEXT_TOKEN_BUDGET', 600))
+        self.min_overlap = min_overlap
+        self.max_overlap = max_overlap
+        self.counter = counter or TokenCounter()
+
+    def pack(self, scored_docs: List[Tuple], lower_is_better: bool = True) -> str:
+        """
+        Packs ``(document, score)`` pairs into a single context string
+
+        Args:
+            scored_docs: Pairs as returned by ``similarity_search_with_score``
+            lower_is_better: True for distance scores (FAISS L2), False for similarities
+        """
+        return self.pack_with_stats(scored_docs, lower_is_better)[0]
+
+    def pack_with_stats(self, scored_docs: List[Tuple], lower_is_better: bool = True) -> Tuple[str, Dict]:
+        """
+        Same as ``pack``, also returning this call's candidate, selection and token counts
+
+        The packer is shared across request threads, so stats are returned
+        rather than kept on the instance.
+        """
+        ordered = sorted(scored_docs, key=lambda pair: pair[1], reverse=not lower_is_better)
+
+        selected = []
+        used_tokens = 0
+        input_tokens = 0
+        for doc, _ in ordered:
+            text = doc.page_content.strip()
+            input_tokens += self.counter.count(text)
+            text = self._remove_overlap(text, selected)
+            if not text:
+                continue
+
+            remaining = self.token_budget - used_tokens
+            tokens = self.counter.count(text)
+            if tokens > remaining:
+                text = self.counter.truncate(text, remaining)
+                if not text:
+                    break
+                tokens = self.counter.count(text)
+
+            selected.append(text)
+            used_tokens += tokens
+            if used_tokens >= self.token_budget:
+                break
+
+        stats = {
+            'candidates': len(ordered),
+            'selected': len(selected),
+            'input_tokens': input_tokens,
+            'context_tokens': used_tokens,
+            'token_budget': self.token_budget
+        }
+        return '\n\n'.join(selected), stats
+
+    def _remove_overlap(self, text: str, selected: List[str]) -> str:
+        for previous in selected:
+            if text in previous:
+                return ''
+            # previous chunk's tail repeated at the start of this one
+            overlap = self._overlap_length(previous, text)
+            if overlap:
+                text = text[overlap:].lstrip()
+            # this chunk's tail repeated at the start of the previous one
+            overlap = self._overlap_length(text, previous)
+            if overlap:
+                text = text[:-overlap].rstrip()
+            if not text:
+                return ''
+        return text
+
+    def _overlap_length(self, head: str, tail: str) -> int:
+        """Length of the longest suffix of ``head`` that is also a prefix of ``tail``."""
+        upper = min(len(head), len(tail), self.max_overlap)
+        for size in range(upper, self.min_overlap - 1, -1):
+            if head.endswith(tail[:size]):
+                return size
+        return 0
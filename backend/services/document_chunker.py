@@ -0,0 +1,322 @@
+import os
+import re
+from typing import Dict, List
+
+import docx
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+_FENCE_RE = re.compile(r'^\s*(```|~~~)')
+_ATX_HEADING_RE = re.compile(r'^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$')
+_SETEXT_RE = re.compile(r'^\s{0,3}(=+|-+)\s*$')
+_HR_RE = re.compile(r'^\s{0,3}([-*_])(\s*\1){2,}\s*$')
+_LIST_ITEM_RE = re.compile(r'^\s*([-*+]|\d+[.)])\s+')
+_TABLE_SEPARATOR_RE = re.compile(r'^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$')
+_DOCX_HEADING_RE = re.compile(r'^Heading\s*(\d+)$')
+
+_INLINE_PATTERNS = [
+    (re.compile(r'!\[([^\]]*)\]\([^)]*\)'), r'\1'),  # images
+    (re.compile(r'\[([^\]]+)\]\([^)]*\)'), r'\1'),  # links
+    (re.compile(r'<[^>]+>'), ''),  # inline html
+    (re.compile(r'(\*\*|__)(.+?)\1'), r'\2'),  # bold
+    (re.compile(r'(?<![\w*])[*_](?!\s)(.+?)(?<!\s)[*_](?![\w*])'), r'\1'),  # italics
+    (re.compile(r'`([^`]+)`'), r'\1'),  # inline code
+]
+
+
+class StructuredChunker:
+    """Splits Markdown and DOCX documents along their headings, lists and tables.
+
+    Every chunk stays inside one section where possible and carries the
+    heading path it was taken from in its metadata, so the text that is
+    embedded is plain prose instead of rendered HTML.
+    """
+
+    SUPPORTED_EXTENSIONS = ('.md', '.doc', '.docx')
+
+    def __init__(self, chunk_size: int = 1000, min_chunk_size: int = None):
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size if min_chunk_size is not None else chunk_size // 4
+
+    def supports(self, filepath: str) -> bool:
+        return os.path.splitext(filepath)[1].lower() in self.SUPPORTED_EXTENSIONS
+
+    def chunk_file(self, filepath: str) -> List[Dict]:
+        """Returns ``[{'text': ..., 'metadata': {...}}, ...]`` for a document."""
+        return self.pack(self.extract_blocks(filepath))
+
+    def extract_text(self, filepath: str) -> str:
+        """Plain-text rendering of a document, one block per paragraph."""
+        return '\n\n'.join(block['text'] for block in self.extract_blocks(filepath))
+
+    def extract_blocks(self, filepath: str) -> List[Dict]:
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext == '.md':
+            with open(filepath, 'r', encoding='utf-8') as file:
+                return self.markdown_blocks(file.read())
+        elif ext in ['.doc', '.docx']:
+            return self.docx_blocks(docx.Document(filepath))
+        raise ValueError(f'Unsupported file type: {ext}')
+
+    def markdown_blocks(self, text: str) -> List[Dict]:
+        """Parses Markdown source into heading-scoped blocks.
+
+        Each block is ``{'type', 'text', 'section'}`` where ``section`` is the
+        list of enclosing heading titles.
+        """
+        blocks = []
+        path = []
+        paragraph = []
+        lines = text.splitlines()
+        i = 0
+
+        def flush_paragraph():
+            if paragraph:
+                content = _strip_inline(' '.join(line.strip() for line in paragraph))
+                if content:
+                    blocks.append({'type': 'paragraph', 'text': content, 'section': list(path)})
+                paragraph.clear()
+
+        while i < len(lines):
+            line = lines[i]
+            stripped = line.strip()
+
+            if not stripped:
+                flush_paragraph()
+                i += 1
+                continue
+
+            fence = _FENCE_RE.match(line)
+            if fence:
+                flush_paragraph()
+                marker = fence.group(1)
+                body = []
+                i += 1
+                while i < len(lines) and not lines[i].strip().startswith(marker):
+                    body.append(lines[i])
+                    i += 1
+                i += 1  # closing fence
+                code = '\n'.join(body).strip('\n')
+                if code.strip():
+                    blocks.append({'type': 'code', 'text': code, 'section': list(path)})
+                continue
+
+            heading = _ATX_HEADING_RE.match(line)
+            if heading:
+                flush_paragraph()
+                _enter_section(path, len(heading.group(1)), _strip_inline(heading.group(2)))
+                i += 1
+                continue
+
+            if len(paragraph) == 1 and _SETEXT_RE.match(line):
+                title = _strip_inline(paragraph[0].strip())
+                paragraph.clear()
+                _enter_section(path, 1 if stripped.startswith('=') else 2, title)
+                i += 1
+                continue
+
+            if _HR_RE.match(line):
+                flush_paragraph()
+                i += 1
+                continue
+
+            if '|' in line and i + 1 < len(lines) and _TABLE_SEPARATOR_RE.match(lines[i + 1]):
+                flush_paragraph()
+                rows = [_table_row(line)]
+                i += 2
+                while i < len(lines) and '|' in lines[i] and lines[i].strip():
+                    rows.append(_table_row(lines[i]))
+                    i += 1
+                blocks.append({'type': 'table', 'text': '\n'.join(rows), 'section': list(path)})
+                continue
+
+            if _LIST_ITEM_RE.match(line):
+                flush_paragraph()
+                items = []
+                while i < len(lines):
+                    current = lines[i]
+                    if _LIST_ITEM_RE.match(current):
+                        indent = len(current) - len(current.lstrip())
+                        marker = _LIST_ITEM_RE.match(current)
+                        items.append(' ' * indent + '- ' + _strip_inline(current[marker.end():].strip()))
+                    elif current.strip() and current[:1].isspace() and items:
+                        items[-1] += ' ' + _strip_inline(current.strip())
+                    elif not current.strip() and i + 1 < len(lines) and _LIST_ITEM_RE.match(lines[i + 1]):
+                        pass  # loose list, keep going
+                    else:
+                        break
+                    i += 1
+                blocks.append({'type': 'list', 'text': '\n'.join(items), 'section': list(path)})
+                continue
+
+            if stripped.startswith('>'):
+                line = stripped.lstrip('>').strip()
+            paragraph.append(line)
+            i += 1
+
+        flush_paragraph()
+        return blocks
+
+    def docx_blocks(self, document) -> List[Dict]:
+        """Walks a DOCX body in document order, using paragraph styles for structure."""
+        blocks = []
+        path = []
+        list_items = []
+
+        def flush_list():
+            if list_items:
+                blocks.append({'type': 'list', 'text': '\n'.join(list_items), 'section': list(path)})
+                list_items.clear()
+
+        for element in document.element.body.iterchildren():
+            if element.tag == qn('w:tbl'):
+                flush_list()
+                table = Table(element, document)
+                rows = []
+                for row in table.rows:
+                    cells = []
+                    seen = set()
+                    for cell in row.cells:
+                        # merged cells are reported once per grid column
+                        if id(cell._tc) in seen:
+                            continue
+                        seen.add(id(cell._tc))
+                        cells.append(' '.join(cell.text.split()))
+                    rows.append(' | '.join(cells))
+                if any(row.strip(' |') for row in rows):
+                    blocks.append({'type': 'table', 'text': '\n'.join(rows), 'section': list(path)})
+                continue
+
+            if element.tag != qn('w:p'):
+                continue
+
+            paragraph = Paragraph(element, document)
+            text = paragraph.text.strip()
+            if not text:
+                continue
+
+            style = paragraph.style.name if paragraph.style is not None else ''
+            heading = _DOCX_HEADING_RE.match(style)
+            if heading or style == 'Title':
+                flush_list()
+                _enter_section(path, int(heading.group(1)) if heading else 0, text)
+            elif style.startswith('List') or paragraph._p.pPr is not None and paragraph._p.pPr.numPr is not None:
+                list_items.append('- ' + text)
+            else:
+                flush_list()
+                blocks.append({'type': 'paragraph', 'text': text, 'section': list(path)})
+
+        flush_list()
+        return blocks
+
+    def pack(self, blocks: List[Dict]) -> List[Dict]:
+        """Greedily merges blocks into chunks of at most ``chunk_size`` characters.
+
+        A chunk is closed at a section boundary once it holds at least
+        ``min_chunk_size`` characters; smaller sections are merged with their
+        neighbours and labelled with the common heading prefix.
+        """
+        chunks = []
+        current = []
+        section = None
+        size = 0
+
+        def flush():
+            if current:
+                chunks.append({
+                    'text': '\n\n'.join(block['text'] for block in current),
+                    'metadata': {
+                        'section': ' > '.join(section),
+                        'block_types': sorted({block['type'] for block in current})
+                    }
+                })
+                current.clear()
+
+        for block in blocks:
+            for piece in self._split_block(block):
+                length = len(piece['text'])
+                same_section = section is not None and piece['section'] == section
+                if current and (
+                    size + length + 2 > self.chunk_size
+                    or (not same_section and size >= self.min_chunk_size)
+                ):
+                    flush()
+                    size = 0
+                if not current:
+                    section = piece['section']
+                elif not same_section:
+                    section = _common_prefix(section, piece['section'])
+                current.append(piece)
+                size += length + 2
+
+        flush()
+        return chunks
+
+    def _split_block(self, block: Dict) -> List[Dict]:
+        if len(block['text']) <= self.chunk_size:
+            return [block]
+
+        if block['type'] == 'table':
+            # Keep the header row on every piece so each one stays readable
+            header, *rows = block['text'].split('\n')
+            pieces = _greedy_join(rows, self.chunk_size - len(header) - 1, '\n')
+            texts = [header + '\n' + piece for piece in pieces]
+        elif block['type'] in ('list', 'code'):
+            texts = _greedy_join(block['text'].split('\n'), self.chunk_size, '\n')
+        else:
+            sentences = re.split(r'(?<=[.!?])\s+', block['text'])
+            texts = _greedy_join(sentences, self.chunk_size, ' ')
+
+        return [dict(block, text=text) for text in texts]
+
+
+def _enter_section(path: List[str], level: int, title: str):
+    del path[max(level - 1, 0):]
+    path.append(title)
+
+
+def _strip_inline(text: str) -> str:
+    for pattern, replacement in _INLINE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def _table_row(line: str) -> str:
+    cells = [_strip_inline(cell) for cell in line.strip().strip('|').split('|')]
+    return ' | '.join(cells)
+
+
+def _common_prefix(a: List[str], b: List[str]) -> List[str]:
+    prefix = []
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        prefix.append(x)
+    return prefix
+
+
+def _greedy_join(parts: List[str], limit: int, separator: str) -> List[str]:
+    """Joins parts into strings no longer than ``limit``, hard-splitting any oversized part."""
+    limit = max(limit, 1)
+    out = []
+    buffer = ''
+    for part in parts:
+        while len(part) > limit:
+            if buffer:
+                out.append(buffer)
+                buffer = ''
+            cut = part.rfind(' ', 0, limit)
+            cut = cut if cut > 0 else limit
+            out.append(part[:cut])
+            part = part[cut:].lstrip()
+        if not buffer:
+            buffer = part
+        elif len(buffer) + len(separator) + len(part) <= limit:
+            buffer += separator + part
+        else:
+            out.append(buffer)
+            buffer = part
+    if buffer:
+        out.append(buffer)
+    return out
@@ -0,0 +1,96 @@
+import argparse
+import time
+from typing import Dict
+
+import numpy as np
+from sqlalchemy import select, update
+
+from backend.agents.motivator import Motivator
+from backend.models import db
+from backend.models.stats import UserDailyStats, UserStats
+
+
+def load_activity(batch_size: int = 50000):
+    """
+    Reads every (user_id, day, workout_count) row of user_daily_stats into arrays
+
+    The daily table is already one row per active day, so this is far smaller
+    than the workouts table; rows are streamed and converted batch by batch.
+    """
+    statement = select(UserDailyStats.user_id, UserDailyStats.day, UserDailyStats.workout_count) \
+        .where(UserDailyStats.workout_count > 0) \
+        .execution_options(stream_results=True, yield_per=batch_size)
+    users, days, counts = [], [], []
+    result = db.session.execute(statement)
+    try:
+        for partition in result.partitions():
+            user_ids, partition_days, workout_counts = zip(*partition)
+            users.append(np.array(user_ids, dtype=np.int64))
+            days.append(np.array(partition_days, dtype='datetime64[D]'))
+            counts.append(np.array(workout_counts, dtype=np.int64))
+    finally:
+        result.close()
+    if not users:
+        return np.array([], dtype=np.int64), np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int64)
+    return np.concatenate(users), np.concatenate(days), np.concatenate(counts)
+
+
+def run(write: bool = False, today=None) -> Dict:
+    """
+    Computes streaks and consistency for every user in one batch
+
+    Args:
+        write: Also repair user_stats streak columns that drifted from the daily rows
+        today: Reference day, defaults to today
+    """
+    start = time.perf_counter()
+    users, days, counts = load_activity()
+    loaded = time.perf_counter()
+    summary = {'rows': int(len(users)), 'users': 0, 'repaired': 0}
+    if len(users) == 0:
+        return summary
+
+    result = Motivator({}).engagement_batch(users, days, counts, today=today)
+    computed = time.perf_counter()
+    summary.update({
+        'users': int(len(result['user_id'])),
+        'active_streaks': int(np.count_nonzero(result['current_streak'])),
+        'mean_consistency': round(float(result['consistency_score'].mean()), 1),
+        'load_seconds': round(loaded - start, 2),
+        'compute_seconds': round(computed - loaded, 2),
+    })
+
+    if write:
+        stored = {
+            user_id: (current, longest, last_day)
+            for user_id, current, longest, last_day in db.session.execute(
+                select(UserStats.user_id, UserStats.current_streak, UserStats.longest_streak, UserStats.last_active_day)
+            )
+        }
+        changes = []
+        for user_id, current, longest, last_day in zip(
+                result['user_id'].tolist(), result['last_run_length'].tolist(),
+                result['longest_streak'].tolist(), result['last_active_day'].tolist()):
+            if user_id in stored and stored[user_id] != (current, longest, last_day):
+                changes.append({'user_id': user_id, 'current_streak': current,
+                                'longest_streak': longest, 'last_active_day': last_day})
+        if changes:
+            # ORM bulk UPDATE by primary key, one executemany
+            db.session.execute(update(UserStats), changes)
+            db.session.commit()
+        summary['repaired'] = len(changes)
+    return summary
+
+
+def main():
+    """Nightly engagement job, e.g. from cron: python -m backend.services.engagement_job --write"""
+    parser = argparse.ArgumentParser(description='Compute streaks and consistency for every user')
+    parser.add_argument('--write', action='store_true', help='repair drifted user_stats streaks')
+    args = parser.parse_args()
+
+    from backend.app import app
+    with app.app_context():
+        print(run(write=args.write))
+
+if __name__ == '__main__':
+    main()
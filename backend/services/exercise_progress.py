@@ -0,0 +1,69 @@
+import math
+from datetime import date, datetime
+from typing import Dict, Iterable, List
+
+from backend.models import db
+from backend.models.exercise_progress import ExerciseProgress
+
+
+def _parse_day(value):
+    if not value:
+        return datetime.utcnow().date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    if isinstance(value, date):
+        return value
+    raise ValueError('date must be an ISO date string')
+
+
+def _parse_amount(value, field: str) -> float:
+    try:
+        amount = float(value or 0)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be a number')
+    if not math.isfinite(amount) or amount < 0:
+        raise ValueError(f'{field} must be a finite, non-negative number')
+    return amount
+
+
+def record_sets(user_id: int, sets: Iterable[Dict]) -> List[ExerciseProgress]:
+    """
+    Folds logged sets into the user's per-exercise progress rows; the caller commits
+
+    Each set is ``{'exercise', 'weight', 'reps', 'date'?}``. Every set costs a
+    primary-key lookup (served from the identity map after the first set of
+    an exercise) and a constant-size update, never a scan of past sets.
+
+    Raises:
+        ValueError: a set is not an object, has no exercise name, or has a
+            negative, non-finite or fractional weight/reps
+    """
+    touched = {}
+    for entry in sets:
+        if not isinstance(entry, dict):
+            raise ValueError('Each set must be an object')
+        exercise = ExerciseProgress.normalize_name(entry.get('exercise') or entry.get('name'))
+        if not exercise:
+            raise ValueError('Each set needs an exercise name')
+        weight = _parse_amount(entry.get('weight'), 'weight')
+        reps = _parse_amount(entry.get('reps'), 'reps')
+        if not reps.is_integer():
+            raise ValueError('reps must be a whole number')
+        reps = int(reps)
+
+        progress = touched.get(exercise) or db.session.get(ExerciseProgress, (user_id, exercise))
+        if progress is None:
+            progress = ExerciseProgress(user_id=user_id, exercise=exercise)
+            db.session.add(progress)
+        progress.add_set(weight, reps, _parse_day(entry.get('date')))
+        touched[exercise] = progress
+    return list(touched.values())
+
+
+def progress_for_user(user_id: int, exercise: str = None) -> List[ExerciseProgress]:
+    query = ExerciseProgress.query.filter_by(user_id=user_id)
+    if exercise:
+        query = query.filter_by(exercise=ExerciseProgress.normalize_name(exercise))
+    return query.order_by(ExerciseProgress.exercise).all()
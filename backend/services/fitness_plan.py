@@ -31,12 +31,9 @@ class FitnessPlanService:
     async def calculate_progress(self, user_id, start_date, end_date):
         """Calculate user's fitness progress over a time period."""
         try:
-            # Get workouts within the date range
-            workouts = Workout.query.filter(
-                Workout.user_id == user_id,
-                Workout.date >= start_date,
-                Workout.date <= end_date
-            ).all()
+            # Get workouts within the date range (index range scan on user_id, date)
+            start, end = self._parse_date_range(start_date, end_date)
+            workouts = Workout.for_user(user_id, start, end).all()
 
             # Analyze progress using AI agents
             progress_data = {
@@ -52,6 +49,14 @@ class FitnessPlanService:
             print(f"Error calculating progress: {str(e)}")
             raise
 
+    def _parse_date_range(self, start_date, end_date):
+        """Parses ISO dates into a half-open [start, end) range; a date-only end covers that whole day."""
+        start = datetime.fromisoformat(start_date) if isinstance(start_date, str) else start_date
+        end = datetime.fromisoformat(end_date) if isinstance(end_date, str) else end_date
+        if isinstance(end_date, str) and len(end_date) == 10:
+            end += timedelta(days=1)
+        return start, end
+
     async def _get_user_fitness_data(self, user_id):
         """Get user's fitness-related data."""
         # Implementation to fetch user's fitness data
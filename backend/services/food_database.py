@@ -0,0 +1,236 @@
+import argparse
+import csv
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Nutrient columns, per 100 g; same keys as Nutritionist's food log totals
+NUTRIENTS = ('calories', 'protein', 'carbs', 'fat', 'fiber')
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_SOURCE = os.path.join(DATA_DIR, 'foods.csv')
+
+# Arrays written by build() and memory-mapped by FoodDatabase
+_ARRAYS = (
+    'names', 'nutrients', 'portion_g', 'portions',
+    'name_order', 'tokens', 'token_food',
+    'trigrams', 'trigram_offsets', 'trigram_food', 'trigram_counts'
+)
+
+
+def normalize(text: str) -> str:
+    return ' '.join(re.sub(r'[^\w%]+', ' ', (text or '').lower()).split())
+
+
+def trigrams(text: str) -> List[str]:
+    """Distinct character trigrams of a normalized string, padded so short words still index."""
+    padded = f'  {text} '
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def build(source: str = DEFAULT_SOURCE, target: str = None) -> str:
+    """
+    Compiles the food CSV into the array store
+
+    Every array is a plain ``.npy`` file: fixed-width names, a float32
+    nutrient matrix, a sorted name order and word list for prefix search, and
+    a CSR trigram index (sorted keys, offsets, food ids) for fuzzy search.
+
+    Returns:
+        The directory the arrays were written to
+    """
+    target = target or _store_dir(source)
+    with open(source, newline='', encoding='utf-8') as f:
+        rows = [row for row in csv.DictReader(f) if row.get('name')]
+
+    names = [normalize(row['name']) for row in rows]
+    nutrients = np.array([[float(row[key] or 0) for key in NUTRIENTS] for row in rows], dtype=np.float32)
+    portion_g = np.array([float(row.get('portion_g') or 100) for row in rows], dtype=np.float32)
+    portions = [row.get('portion') or '100 g' for row in rows]
+
+    # Every word of every name, so "breast" finds "chicken breast cooked"
+    token_pairs = sorted((token, food) for food, name in enumerate(names) for token in name.split())
+
+    postings = {}
+    trigram_counts = np.zeros(len(names), dtype=np.int32)
+    for food, name in enumerate(names):
+        grams = trigrams(name)
+        trigram_counts[food] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(food)
+    keys = sorted(postings)
+    offsets = np.cumsum([0] + [len(postings[key]) for key in keys]).astype(np.int32)
+
+    arrays = {
+        'names': np.array(names),
+        'nutrients': nutrients,
+        'portion_g': portion_g,
+        'portions': np.array(portions),
+        'name_order': np.argsort(np.array(names)).astype(np.int32),
+        'tokens': np.array([token for token, _ in token_pairs]),
+        'token_food': np.array([food for _, food in token_pairs], dtype=np.int32),
+        'trigrams': np.array(keys),
+        'trigram_offsets': offsets,
+        'trigram_food': np.array([food for key in keys for food in postings[key]], dtype=np.int32),
+        'trigram_counts': trigram_counts,
+    }
+    os.makedirs(target, exist_ok=True)
+    for key, array in arrays.items():
+        # Write then rename, so concurrent readers never map a half-written file
+        path = os.path.join(target, f'{key}.npy')
+        np.save(path + '.tmp.npy', array)
+        os.replace(path + '.tmp.npy', path)
+    return target
+
+
+def _store_dir(source: str) -> str:
+    return os.getenv('FOOD_DB_DIR') or os.path.splitext(source)[0] + '_db'
+
+
+class FoodDatabase:
+    """
+    Local food-composition store with type-ahead search
+
+    Arrays are opened with ``mmap_mode='r'``, so every worker process shares
+    the same page-cache copy and opening the store costs a few file opens.
+    Nutrients are per 100 g; ``totals`` turns a food log into one
+    ``grams / 100 @ nutrients`` dot product.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        for key in _ARRAYS:
+            setattr(self, key, np.load(os.path.join(path, f'{key}.npy'), mmap_mode='r'))
+        # The sorted names are searched on every keystroke; keep them resident
+        self.sorted_names = np.asarray(self.names)[self.name_order]
+
+    @classmethod
+    def open(cls, source: str = DEFAULT_SOURCE) -> 'FoodDatabase':
+        """Opens the compiled store next to ``source``, rebuilding it when the CSV is newer."""
+        target = _store_dir(source)
+        marker = os.path.join(target, 'trigram_counts.npy')
+        if not os.path.exists(marker) or os.path.getmtime(marker) < os.path.getmtime(source):
+            build(source, target)
+        return cls(target)
+
+    def __len__(self):
+        return len(self.names)
+
+    def food(self, food_id: int) -> Dict:
+        per_100g = {key: round(float(value), 1) for key, value in zip(NUTRIENTS, self.nutrients[food_id])}
+        return {
+            'id': int(food_id),
+            'name': str(self.names[food_id]),
+            'portion': str(self.portions[food_id]),
+            'portion_g': float(self.portion_g[food_id]),
+            'per_100g': per_100g
+        }
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Type-ahead lookup: name prefixes first, then word prefixes, then trigram similarity
+
+        Args:
+            query: What the user typed so far
+            limit: Maximum number of foods returned
+        """
+        return [self.food(food_id) for food_id in self.search_ids(query, limit)]
+
+    def search_ids(self, query: str, limit: int = 10) -> List[int]:
+        query = normalize(query)
+        if not query:
+            return []
+        found = list(self._prefix(self.sorted_names, self.name_order, query, limit))
+        if len(found) < limit:
+            last_word = query.split()[-1]
+            for food_id in self._prefix(self.tokens, self.token_food, last_word, limit * 4):
+                if food_id not in found and all(word in self.names[food_id] for word in query.split()[:-1]):
+                    found.append(food_id)
+                    if len(found) == limit:
+                        break
+        if len(found) < limit:
+            for food_id in self._fuzzy(query, limit + len(found)):
+                if food_id not in found:
+                    found.append(food_id)
+                    if len(found) == limit:
+                        break
+        return found
+
+    def lookup(self, name: str) -> Optional[int]:
+        """Best matching food id for a free-text name, or None when nothing is close."""
+        query = normalize(name)
+        if not query:
+            return None
+        index = np.searchsorted(self.sorted_names, query)
+        if index < len(self.sorted_names) and self.sorted_names[index] == query:
+            return int(self.name_order[index])
+        matches = self.search_ids(query, limit=1)
+        return matches[0] if matches else None
+
+    def totals(self, food_ids, grams) -> Dict:
+        """Nutrient totals of ``grams[i]`` of ``food_ids[i]``, as one vectorized dot product."""
+        food_ids = np.asarray(food_ids, dtype=np.int64)
+        if len(food_ids) == 0:
+            return {key: 0.0 for key in NUTRIENTS}
+        amounts = np.asarray(grams, dtype=np.float32) / 100.0
+        summed = amounts @ self.nutrients[food_ids]
+        return {key: round(float(value), 1) for key, value in zip(NUTRIENTS, summed)}
+
+    @staticmethod
+    def _prefix(sorted_keys, ids, prefix: str, limit: int):
+        start = np.searchsorted(sorted_keys, prefix)
+        end = np.searchsorted(sorted_keys, prefix + '\uffff')
+        return [int(food_id) for food_id in ids[start:min(end, start + limit)]]
+
+    def _fuzzy(self, query: str, limit: int) -> List[int]:
+        grams = trigrams(query)
+        slots = np.searchsorted(self.trigrams, grams)
+        present = slots < len(self.trigrams)
+        slots = slots[present]
+        slots = slots[self.trigrams[slots] == np.array(grams)[present]]
+        if len(slots) == 0:
+            return []
+        postings = np.concatenate([self.trigram_food[self.trigram_offsets[s]:self.trigram_offsets[s + 1]] for s in slots])
+        shared = np.bincount(postings, minlength=len(self.names))
+        # Share of the query's trigrams found in the name; Dice breaks ties in favour of shorter names
+        coverage = shared / len(grams)
+        dice = 2.0 * shared / (len(grams) + self.trigram_counts)
+        candidates = np.flatnonzero(coverage >= 0.5)
+        best = candidates[np.lexsort((-dice[candidates], -coverage[candidates]))][:limit]
+        return [int(food_id) for food_id in best]
+
+
+_database = None
+_database_lock = threading.Lock()
+
+
+def get_food_database() -> FoodDatabase:
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = FoodDatabase.open(os.getenv('FOOD_DB_SOURCE', DEFAULT_SOURCE))
+        return _database
+
+
+def main():
+    """Build the store or try a lookup: python -m backend.services.food_database [build | search <text>]"""
+    parser = argparse.ArgumentParser(description='Local food-composition database')
+    parser.add_argument('command', choices=['build', 'search'])
+    parser.add_argument('query', nargs='*')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(f"Built food database in {build()}")
+        return
+    database = get_food_database()
+    start = time.perf_counter()
+    results = database.search(' '.join(args.query))
+    print(f"{len(results)} results in {(time.perf_counter() - start) * 1e6:.0f} us")
+    for food in results:
+        print(f"  {food['name']}: {food['per_100g']} per 100 g, portion {food['portion']} ({food['portion_g']:g} g)")
+
+if __name__ == '__main__':
+    main()
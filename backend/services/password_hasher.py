@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+from werkzeug.security import check_password_hash
+
+from backend.utils.metrics import metrics
+
+# bcrypt only looks at the first 72 bytes; newer releases raise instead of truncating
+BCRYPT_MAX_BYTES = 72
+
+
+class HasherBusyError(RuntimeError):
+    """Raised when too many hashing jobs are already queued."""
+
+
+class PasswordHasher:
+    """The one place passwords are hashed and checked.
+
+    Hashes are bcrypt with ``rounds`` as the cost factor. Hashing runs on a
+    pool of ``workers`` threads (bcrypt releases the GIL), so at most that
+    many cores are ever busy with password work no matter how many logins
+    arrive at once; beyond ``max_pending`` queued jobs callers get
+    ``HasherBusyError`` instead of piling up. Hashes made with a different
+    cost, or with werkzeug's PBKDF2/scrypt, still verify and are flagged for
+    rehashing.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = None, max_pending: int = None):
+        self.rounds = rounds
+        self.workers = workers or max((os.cpu_count() or 2) - 1, 1)
+        self.max_pending = max_pending or self.workers * 16
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        metrics.register_gauge('password.pending', lambda: self._pending)
+
+    @classmethod
+    def from_env(cls) -> 'PasswordHasher':
+        workers = os.getenv('PASSWORD_HASH_WORKERS')
+        return cls(
+            rounds=int(os.getenv('BCRYPT_ROUNDS', 12)),
+            workers=int(workers) if workers else None
+        )
+
+    def hash(self, password: str) -> str:
+        return self._run('password.hash', self._hash, password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._run('password.verify', self._verify, password, hashed)
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Checks ``password`` and returns ``(valid, new hash or None)``
+
+        A new hash is only produced for a valid password whose stored hash
+        uses another scheme or cost, so callers can persist it right away.
+        """
+        if not self.verify(password, hashed):
+            return False, None
+        if not self.needs_rehash(hashed):
+            return True, None
+        metrics.increment('password.rehash')
+        return True, self.hash(password)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        if not hashed or not hashed.startswith(('$2b$', '$2a$', '$2y$')):
+            return True
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def _run(self, metric: str, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            metrics.increment('password.rejected')
+            raise HasherBusyError('Too many password operations in progress, please retry')
+        with self._pending_lock:
+            self._pending += 1
+        start = time.perf_counter()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+            self._slots.release()
+            metrics.observe(metric, (time.perf_counter() - start) * 1000)
+
+    def _hash(self, password: str) -> str:
+        return bcrypt.hashpw(self._encode(password), bcrypt.gensalt(self.rounds)).decode('utf-8')
+
+    def _verify(self, password: str, hashed: str) -> bool:
+        if not hashed:
+            return False
+        if hashed.startswith(('$2b$', '$2a$', '$2y$')):
+            try:
+                return bcrypt.checkpw(self._encode(password), hashed.encode('utf-8'))
+            except ValueError:
+                return False
+        # Hashes written by werkzeug's generate_password_hash before this service existed
+        return check_password_hash(hashed, password)
+
+    @staticmethod
+    def _encode(password: str) -> bytes:
+        return password.encode('utf-8')[:BCRYPT_MAX_BYTES]
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher.from_env()
+        return _hasher
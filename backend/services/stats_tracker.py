@@ -0,0 +1,273 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from backend.models import db
+from backend.models.workout import Workout
+from backend.models.stats import UserDailyStats, UserStats
+
+# (user_id, day) -> [count, minutes, calories, {type: count}]
+Deltas = Dict[Tuple[int, object], list]
+
+
+def _contribution(user_id, workout_date, workout_type, duration, calories):
+    if user_id is None or workout_date is None:
+        return None
+    return (user_id, workout_date.date(), workout_type, duration or 0, calories or 0)
+
+
+def _add(deltas: Deltas, contribution, sign: int):
+    if contribution is None:
+        return
+    user_id, day, workout_type, duration, calories = contribution
+    delta = deltas.setdefault((user_id, day), [0, 0, 0, defaultdict(int)])
+    delta[0] += sign
+    delta[1] += sign * duration
+    delta[2] += sign * calories
+    if workout_type:
+        delta[3][workout_type] += sign
+
+
+TRACKED_ATTRS = ('user_id', 'date', 'type', 'duration', 'calories_burned')
+
+
+def _old_values(session: Session, state) -> tuple:
+    histories = [state.attrs[attr].history for attr in TRACKED_ATTRS]
+    if all(history.deleted or not history.added for history in histories):
+        return tuple(history.deleted[0] if history.deleted else getattr(state.object, attr)
+                     for attr, history in zip(TRACKED_ATTRS, histories))
+    # An attribute was assigned while expired, so the previous value is only in the database
+    row = session.execute(
+        select(*(getattr(Workout, attr) for attr in TRACKED_ATTRS)).where(Workout.id == state.identity[0])
+    ).first()
+    return tuple(row) if row is not None else (None,) * len(TRACKED_ATTRS)
+
+
+def collect_deltas(session: Session) -> Deltas:
+    """Per-day deltas implied by the workouts pending in ``session``."""
+    deltas = {}
+    for obj in session.new:
+        if isinstance(obj, Workout):
+            _add(deltas, _contribution(*(getattr(obj, attr) for attr in TRACKED_ATTRS)), 1)
+
+    with session.no_autoflush:
+        for obj in session.deleted:
+            if isinstance(obj, Workout):
+                _add(deltas, _contribution(*_old_values(session, inspect(obj))), -1)
+
+        for obj in session.dirty:
+            if not isinstance(obj, Workout) or not session.is_modified(obj, include_collections=False):
+                continue
+            state = inspect(obj)
+            if not any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRS):
+                continue
+            _add(deltas, _contribution(*_old_values(session, state)), -1)
+            _add(deltas, _contribution(*(getattr(obj, attr) for attr in TRACKED_ATTRS)), 1)
+
+    return deltas
+
+
+def deltas_for_rows(rows: Iterable[Dict], deltas: Deltas = None) -> Deltas:
+    """Per-day deltas for workout rows inserted with Core, which bypasses ``before_flush``."""
+    deltas = {} if deltas is None else deltas
+    for row in rows:
+        _add(deltas, _contribution(*(row.get(attr) for attr in TRACKED_ATTRS)), 1)
+    return deltas
+
+
+def apply_deltas(session: Session, deltas: Deltas):
+    """
+    Folds per-day deltas into ``user_daily_stats`` and ``user_stats`` within the current transaction
+
+    Rows are created with an insert that ignores conflicts, then read with
+    ``SELECT ... FOR UPDATE``, so concurrent writers for the same user queue
+    behind each other instead of losing increments or failing the workout
+    insert on a duplicate key.
+    """
+    deltas = {
+        key: delta for key, delta in deltas.items()
+        if delta[0] or delta[1] or delta[2] or any(delta[3].values())
+    }
+    if not deltas:
+        return
+    user_ids = sorted({user_id for user_id, _ in deltas})
+    keys = sorted(deltas)
+
+    added_days = defaultdict(list)
+    removed_days = defaultdict(list)
+
+    with session.no_autoflush:
+        _insert_missing(session, UserStats, [
+            {'user_id': user_id, 'total_workouts': 0, 'total_minutes': 0, 'total_calories': 0,
+             'active_days': 0, 'current_streak': 0, 'longest_streak': 0}
+            for user_id in user_ids
+        ])
+        _insert_missing(session, UserDailyStats, [
+            {'user_id': user_id, 'day': day, 'workout_count': 0, 'total_minutes': 0,
+             'total_calories': 0, 'type_counts': {}}
+            for user_id, day in keys
+        ])
+
+        # Always lock summaries before days, each in key order, so writers cannot deadlock
+        summaries = {
+            summary.user_id: summary for summary in _locked(
+                session, UserStats, [(user_id,) for user_id in user_ids],
+                select(UserStats).where(UserStats.user_id.in_(user_ids)).order_by(UserStats.user_id)
+            )
+        }
+        dailies = {
+            (daily.user_id, daily.day): daily for daily in _locked(
+                session, UserDailyStats, keys,
+                select(UserDailyStats)
+                .where(UserDailyStats.user_id.in_(user_ids), UserDailyStats.day.in_({day for _, day in keys}))
+                .order_by(UserDailyStats.user_id, UserDailyStats.day)
+            )
+        }
+
+        for (user_id, day), (count, minutes, calories, type_counts) in deltas.items():
+            daily = dailies[(user_id, day)]
+            was_active = daily.workout_count > 0
+
+            daily.workout_count += count
+            daily.total_minutes += minutes
+            daily.total_calories += calories
+            merged = dict(daily.type_counts or {})
+            for workout_type, type_delta in type_counts.items():
+                merged[workout_type] = merged.get(workout_type, 0) + type_delta
+                if merged[workout_type] <= 0:
+                    del merged[workout_type]
+            daily.type_counts = merged
+
+            if daily.workout_count > 0 and not was_active:
+                added_days[user_id].append(day)
+            elif daily.workout_count <= 0 and was_active:
+                removed_days[user_id].append(day)
+            if daily.workout_count <= 0:
+                session.delete(daily)
+
+            summary = summaries[user_id]
+            summary.total_workouts += count
+            summary.total_minutes += minutes
+            summary.total_calories += calories
+
+        for user_id in set(added_days) | set(removed_days):
+            _update_streaks(session, summaries[user_id],
+                            sorted(added_days[user_id]), removed_days[user_id])
+
+
+def _insert_missing(session: Session, model, rows: List[Dict]):
+    """Inserts the ``rows`` whose primary key does not exist yet; safe against concurrent inserts."""
+    mapper = inspect(model)
+    dialect = session.get_bind(mapper=mapper).dialect.name
+    if dialect == 'postgresql':
+        statement = postgresql_insert(model).on_conflict_do_nothing()
+    elif dialect == 'sqlite':
+        statement = sqlite_insert(model).on_conflict_do_nothing()
+    elif dialect == 'mysql':
+        statement = insert(model).prefix_with('IGNORE')
+    else:
+        rows = [row for row in rows
+                if session.get(model, tuple(row[column.key] for column in mapper.primary_key)) is None]
+        statement = insert(model)
+    if rows:
+        session.execute(statement, rows)
+
+
+def _locked(session: Session, model, keys: List[tuple], statement) -> List:
+    """Runs ``statement`` with FOR UPDATE, refreshing clean copies of its rows already in the session."""
+    mapper = inspect(model)
+    for key in keys:
+        obj = session.identity_map.get(mapper.identity_key_from_primary_key(key))
+        # Unflushed changes from earlier in this transaction were made under the same lock; keep them
+        if obj is not None and not session.is_modified(obj):
+            session.expire(obj)
+    return session.execute(statement.with_for_update()).scalars().all()
+
+
+def _update_streaks(session: Session, summary: UserStats, added: List, removed: List):
+    summary.active_days += len(added) - len(removed)
+
+    # Fast path: new days that extend or restart the streak at its tail
+    if not removed and (summary.last_active_day is None or added[0] > summary.last_active_day):
+        for day in added:
+            if summary.last_active_day is not None and day == summary.last_active_day + timedelta(days=1):
+                summary.current_streak += 1
+            else:
+                summary.current_streak = 1
+            summary.last_active_day = day
+            summary.longest_streak = max(summary.longest_streak, summary.current_streak)
+        return
+
+    # Backfilled or deleted days can merge or split runs: recompute from the daily rows
+    days = {
+        day for (day,) in session.query(UserDailyStats.day)
+        .filter(UserDailyStats.user_id == summary.user_id, UserDailyStats.workout_count > 0)
+    }
+    days |= set(added)
+    days -= set(removed)
+    summary.current_streak, summary.longest_streak, summary.last_active_day = compute_streaks(days)
+
+
+def compute_streaks(days: Iterable) -> Tuple[int, int, object]:
+    """Returns ``(run ending on the last day, longest run, last day)`` for a set of active days."""
+    ordered = sorted(days)
+    if not ordered:
+        return 0, 0, None
+    longest = current = 1
+    for previous, day in zip(ordered, ordered[1:]):
+        current = current + 1 if day == previous + timedelta(days=1) else 1
+        longest = max(longest, current)
+    return current, longest, ordered[-1]
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_workout_stats(session, flush_context, instances):
+    deltas = collect_deltas(session)
+    if deltas:
+        apply_deltas(session, deltas)
+
+
+def rebuild_user_stats(user_id: int = None):
+    """Recomputes the aggregates from the workouts table, e.g. after the initial migration."""
+    users = [user_id] if user_id is not None else [
+        uid for (uid,) in db.session.query(Workout.user_id).distinct()
+    ]
+    for uid in users:
+        UserDailyStats.query.filter_by(user_id=uid).delete()
+        UserStats.query.filter_by(user_id=uid).delete()
+
+        daily = {}
+        for batch in Workout.iter_for_user(uid, fields=['date', 'type', 'duration', 'calories_burned']):
+            for row in batch:
+                # iter_for_user serializes datetimes, turn them back into days
+                day = row['date'][:10]
+                entry = daily.setdefault(day, [0, 0, 0, defaultdict(int)])
+                entry[0] += 1
+                entry[1] += row['duration'] or 0
+                entry[2] += row['calories_burned'] or 0
+                if row['type']:
+                    entry[3][row['type']] += 1
+
+        summary = UserStats(user_id=uid, total_workouts=0, total_minutes=0, total_calories=0)
+        for day, (count, minutes, calories, type_counts) in daily.items():
+            db.session.add(UserDailyStats(
+                user_id=uid, day=_parse_day(day), workout_count=count,
+                total_minutes=minutes, total_calories=calories, type_counts=dict(type_counts)
+            ))
+            summary.total_workouts += count
+            summary.total_minutes += minutes
+            summary.total_calories += calories
+        summary.active_days = len(daily)
+        summary.current_streak, summary.longest_streak, summary.last_active_day = \
+            compute_streaks(_parse_day(day) for day in daily)
+        db.session.add(summary)
+    db.session.commit()
+
+
+def _parse_day(value: str) -> date:
+    return date.fromisoformat(value)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Optional
+
+
+class TTSCache:
+    """Disk-backed, size-bounded cache of synthesized audio.
+
+    Entries are content-addressed by a SHA-256 of the text and every voice
+    parameter that changes the audio, so any process sharing the directory
+    can serve them. Reads refresh the file's mtime and eviction removes the
+    least recently used files once the cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 256 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    @classmethod
+    def from_env(cls) -> 'TTSCache':
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return cls(
+            os.getenv('TTS_CACHE_DIR', os.path.join(base_dir, 'data', 'tts_cache')),
+            int(os.getenv('TTS_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+        )
+
+    @staticmethod
+    def make_key(text: str, voice: str, speed: float, pitch: float, audio_format: str = 'mp3') -> str:
+        material = json.dumps([text, voice, float(speed), float(pitch), audio_format], ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                audio = file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return audio
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, audio: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        existing = os.path.getsize(path) if os.path.exists(path) else 0
+
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as file:
+            file.write(audio)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                # A cold scan already sees the file just written
+                self._current_size()
+            else:
+                self._size += len(audio) - existing
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._current_size()
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._entries())
+        return self._size
+
+    def _entries(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.startswith('tmp'):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+    def _evict(self):
+        # Drop to 90% of the cap so eviction is not triggered on every put
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        for path, _, entry_size in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+            except OSError:
+                pass
+        self._size = size
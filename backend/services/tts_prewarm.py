@@ -0,0 +1,52 @@
+import os
+import time
+from typing import Dict, List
+
+from backend.agents.motivator import Motivator
+from backend.services.voice_service import VoiceService, VOICE_COMMAND_FALLBACK
+
+
+def fixed_phrases(max_streak: int = 30) -> List[str]:
+    """Spoken responses that never depend on an LLM call, in pre-warm order."""
+    motivator = Motivator({})
+    phrases = [VOICE_COMMAND_FALLBACK]
+    phrases.extend(Motivator.DAILY_QUOTES)
+    phrases.extend(motivator._generate_streak_message(streak) for streak in range(max_streak + 1))
+    # Keep order, drop repeats
+    return list(dict.fromkeys(phrases))
+
+
+def prewarm(voice_service: VoiceService = None, phrases: List[str] = None) -> Dict:
+    """
+    Synthesizes every fixed phrase that is not cached yet
+
+    Args:
+        voice_service: Service whose voice settings and cache are warmed
+        phrases: Phrases to warm, defaults to ``fixed_phrases()``
+    """
+    voice_service = voice_service or VoiceService()
+    phrases = phrases if phrases is not None else fixed_phrases(int(os.getenv('TTS_PREWARM_MAX_STREAK', 30)))
+
+    summary = {'total': len(phrases), 'already_cached': 0, 'synthesized': 0, 'failed': 0}
+    start = time.perf_counter()
+    for phrase in phrases:
+        if voice_service.is_cached(phrase):
+            summary['already_cached'] += 1
+            continue
+        result = voice_service.text_to_speech(phrase)
+        if result['success'] and result['audio']:
+            summary['synthesized'] += 1
+        else:
+            summary['failed'] += 1
+    summary['elapsed_seconds'] = round(time.perf_counter() - start, 2)
+    summary['cache_bytes'] = voice_service.cache.size()
+    return summary
+
+
+def main():
+    """Pre-warm the TTS cache, e.g. from cron: python -m backend.services.tts_prewarm"""
+    print("Pre-warming TTS cache...")
+    print(prewarm())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import tempfile
+from typing import Dict
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an uploaded file exceeds the configured size cap."""
+
+
+def upload_too_large_message(max_file_size: int) -> str:
+    return f'File exceeds the maximum upload size of {max_file_size} bytes'
+
+
+class UploadStore:
+    """Content-addressed storage for uploaded files.
+
+    Uploads are copied from the request stream to disk in fixed-size chunks
+    and hashed as the bytes arrive, so a file is never held in memory as a
+    whole. Each file ends up at ``objects/<sha[:2]>/<sha><ext>``; writing the
+    same content twice leaves a single copy on disk.
+    """
+
+    def __init__(self, root: str, max_file_size: int = 20 * 1024 * 1024, chunk_size: int = 64 * 1024):
+        self.root = root
+        self.max_file_size = max_file_size
+        self.chunk_size = chunk_size
+        self.objects_dir = os.path.join(root, 'objects')
+        self.tmp_dir = os.path.join(root, 'tmp')
+
+    def path_for(self, sha256: str, ext: str = '') -> str:
+        return os.path.join(self.objects_dir, sha256[:2], f'{sha256}{ext.lower()}')
+
+    def save_stream(self, stream, ext: str = '') -> Dict:
+        """
+        Streams ``stream`` to disk while hashing it
+
+        Args:
+            stream: Readable binary file object (e.g. ``FileStorage.stream``)
+            ext: File extension to keep on the stored object, used to pick an extractor
+
+        Returns:
+            Dict with ``sha256``, ``path``, ``size`` and ``created`` (False when
+            the same content was already stored)
+        """
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if self.max_file_size and size > self.max_file_size:
+                        raise UploadTooLargeError(upload_too_large_message(self.max_file_size))
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            sha256 = digest.hexdigest()
+            path = self.path_for(sha256, ext)
+            created = not os.path.exists(path)
+            if created:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            else:
+                os.remove(tmp_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return {
+            'sha256': sha256,
+            'path': path,
+            'size': size,
+            'created': created
+        }
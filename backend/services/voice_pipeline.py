@@ -0,0 +1,160 @@
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator
+
+from flask import current_app
+
+from backend.services.voice_service import VOICE_COMMAND_FALLBACK
+from backend.utils.metrics import metrics
+
+_SENTENCE_END_RE = re.compile(r'([.!?;:]+["\')\]]*)(\s+)|\n+')
+
+
+class SentenceSplitter:
+    """Cuts a stream of text deltas into complete sentences.
+
+    Very short fragments (``"Ok."``, list numbering) are held back and
+    merged with the next sentence so TTS is not called for a single word.
+    """
+
+    def __init__(self, min_length: int = 20):
+        self.min_length = min_length
+        self.buffer = ''
+
+    def feed(self, delta: str) -> Iterator[str]:
+        self.buffer += delta
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(self.buffer):
+            end = match.end(1) if match.group(1) else match.start()
+            if end - start < self.min_length:
+                continue
+            sentence = self.buffer[start:end].strip()
+            start = match.end()
+            if sentence:
+                yield sentence
+        self.buffer = self.buffer[start:]
+
+    def flush(self) -> Iterator[str]:
+        sentence = self.buffer.strip()
+        self.buffer = ''
+        if sentence:
+            yield sentence
+
+
+class VoicePipeline:
+    """Runs a voice turn with its stages overlapped.
+
+    Retrieval starts on the final transcript, the coach's reply is streamed
+    and cut at sentence boundaries, and every sentence is handed to a TTS
+    worker while the model keeps generating. Audio events are emitted in
+    sentence order as soon as each one is ready, so the turn takes roughly
+    as long as its slowest stage instead of the sum of all stages.
+    """
+
+    def __init__(self, agent_manager, tts_workers: int = 2, min_sentence_length: int = 20):
+        self.agent_manager = agent_manager
+        self.min_sentence_length = min_sentence_length
+        self.executor = ThreadPoolExecutor(max_workers=tts_workers, thread_name_prefix='voice-tts')
+
+    def run(self, audio_file, user_id: int) -> Iterator[Dict]:
+        """
+        Processes one voice turn, yielding events as they happen
+
+        Events are dicts with a ``type`` of ``transcript``, ``sentence``,
+        ``audio``, ``error`` or ``done``; ``done`` carries the full reply and
+        the per-stage timings in milliseconds.
+        """
+        timings = {}
+        turn_start = time.perf_counter()
+
+        def mark(stage, since):
+            elapsed = (time.perf_counter() - since) * 1000
+            timings[stage] = round(elapsed, 1)
+            metrics.observe(f'voice.{stage}', elapsed)
+
+        # Stage 1: speech to text, relaying partial transcripts
+        stage_start = time.perf_counter()
+        transcript = None
+        for partial in self.agent_manager.stream_audio_transcript(audio_file):
+            if not partial['success']:
+                yield {'type': 'error', 'stage': 'stt', 'error': partial['error']}
+                return
+            yield {'type': 'transcript', 'text': partial['text'], 'is_final': partial['is_final']}
+            # Partials carry the transcript so far; keep the last non-empty one in case no final event comes
+            if partial['text']:
+                transcript = partial['text']
+            if partial['is_final']:
+                break
+        mark('stt_ms', stage_start)
+        if not transcript:
+            yield {'type': 'error', 'stage': 'stt', 'error': 'No speech recognized'}
+            return
+
+        # Stage 2: retrieval, started as soon as the transcript is final
+        stage_start = time.perf_counter()
+        try:
+            context = self.agent_manager.retrieve_context(transcript)
+        except Exception as e:
+            if current_app:
+                current_app.logger.error(f"Error retrieving context: {str(e)}")
+            context = ''
+        mark('retrieval_ms', stage_start)
+
+        # Stage 3 + 4: stream the reply, synthesizing each sentence as soon as it is complete
+        stage_start = time.perf_counter()
+        pending = deque()
+        reply = []
+        splitter = SentenceSplitter(self.min_sentence_length)
+        first_token = True
+        first_audio = True
+
+        def submit(sentence):
+            index = len(reply)
+            reply.append(sentence)
+            pending.append((index, self.executor.submit(self._synthesize, sentence)))
+            return {'type': 'sentence', 'index': index, 'text': sentence}
+
+        def ready_audio(block=False):
+            nonlocal first_audio
+            while pending and (block or pending[0][1].done()):
+                index, future = pending.popleft()
+                result = future.result()
+                if first_audio:
+                    mark('first_audio_ms', turn_start)
+                    first_audio = False
+                yield {'type': 'audio', 'index': index, **result}
+
+        try:
+            for delta in self.agent_manager.stream_coach_reply(transcript, context, user_id):
+                if first_token:
+                    mark('llm_first_token_ms', stage_start)
+                    first_token = False
+                for sentence in splitter.feed(delta):
+                    yield submit(sentence)
+                yield from ready_audio()
+        except Exception as e:
+            if current_app:
+                current_app.logger.error(f"Error streaming coach reply: {str(e)}")
+            if not reply and not splitter.buffer.strip():
+                splitter.buffer = VOICE_COMMAND_FALLBACK
+
+        for sentence in splitter.flush():
+            yield submit(sentence)
+        mark('llm_ms', stage_start)
+
+        yield from ready_audio(block=True)
+        mark('turn_ms', turn_start)
+
+        yield {'type': 'done', 'transcript': transcript, 'text': ' '.join(reply), 'timings': timings}
+
+    def _synthesize(self, sentence: str) -> Dict:
+        start = time.perf_counter()
+        result = self.agent_manager.generate_voice_response(sentence)
+        metrics.observe('voice.tts_sentence_ms', (time.perf_counter() - start) * 1000)
+        return {
+            'audio': result.get('audio'),
+            'error': result.get('error'),
+            'cached': result.get('cached', False)
+        }
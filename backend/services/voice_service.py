@@ -1,16 +1,46 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from flask import current_app
-import base64
 import json
+import uuid
+import base64
+import time
+from backend.utils.metrics import metrics
+from backend.services.tts_cache import TTSCache
+from backend.services.audio_preprocessor import AudioPreprocessor
+
+VOICE_COMMAND_FALLBACK = "I'm sorry, I couldn't process your command. Please try again."
 
 class VoiceService:
-    def __init__(self, api_key: str = None):
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    MAX_CACHED_AUDIO_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, api_key: str = None, cache: TTSCache = None):
         self.fish_audio_endpoint = os.getenv('FISH_AUDIO_ENDPOINT', 'https://api.fish-audio.com/v1')
         self.api_key = api_key or os.getenv('FISH_AUDIO_API_KEY')
+        self.cache = cache if cache is not None else TTSCache.from_env()
+        self.preprocessor = AudioPreprocessor.from_env()
+        # Reuse connections to Fish Audio across calls
+        self.session = requests.Session()
+        pool_size = int(os.getenv('FISH_AUDIO_POOL_SIZE', 10))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.stt_model = 'general'  # or other model as needed
+        self.stt_language = 'en'    # or other language as needed
+        self.tts_voice = 'en-US-1'  # or other voice as needed
+        self.tts_speed = 1.0
+        self.tts_pitch = 1.0
+        self.tts_format = 'mp3'
 
     def speech_to_text(self, audio_file) -> dict:
-        """Convert speech to text using Fish Audio API."""
+        """Convert speech to text using Fish Audio API.
+
+        The audio is streamed to the API as a chunked multipart body straight
+        from ``audio_file`` (a ``FileStorage`` or any readable binary stream
+        such as ``request.stream``), so it is never fully buffered in memory.
+        """
         try:
             if not self.api_key:
                 return {
@@ -18,28 +48,19 @@ class VoiceService:
                     'error': 'Please configure your Fish Audio API key.',
                     'text': None
                 }
-                
-            # Read audio file
-            audio_content = audio_file.read()
-            audio_base64 = base64.b64encode(audio_content).decode('utf-8')
 
-            # Prepare request
+            audio_file = self._prepare_audio(audio_file)
+            body, content_type = self._multipart_body(audio_file)
             headers = {
                 'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            data = {
-                'audio': audio_base64,
-                'model': 'general',  # or other model as needed
-                'language': 'en'     # or other language as needed
+                'Content-Type': content_type
             }
 
-            # Make API request
-            response = requests.post(
+            # Make API request (a generator body is sent with chunked transfer encoding)
+            response = self.session.post(
                 f'{self.fish_audio_endpoint}/speech-to-text',
                 headers=headers,
-                json=data,
+                data=body,
                 timeout=30
             )
             response.raise_for_status()
@@ -48,7 +69,8 @@ class VoiceService:
             return {
                 'success': True,
                 'error': None,
-                'text': result.get('text')
+                'text': result.get('text'),
+                'preprocessing': getattr(audio_file, 'stats', None)
             }
             
         except Exception as e:
@@ -62,9 +84,129 @@ class VoiceService:
                 'text': None
             }
 
+    def stream_speech_to_text(self, audio_file):
+        """Convert speech to text, yielding partial transcripts as they arrive.
+
+        Yields dicts shaped like ``speech_to_text`` results plus an
+        ``is_final`` flag. The API is asked for newline-delimited JSON (or SSE)
+        events; if it answers with a single JSON document, that is yielded as
+        the final transcript.
+        """
+        if not self.api_key:
+            yield {
+                'success': False,
+                'error': 'Please configure your Fish Audio API key.',
+                'text': None,
+                'is_final': True
+            }
+            return
+
+        try:
+            audio_file = self._prepare_audio(audio_file)
+            body, content_type = self._multipart_body(audio_file, {'stream': 'true'})
+            headers = {
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': content_type,
+                'Accept': 'application/x-ndjson, text/event-stream, application/json'
+            }
+
+            with self.session.post(
+                f'{self.fish_audio_endpoint}/speech-to-text',
+                headers=headers,
+                data=body,
+                stream=True,
+                timeout=30
+            ) as response:
+                response.raise_for_status()
+                response_type = response.headers.get('Content-Type', '')
+
+                if 'ndjson' not in response_type and 'event-stream' not in response_type:
+                    yield {
+                        'success': True,
+                        'error': None,
+                        'text': response.json().get('text'),
+                        'is_final': True
+                    }
+                    return
+
+                for line in response.iter_lines():
+                    if line.startswith(b'data:'):
+                        line = line[len(b'data:'):].strip()
+                    if not line or line == b'[DONE]':
+                        continue
+                    event = json.loads(line)
+                    yield {
+                        'success': True,
+                        'error': None,
+                        'text': event.get('text'),
+                        'is_final': bool(event.get('is_final', event.get('final', False)))
+                    }
+
+        except Exception as e:
+            error_msg = f'Speech to text error: {str(e)}'
+            if current_app:
+                current_app.logger.error(error_msg)
+            yield {
+                'success': False,
+                'error': error_msg,
+                'text': None,
+                'is_final': True
+            }
+
+    def _prepare_audio(self, audio_file):
+        """Downmixes, resamples and trims the recording locally when preprocessing is enabled."""
+        if self.preprocessor is None:
+            return audio_file
+        return self.preprocessor.prepare(audio_file)
+
+    def _multipart_body(self, audio_file, extra_fields: dict = None):
+        """Returns a generator producing a multipart/form-data body and its content type."""
+        boundary = uuid.uuid4().hex
+        fields = {
+            'model': self.stt_model,
+            'language': self.stt_language,
+            **(extra_fields or {})
+        }
+        filename = (getattr(audio_file, 'filename', None) or 'audio').replace('"', '')
+        mimetype = getattr(audio_file, 'mimetype', None) or 'application/octet-stream'
+        stream = getattr(audio_file, 'stream', audio_file)
+
+        def generate():
+            for name, value in fields.items():
+                yield (
+                    f'--{boundary}\r\n'
+                    f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                    f'{value}\r\n'
+                ).encode('utf-8')
+            yield (
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="audio"; filename="{filename}"\r\n'
+                f'Content-Type: {mimetype}\r\n\r\n'
+            ).encode('utf-8')
+            while True:
+                chunk = stream.read(self.STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+            yield f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+        return generate(), f'multipart/form-data; boundary={boundary}'
+
     def text_to_speech(self, text: str) -> dict:
-        """Convert text to speech using Fish Audio API."""
+        """Convert text to speech using Fish Audio API, serving repeated phrases from the cache."""
         try:
+            cache_key = self.cache_key(text)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                metrics.increment('tts.cache_hit')
+                return {
+                    'success': True,
+                    'error': None,
+                    'audio': base64.b64encode(cached).decode('utf-8'),
+                    'cached': True
+                }
+            metrics.increment('tts.cache_miss')
+
             if not self.api_key:
                 return {
                     'success': False,
@@ -77,15 +219,10 @@ class VoiceService:
                 'Content-Type': 'application/json'
             }
             
-            data = {
-                'text': text,
-                'voice': 'en-US-1',  # or other voice as needed
-                'speed': 1.0,
-                'pitch': 1.0
-            }
+            data = self._tts_payload(text)
 
             # Make API request
-            response = requests.post(
+            response = self.session.post(
                 f'{self.fish_audio_endpoint}/text-to-speech',
                 headers=headers,
                 json=data,
@@ -94,10 +231,15 @@ class VoiceService:
             response.raise_for_status()
             result = response.json()
 
+            audio = result.get('audio')  # Base64 encoded audio
+            if audio:
+                self._cache_audio(cache_key, base64.b64decode(audio))
+
             return {
                 'success': True,
                 'error': None,
-                'audio': result.get('audio')  # Base64 encoded audio
+                'audio': audio,
+                'cached': False
             }
             
         except Exception as e:
@@ -111,6 +253,100 @@ class VoiceService:
                 'audio': None
             }
 
+    def stream_text_to_speech(self, text: str):
+        """Convert text to speech, yielding raw audio chunks as Fish Audio produces them.
+
+        Time-to-first-audio and total synthesis time are recorded as the
+        ``tts.time_to_first_audio`` and ``tts.stream_total`` timers. Errors are
+        raised, since nothing sensible can be yielded in place of audio.
+        """
+        start = time.perf_counter()
+        cache_key = self.cache_key(text)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            metrics.increment('tts.cache_hit')
+            metrics.observe('tts.time_to_first_audio', (time.perf_counter() - start) * 1000)
+            for offset in range(0, len(cached), self.STREAM_CHUNK_SIZE):
+                yield cached[offset:offset + self.STREAM_CHUNK_SIZE]
+            return
+        metrics.increment('tts.cache_miss')
+
+        if not self.api_key:
+            raise ValueError('Please configure your Fish Audio API key.')
+
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'Accept': f'audio/{self.tts_format}, application/octet-stream, application/json'
+        }
+        data = dict(self._tts_payload(text), stream=True)
+
+        first_chunk = True
+        received = []
+        received_size = 0
+        with self.session.post(
+            f'{self.fish_audio_endpoint}/text-to-speech',
+            headers=headers,
+            json=data,
+            stream=True,
+            timeout=30
+        ) as response:
+            response.raise_for_status()
+
+            if response.headers.get('Content-Type', '').startswith('application/json'):
+                # Endpoint does not stream, fall back to the buffered base64 payload
+                chunks = self._iter_base64_audio(response.json().get('audio') or '')
+            else:
+                chunks = response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE)
+
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if first_chunk:
+                    metrics.observe('tts.time_to_first_audio', (time.perf_counter() - start) * 1000)
+                    first_chunk = False
+                if received is not None:
+                    received.append(chunk)
+                    received_size += len(chunk)
+                    if received_size > self.MAX_CACHED_AUDIO_SIZE:
+                        received = None
+                yield chunk
+
+        metrics.observe('tts.stream_total', (time.perf_counter() - start) * 1000)
+        if received:
+            self._cache_audio(cache_key, b''.join(received))
+
+    def cache_key(self, text: str) -> str:
+        return TTSCache.make_key(text, self.tts_voice, self.tts_speed, self.tts_pitch, self.tts_format)
+
+    def is_cached(self, text: str) -> bool:
+        return self.cache.contains(self.cache_key(text))
+
+    def _cache_audio(self, cache_key: str, audio: bytes):
+        if len(audio) > self.MAX_CACHED_AUDIO_SIZE:
+            return
+        try:
+            self.cache.put(cache_key, audio)
+        except OSError as e:
+            # A full or read-only cache must never fail the response
+            if current_app:
+                current_app.logger.warning(f'TTS cache write error: {str(e)}')
+
+    def _tts_payload(self, text: str) -> dict:
+        return {
+            'text': text,
+            'voice': self.tts_voice,
+            'speed': self.tts_speed,
+            'pitch': self.tts_pitch,
+            'format': self.tts_format
+        }
+
+    def _iter_base64_audio(self, audio_base64: str):
+        # Decode in slices that are a multiple of 4 characters so each one is valid base64
+        step = (self.STREAM_CHUNK_SIZE // 3) * 4
+        for offset in range(0, len(audio_base64), step):
+            yield base64.b64decode(audio_base64[offset:offset + step])
+
 def main():
     """Test the VoiceService class"""
     print("Testing VoiceService...")
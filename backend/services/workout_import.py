@@ -0,0 +1,259 @@
+import csv
+import io
+import json
+import math
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import insert
+
+from backend.models import db
+from backend.models.workout import Workout
+from backend.services import stats_tracker
+from backend.utils.metrics import metrics
+
+SUPPORTED_FORMATS = ('ndjson', 'csv', 'gpx')
+
+# Column names commonly produced by wearable exports
+FIELD_ALIASES = {
+    'notes': 'description',
+    'calories': 'calories_burned',
+    'start_time': 'date',
+    'timestamp': 'date',
+    'duration_minutes': 'duration',
+}
+
+# Upper bounds for imported values; anything larger is a unit or export error
+MAX_DURATION_MINUTES = 7 * 24 * 60
+MAX_CALORIES = 100000
+
+
+def parse_ndjson(stream) -> Iterator[Tuple[int, Dict]]:
+    """Yields ``(line number, record)`` from a binary NDJSON stream."""
+    for line_no, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8'), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f'Invalid JSON: {str(e)}')
+            continue
+        yield line_no, record
+
+
+def parse_csv(stream) -> Iterator[Tuple[int, Dict]]:
+    """Yields ``(line number, record)`` from a binary CSV stream with a header row."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    for record in reader:
+        yield reader.line_num, {key.strip(): value for key, value in record.items()
+                                if key and value not in (None, '')}
+
+
+def parse_gpx(stream) -> Iterator[Tuple[int, Dict]]:
+    """
+    Yields one ``(track number, record)`` per ``<trk>`` of a GPX file
+
+    Track points are consumed as they are parsed and discarded, so a long
+    recording is never held in memory. Duration comes from the first and
+    last point timestamps.
+    """
+    track_no = 0
+    track = None
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        tag = elem.tag.rsplit('}', 1)[-1]
+        if event == 'start':
+            if tag == 'trk':
+                track_no += 1
+                track = {'name': None, 'type': None, 'first': None, 'last': None}
+            continue
+
+        if track is None:
+            elem.clear()
+            continue
+        if tag in ('name', 'type') and track[tag] is None and elem.text:
+            track[tag] = elem.text.strip()
+        elif tag == 'time' and elem.text:
+            track['first'] = track['first'] or elem.text.strip()
+            track['last'] = elem.text.strip()
+        elif tag == 'trk':
+            try:
+                if track['first'] is None:
+                    raise ValueError('Track has no timestamps')
+                start, end = _parse_datetime(track['first']), _parse_datetime(track['last'])
+            except ValueError as e:
+                yield track_no, e
+            else:
+                yield track_no, {
+                    'name': track['name'] or (track['type'] or 'Activity').title(),
+                    'description': f"Imported from GPX ({track['type']})" if track['type'] else 'Imported from GPX',
+                    'type': 'cardio',
+                    'duration': max(round((end - start).total_seconds() / 60), 1),
+                    'date': start,
+                }
+            track = None
+            elem.clear()
+        elif tag == 'trkpt':
+            elem.clear()
+
+
+PARSERS = {
+    'ndjson': parse_ndjson,
+    'csv': parse_csv,
+    'gpx': parse_gpx,
+}
+
+
+def _parse_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).strip())
+    # Stored dates are naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def _parse_int(value, field: str, minimum: int, maximum: int) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f'{field} must be a number')
+    number = float(value)
+    # int() of inf raises OverflowError and of nan ValueError; report both as bad values
+    if not math.isfinite(number):
+        raise ValueError(f'{field} must be a finite number')
+    if not minimum <= number <= maximum:
+        raise ValueError(f'{field} must be between {minimum} and {maximum}')
+    return int(number)
+
+
+def _parse_text(value, field: str):
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f'{field} must be a string')
+    return value
+
+
+def validate_record(record: Dict, user_id: int, now: datetime) -> Dict:
+    """
+    Normalizes one imported record into a ``workouts`` row
+
+    Args:
+        record: raw record from one of the parsers
+        user_id: owner of the imported workouts
+        now: timestamp for ``created_at`` / ``updated_at``
+
+    Raises:
+        ValueError: the record is missing required fields or has invalid values
+    """
+    if not isinstance(record, dict):
+        raise ValueError('Record must be an object')
+    record = {FIELD_ALIASES.get(key, key): value for key, value in record.items()}
+
+    missing = [field for field in ('type', 'duration', 'date') if record.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing required field: {', '.join(missing)}")
+
+    duration = _parse_int(record['duration'], 'Duration', 1, MAX_DURATION_MINUTES)
+    calories = record.get('calories_burned')
+    calories = _parse_int(calories, 'Calories', 0, MAX_CALORIES) if calories not in (None, '') else None
+
+    workout_type = _parse_text(record['type'], 'Type').strip().lower()
+    return {
+        'user_id': user_id,
+        'name': (_parse_text(record.get('name'), 'Name') or workout_type.title())[:100],
+        'description': _parse_text(record.get('description'), 'Description'),
+        'type': workout_type[:50],
+        'duration': duration,
+        'calories_burned': calories,
+        'completed': _parse_bool(record.get('completed', True)),
+        'date': _parse_datetime(record['date']),
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+class WorkoutImporter:
+    """Bulk-inserts validated workout records.
+
+    Records are validated as they are parsed and written ``batch_size`` at a
+    time with one Core ``executemany`` insert and one commit per batch. The
+    daily stats are updated in the same transaction. No per-workout AI
+    feedback is generated; it is requested later per workout.
+    """
+
+    def __init__(self, batch_size: int = 1000, max_errors: int = 100):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    def run(self, user_id: int, records: Iterable[Tuple[int, Dict]]) -> Dict:
+        """
+        Imports ``records`` for ``user_id``
+
+        Args:
+            user_id: owner of the imported workouts
+            records: ``(line number, record or ValueError)`` pairs from a parser
+
+        Returns:
+            Dict with ``imported``, ``failed``, up to ``max_errors`` ``errors`` and
+            ``aborted`` when the file could not be read to the end
+        """
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        imported = 0
+        failed = 0
+        errors = []
+        batch = []
+
+        aborted = False
+        try:
+            for line_no, record in records:
+                try:
+                    if isinstance(record, ValueError):
+                        raise record
+                    batch.append(validate_record(record, user_id, now))
+                except (ValueError, TypeError, OverflowError) as e:
+                    failed += 1
+                    if len(errors) < self.max_errors:
+                        errors.append({'line': line_no, 'error': str(e)})
+                    continue
+
+                if len(batch) >= self.batch_size:
+                    imported += self._insert(batch)
+                    batch = []
+        except (ET.ParseError, csv.Error, UnicodeDecodeError) as e:
+            # The rest of the file is unreadable; keep what was parsed so far
+            aborted = True
+            errors.append({'line': None, 'error': f'Could not parse file: {str(e)}'})
+
+        if batch:
+            imported += self._insert(batch)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        metrics.observe('workouts.import', elapsed_ms)
+        metrics.increment('workouts.import.rows', imported)
+        return {
+            'imported': imported,
+            'failed': failed,
+            'errors': errors,
+            'aborted': aborted,
+            'elapsed_ms': round(elapsed_ms, 1)
+        }
+
+    def _insert(self, rows: List[Dict]) -> int:
+        try:
+            db.session.execute(insert(Workout.__table__), rows)
+            # Core inserts skip the ORM flush hook, so fold them into the stats here
+            stats_tracker.apply_deltas(db.session, stats_tracker.deltas_for_rows(rows))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(rows)
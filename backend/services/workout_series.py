@@ -0,0 +1,85 @@
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+
+from backend.models import db
+from backend.models.workout_series import WorkoutSeries
+
+
+def parse_interval(value) -> float:
+    """Sample spacing in seconds; must be a finite, positive number."""
+    try:
+        interval = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('interval must be a number of seconds')
+    if not math.isfinite(interval) or interval <= 0:
+        raise ValueError('interval must be a finite, positive number of seconds')
+    return interval
+
+
+def parse_series(payload, interval_s: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Turns a request payload into ``(times, values)`` arrays
+
+    Args:
+        payload: ``{'times': [...], 'values': [...]}`` or a plain list of
+            values sampled every ``interval_s`` seconds
+        interval_s: spacing of a plain list
+    """
+    if isinstance(payload, dict):
+        values = np.asarray(payload.get('values', []), dtype=np.float64)
+        if 'times' in payload:
+            times = np.asarray(payload['times'], dtype=np.float64)
+        else:
+            times = np.arange(len(values)) * parse_interval(payload.get('interval', interval_s))
+    else:
+        values = np.asarray(payload, dtype=np.float64)
+        times = np.arange(len(values)) * interval_s
+    return times, values
+
+
+def save_series(workout, metric: str, times, values) -> WorkoutSeries:
+    """Stores (or replaces) one metric stream of ``workout``; the caller commits."""
+    if metric not in WorkoutSeries.METRICS:
+        raise ValueError(f"Unknown metric: {metric}. Use one of: {', '.join(WorkoutSeries.METRICS)}")
+    series = WorkoutSeries.query.filter_by(workout_id=workout.id, metric=metric).first()
+    if series is None:
+        series = WorkoutSeries(workout_id=workout.id, metric=metric)
+        db.session.add(series)
+    series.set_samples(times, values)
+    return series
+
+
+def downsample(times: np.ndarray, values: np.ndarray, bucket_s: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Averages samples into ``bucket_s`` wide buckets, e.g. for charts or prompts."""
+    if len(times) == 0 or bucket_s <= 0:
+        return times, values
+    buckets = ((times - times[0]) // bucket_s).astype(np.int64)
+    counts = np.bincount(buckets)
+    filled = counts > 0
+    means = np.bincount(buckets, weights=values)[filled] / counts[filled]
+    starts = times[0] + np.flatnonzero(filled) * bucket_s
+    return starts, means
+
+
+def analysis_data(workout, max_points: int = 30) -> Dict:
+    """
+    Sensor data for the AI prompts: each stream downsampled to at most ``max_points`` values
+
+    Returns keys like ``heart_rate`` (list) and ``heart_rate_summary`` (min/max/mean),
+    matching what ``FitnessCoach._create_analysis_prompt`` reads.
+    """
+    data = {}
+    for series in workout.series:
+        times, values = series.arrays()
+        if len(times) == 0:
+            continue
+        # The last sample sits exactly on the boundary, hence max_points - 1 intervals
+        bucket_s = max(series.duration_ms / 1000.0 / max(max_points - 1, 1), 1.0)
+        _, means = downsample(times, values, bucket_s)
+        data[series.metric] = [round(float(value), 1) for value in means]
+        data[f'{series.metric}_summary'] = {
+            key: series.to_dict()[key] for key in ('min', 'max', 'mean', 'unit', 'sample_count')
+        }
+    return data
@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.models import db
+from backend.models.workout import Workout
+from backend.utils.metrics import metrics
+
+
+class GroupCommitWriter:
+    """Commits workouts submitted from many request threads in shared transactions.
+
+    A single writer thread waits up to ``max_delay_ms`` after the first
+    pending workout for others to arrive, then inserts up to ``max_batch``
+    of them with one commit. On SQLite that turns N fsyncs and N write-lock
+    handoffs into one. ``submit`` blocks until the workout is durable, so
+    callers see the same semantics as ``Workout.save()``.
+    """
+
+    def __init__(self, app, max_delay_ms: float = 5, max_batch: int = 200):
+        self.app = app
+        self.max_delay = max_delay_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        metrics.register_gauge('workouts.group_commit.pending', self._queue.qsize)
+
+    @classmethod
+    def from_app(cls, app) -> 'GroupCommitWriter':
+        return cls(
+            app,
+            max_delay_ms=app.config.get('WORKOUT_GROUP_COMMIT_DELAY_MS', 5),
+            max_batch=app.config.get('WORKOUT_GROUP_COMMIT_MAX_BATCH', 200)
+        )
+
+    def submit(self, workout: Workout, timeout: float = 30) -> Workout:
+        """
+        Queues a new workout and waits until its batch is committed
+
+        Args:
+            workout: transient ``Workout``; it comes back detached with its id set
+            timeout: seconds to wait for the commit
+        """
+        future = Future()
+        self._ensure_started()
+        self._queue.put((workout, future))
+        return future.result(timeout)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='workout-group-commit', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[Workout, Future]]):
+        start = time.perf_counter()
+        with self.app.app_context():
+            # expire_on_commit=False keeps the committed fields readable once detached
+            with Session(db.engine, expire_on_commit=False) as session:
+                try:
+                    session.add_all([workout for workout, _ in batch])
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    # One bad row must not fail the whole group: retry them one by one
+                    self._commit_individually(session, batch)
+                    return
+                session.expunge_all()
+
+        for workout, future in batch:
+            future.set_result(workout)
+        metrics.observe('workouts.group_commit', (time.perf_counter() - start) * 1000)
+        metrics.increment('workouts.group_commit.batches')
+        metrics.increment('workouts.group_commit.rows', len(batch))
+
+    def _commit_individually(self, session: Session, batch: List[Tuple[Workout, Future]]):
+        session.expunge_all()
+        for workout, future in batch:
+            try:
+                session.add(workout)
+                session.commit()
+                session.expunge(workout)
+                future.set_result(workout)
+            except Exception as e:
+                session.rollback()
+                session.expunge_all()
+                future.set_exception(e)
@@ -1,29 +1,137 @@
+import os
+import time
 from functools import wraps
-from flask import request, jsonify
-from .jwt_utils import verify_token
+
+import jwt
+from flask import current_app, g, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from backend.models import db
+from backend.models.user import User
+from backend.utils.metrics import metrics
+from backend.utils.ttl_cache import TTLCache
+
+# Verified token -> user_id. Entries never outlive the token's own exp claim.
+token_cache = TTLCache(
+    maxsize=int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 10000)),
+    ttl=float(os.getenv('AUTH_TOKEN_CACHE_TTL', 300))
+)
+# user_id -> detached User row. Cleared on update/delete in this process;
+# other processes see changes once the (short) TTL runs out.
+user_cache = TTLCache(
+    maxsize=int(os.getenv('AUTH_USER_CACHE_SIZE', 2048)),
+    ttl=float(os.getenv('AUTH_USER_CACHE_TTL', 60))
+)
+
+
+class AuthError(Exception):
+    def __init__(self, message: str, status: int = 401):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _bearer_token() -> str:
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header[len('Bearer '):] if auth_header.startswith('Bearer ') else auth_header
+    token = token.strip()
+    if not token:
+        raise AuthError('Token is missing')
+    return token
+
+
+def verify_token(token: str) -> int:
+    """
+    Returns the user_id of a valid token, decoding it only on a cache miss
+
+    Raises:
+        AuthError: the token is expired or invalid
+    """
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        metrics.increment('auth.token_cache_hit')
+        return user_id
+    metrics.increment('auth.token_cache_miss')
+
+    try:
+        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        user_id = payload['user_id']
+    except jwt.ExpiredSignatureError:
+        raise AuthError('Token has expired')
+    except (jwt.InvalidTokenError, KeyError):
+        raise AuthError('Token is invalid')
+
+    ttl = payload['exp'] - time.time() if 'exp' in payload else None
+    token_cache.set(token, user_id, ttl)
+    return user_id
+
+
+def load_user(user_id: int) -> User:
+    """Returns the user attached to the current session, hitting the database only on a cache miss."""
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        metrics.increment('auth.user_cache_hit')
+        # Copies the cached state into this session without a SELECT
+        return db.session.merge(cached, load=False)
+    metrics.increment('auth.user_cache_miss')
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    # Cache a detached copy; the request keeps working with its own instance
+    snapshot = User.__mapper__.class_manager.new_instance()
+    for key in User.__mapper__.column_attrs.keys():
+        if key in user.__dict__:
+            set_committed_value(snapshot, key, user.__dict__[key])
+    make_transient_to_detached(snapshot)
+    user_cache.set(user_id, snapshot)
+    return user
+
+
+def _authenticate(with_user: bool):
+    start = time.perf_counter()
+    try:
+        user_id = verify_token(_bearer_token())
+        user = None
+        if with_user:
+            user = load_user(user_id)
+            if user is None:
+                raise AuthError('User not found')
+        g.user_id = user_id
+        return user_id, user
+    finally:
+        metrics.observe('auth.verify', (time.perf_counter() - start) * 1000)
+
 
 def require_auth(f):
+    """Verifies the bearer token and passes ``user_id`` to the route; never touches the database."""
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth_header = request.headers.get('Authorization')
-        
-        if not auth_header:
-            return jsonify({'error': 'No authorization header'}), 401
-            
         try:
-            # Remove 'Bearer ' prefix if present
-            token = auth_header.replace('Bearer ', '')
-            user_id = verify_token(token)
-            
-            if not user_id:
-                return jsonify({'error': 'Invalid token'}), 401
-                
-            # Add user_id to request object
-            request.user_id = user_id
-            
-            return f(*args, **kwargs)
-            
-        except Exception as e:
-            return jsonify({'error': str(e)}), 401
-            
+            user_id, _ = _authenticate(with_user=False)
+        except AuthError as e:
+            metrics.increment('auth.failed')
+            return jsonify({'message': e.message, 'error': e.message}), e.status
+        return f(user_id, *args, **kwargs)
     return decorated
+
+
+def require_user(f):
+    """Like ``require_auth`` but passes the ``User`` row (served from the user cache)."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        try:
+            _, user = _authenticate(with_user=True)
+        except AuthError as e:
+            metrics.increment('auth.failed')
+            return jsonify({'message': e.message, 'error': e.message}), e.status
+        return f(user, *args, **kwargs)
+    return decorated
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user(mapper, connection, target):
+    user_cache.pop(target.id)
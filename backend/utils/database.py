@@ -0,0 +1,176 @@
+import os
+import random
+from functools import wraps
+from typing import Dict, List
+
+from flask import g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from backend.utils import fast_json
+from backend.utils.metrics import metrics
+
+REPLICA_BIND_PREFIX = 'replica_'
+
+
+def normalize_database_url(url: str) -> str:
+    # Heroku-style URLs use the scheme SQLAlchemy dropped in 1.4
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url: str) -> Dict:
+    """
+    SQLAlchemy engine options for ``url``, tuned from the environment
+
+    Args:
+        url: database URL the options are for
+    """
+    options = {
+        # Detect connections dropped by the server or a proxy before handing them out
+        'pool_pre_ping': os.getenv('DATABASE_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    if url.startswith('sqlite'):
+        return options
+
+    options.update({
+        'pool_size': int(os.getenv('DATABASE_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DATABASE_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('DATABASE_POOL_TIMEOUT', 30)),
+        # Recycle before typical server/load balancer idle timeouts
+        'pool_recycle': int(os.getenv('DATABASE_POOL_RECYCLE', 1800)),
+        # Used by native JSON/JSONB columns
+        'json_serializer': fast_json.dumps,
+        'json_deserializer': fast_json.loads,
+    })
+    return options
+
+
+def replica_urls() -> List[str]:
+    urls = os.getenv('DATABASE_REPLICA_URLS', '')
+    return [normalize_database_url(url.strip()) for url in urls.split(',') if url.strip()]
+
+
+def configure_database(app, default_url: str):
+    """
+    Fills in the SQLAlchemy config from ``DATABASE_URL`` and ``DATABASE_REPLICA_URLS``
+
+    Args:
+        app: Flask app, before ``db.init_app``
+        default_url: URL used when ``DATABASE_URL`` is not set
+    """
+    url = normalize_database_url(os.getenv('DATABASE_URL') or default_url)
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(url)
+
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for i, replica_url in enumerate(replica_urls()):
+        binds[f'{REPLICA_BIND_PREFIX}{i}'] = dict(engine_options(replica_url), url=replica_url)
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica for requests marked with ``read_replica``.
+
+    Flushes always go to the primary, and so does everything outside a
+    marked request, so a write in a read-only endpoint is still safe.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('use_read_replica'):
+            replicas = [engine for key, engine in self._db.engines.items()
+                        if key and key.startswith(REPLICA_BIND_PREFIX)]
+            if replicas:
+                return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(f):
+    """Routes the queries of GET requests to a read replica, when any are configured.
+
+    Replicas may lag the primary slightly, so only use this on endpoints
+    that can serve slightly stale data.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            g.use_read_replica = True
+        return f(*args, **kwargs)
+    return decorated
+
+
+def sqlite_pragmas() -> Dict[str, object]:
+    """Connection pragmas for file-backed SQLite, overridable from the environment."""
+    return {
+        # Readers no longer block the writer, and commits append to the WAL instead of rewriting pages
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        # Durable across application crashes; only an OS crash can lose the last commits
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # Negative values are KiB, so this is a 64 MiB page cache per connection
+        'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64000)),
+        # Wait for a competing writer instead of failing with "database is locked"
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'temp_store': 'MEMORY',
+    }
+
+
+def apply_sqlite_pragmas(engine, pragmas: Dict[str, object] = None):
+    """
+    Runs the performance pragmas on every new connection of a SQLite engine
+
+    Args:
+        engine: SQLAlchemy engine; non-SQLite engines are left alone
+        pragmas: overrides ``sqlite_pragmas()``
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = pragmas if pragmas is not None else sqlite_pragmas()
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def configure_sqlite(app, db):
+    """Applies ``apply_sqlite_pragmas`` to every SQLite engine unless ``SQLITE_PRAGMAS=false``."""
+    if os.getenv('SQLITE_PRAGMAS', 'true').lower() != 'true':
+        return
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        apply_sqlite_pragmas(engine)
+
+
+def register_pool_metrics(app, db):
+    """Exposes checked-out/idle/overflow connection counts of every engine as gauges."""
+    with app.app_context():
+        engines = dict(db.engines)
+
+    for key, engine in engines.items():
+        pool = engine.pool
+        name = f'db.pool.{key or "primary"}'
+        for stat in ('size', 'checkedin', 'checkedout', 'overflow'):
+            if hasattr(pool, stat):
+                metrics.register_gauge(f'{name}.{stat}', getattr(pool, stat))
+        _count_pool_events(engine, name)
+
+
+def _count_pool_events(engine, name: str):
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        metrics.increment(f'{name}.connects')
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment(f'{name}.checkouts')
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment(f'{name}.invalidated')
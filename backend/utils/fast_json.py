@@ -0,0 +1,23 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+
+def dumps(value) -> str:
+    """Compact JSON text; orjson when installed (about 5-10x faster than ``json.dumps``)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode('utf-8')
+        except TypeError:
+            # orjson rejects e.g. non-str dict keys, which the stdlib coerces
+            pass
+    return json.dumps(value, separators=(',', ':'))
+
+
+def loads(value):
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
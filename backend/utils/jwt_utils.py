@@ -31,5 +31,5 @@ def verify_token(token: str) -> int:
         return user_id
     except jwt.ExpiredSignatureError:
         return None
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         return None
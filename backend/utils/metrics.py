@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+
+class MetricsRegistry:
+    """In-process counters, gauges and timers, exposed as JSON on ``/metrics``.
+
+    Timers keep running totals plus a bounded window of recent samples for
+    percentiles, so recording stays O(1) and memory stays fixed.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters = {}
+        self._timers = {}
+        self._gauges = {}
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value_ms: float):
+        """Records one duration sample in milliseconds."""
+        value_ms = float(value_ms)
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = {
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'last_ms': 0.0,
+                    'samples': deque(maxlen=self._window)
+                }
+            timer['count'] += 1
+            timer['total_ms'] += value_ms
+            timer['max_ms'] = max(timer['max_ms'], value_ms)
+            timer['last_ms'] = value_ms
+            timer['samples'].append(value_ms)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def register_gauge(self, name: str, fn: Callable[[], object]):
+        """Registers a callable evaluated on every snapshot."""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {name: dict(timer, samples=list(timer['samples'])) for name, timer in self._timers.items()}
+            gauges = dict(self._gauges)
+
+        summary = {}
+        for name, timer in timers.items():
+            samples = sorted(timer.pop('samples'))
+            timer['avg_ms'] = timer['total_ms'] / timer['count'] if timer['count'] else 0.0
+            timer['p50_ms'] = samples[len(samples) // 2] if samples else 0.0
+            timer['p95_ms'] = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+            summary[name] = {key: round(value, 3) if isinstance(value, float) else value
+                             for key, value in timer.items()}
+
+        gauge_values = {}
+        for name, fn in gauges.items():
+            try:
+                gauge_values[name] = fn()
+            except Exception as e:
+                gauge_values[name] = f'error: {str(e)}'
+
+        return {
+            'counters': counters,
+            'timers': summary,
+            'gauges': gauge_values
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,21 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(date, row_id) -> str:
+    """Opaque keyset cursor for a ``(date, id)`` position."""
+    if isinstance(date, datetime):
+        date = date.isoformat()
+    payload = json.dumps([date, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """Inverse of ``encode_cursor``; raises ValueError on malformed input."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(date), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
@@ -0,0 +1,46 @@
+import struct
+import zlib
+
+import numpy as np
+
+# version, item size in bytes, sample count
+_HEADER = struct.Struct('<BBI')
+_VERSION = 1
+_DTYPES = {1: np.dtype('<u1'), 2: np.dtype('<u2'), 4: np.dtype('<u4'), 8: np.dtype('<u8')}
+# Largest magnitude whose deltas (at most twice as large) still zigzag into 64 bits
+MAX_ABS_VALUE = 2 ** 61
+
+
+def encode_ints(values: np.ndarray, level: int = 6) -> bytes:
+    """
+    Delta + zigzag encodes an integer array into the narrowest unsigned type, then zlib-compresses it
+
+    Slowly varying signals (heart rate, 1 Hz timestamps) turn into long runs
+    of tiny deltas that fit a single byte and compress extremely well.
+
+    Raises:
+        ValueError: a value's magnitude exceeds ``MAX_ABS_VALUE``
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) and (values.min() < -MAX_ABS_VALUE or values.max() > MAX_ABS_VALUE):
+        raise ValueError(f'Series values must be within +/-{MAX_ABS_VALUE}')
+    deltas = np.diff(values, prepend=np.int64(0))
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+    peak = int(zigzag.max()) if len(zigzag) else 0
+    size = next(size for size, dtype in _DTYPES.items() if peak <= np.iinfo(dtype).max)
+    payload = zigzag.astype(_DTYPES[size]).tobytes()
+    return _HEADER.pack(_VERSION, size, len(values)) + zlib.compress(payload, level)
+
+
+def decode_ints(blob: bytes) -> np.ndarray:
+    """Inverse of ``encode_ints``; returns an int64 array."""
+    version, size, count = _HEADER.unpack_from(blob)
+    if version != _VERSION or size not in _DTYPES:
+        raise ValueError(f'Unsupported series encoding (version {version}, item size {size})')
+
+    # frombuffer is a zero-copy view over the decompressed bytes
+    zigzag = np.frombuffer(zlib.decompress(blob[_HEADER.size:]), dtype=_DTYPES[size], count=count)
+    zigzag = zigzag.astype(np.int64)
+    deltas = (zigzag >> 1) ^ -(zigzag & 1)
+    return np.cumsum(deltas)
@@ -0,0 +1,44 @@
+"""add exercise progress table
+
+Revision ID: add_exercise_progress
+Revises: add_workout_series
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_exercise_progress'
+down_revision = 'add_workout_series'
+branch_labels = None
+depends_on = None
+
+
+# Same storage as backend.models.user.JSONType
+JSON_TEXT = sa.Text().with_variant(postgresql.JSONB(), 'postgresql').with_variant(mysql.JSON(), 'mysql')
+
+
+def upgrade():
+    op.create_table(
+        'exercise_progress',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('exercise', sa.String(length=100), nullable=False),
+        sa.Column('set_count', sa.Integer(), nullable=False),
+        sa.Column('max_weight', sa.Float(), nullable=False),
+        sa.Column('max_reps', sa.Integer(), nullable=False),
+        sa.Column('total_volume', sa.Float(), nullable=False),
+        sa.Column('best_e1rm', sa.Float(), nullable=False),
+        sa.Column('best_e1rm_day', sa.Date(), nullable=True),
+        sa.Column('last_day', sa.Date(), nullable=True),
+        sa.Column('progression', JSON_TEXT, nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'exercise')
+    )
+
+
+def downgrade():
+    op.drop_table('exercise_progress')
@@ -0,0 +1,39 @@
+"""add knowledge files registry
+
+Revision ID: add_knowledge_files
+Revises: add_fish_audio_api_key
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_knowledge_files'
+down_revision = 'add_fish_audio_api_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'knowledge_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('path', sa.String(length=500), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('chunk_count', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_knowledge_files_sha256', 'knowledge_files', ['sha256'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_knowledge_files_sha256', table_name='knowledge_files')
+    op.drop_table('knowledge_files')
@@ -0,0 +1,50 @@
+"""add user daily stats and streak tables
+
+Revision ID: add_user_stats_tables
+Revises: add_workout_user_date_indexes
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_stats_tables'
+down_revision = 'add_workout_user_date_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_daily_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('workout_count', sa.Integer(), nullable=False),
+        sa.Column('total_minutes', sa.Integer(), nullable=False),
+        sa.Column('total_calories', sa.Integer(), nullable=False),
+        sa.Column('type_counts', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_workouts', sa.Integer(), nullable=False),
+        sa.Column('total_minutes', sa.Integer(), nullable=False),
+        sa.Column('total_calories', sa.Integer(), nullable=False),
+        sa.Column('active_days', sa.Integer(), nullable=False),
+        sa.Column('current_streak', sa.Integer(), nullable=False),
+        sa.Column('longest_streak', sa.Integer(), nullable=False),
+        sa.Column('last_active_day', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    # Existing history is folded in with backend.services.stats_tracker.rebuild_user_stats()
+
+
+def downgrade():
+    op.drop_table('user_stats')
+    op.drop_table('user_daily_stats')
@@ -0,0 +1,43 @@
+"""add workout series table for sensor streams
+
+Revision ID: add_workout_series
+Revises: convert_json_columns_to_jsonb
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_workout_series'
+down_revision = 'convert_json_columns_to_jsonb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'workout_series',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('workout_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sa.String(length=20), nullable=False),
+        sa.Column('scale', sa.Integer(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+        sa.Column('duration_ms', sa.BigInteger(), nullable=False),
+        sa.Column('min_value', sa.Float(), nullable=True),
+        sa.Column('max_value', sa.Float(), nullable=True),
+        sa.Column('mean_value', sa.Float(), nullable=True),
+        sa.Column('times', sa.LargeBinary(), nullable=False),
+        sa.Column('samples', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['workout_id'], ['workouts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('workout_id', 'metric', name='uq_workout_series_workout_id_metric')
+    )
+    op.create_index('ix_workout_series_workout_id', 'workout_series', ['workout_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workout_series_workout_id', table_name='workout_series')
+    op.drop_table('workout_series')
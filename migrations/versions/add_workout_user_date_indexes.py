@@ -0,0 +1,26 @@
+"""add composite workout indexes
+
+Revision ID: add_workout_user_date_indexes
+Revises: add_knowledge_files
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_workout_user_date_indexes'
+down_revision = 'add_knowledge_files'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_workouts_user_id_date', 'workouts', ['user_id', 'date'], unique=False)
+    op.create_index('ix_workouts_user_id_type_date', 'workouts', ['user_id', 'type', 'date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workouts_user_id_type_date', table_name='workouts')
+    op.drop_index('ix_workouts_user_id_date', table_name='workouts')
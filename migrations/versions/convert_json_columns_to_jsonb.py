@@ -0,0 +1,39 @@
+"""convert json text columns to jsonb on postgres
+
+Revision ID: convert_json_columns_to_jsonb
+Revises: add_user_stats_tables
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'convert_json_columns_to_jsonb'
+down_revision = 'add_user_stats_tables'
+branch_labels = None
+depends_on = None
+
+JSON_COLUMNS = [
+    ('users', 'fitness_goals'),
+    ('user_daily_stats', 'type_counts'),
+]
+
+
+def upgrade():
+    # SQLite keeps storing JSON as text, so only Postgres has anything to convert
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in JSON_COLUMNS:
+        op.alter_column(table, column, type_=postgresql.JSONB(),
+                        postgresql_using=f'{column}::jsonb')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in JSON_COLUMNS:
+        op.alter_column(table, column, type_=sa.Text(),
+                        postgresql_using=f'{column}::text')